@@ -1,13 +1,17 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request, abort, Response, stream_with_context
 import os
-import yaml
-from datetime import datetime
+import sys
+import json
+import queue
 
-app = Flask(__name__)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from dashboard.common import (
+    store, alerts, SSE_KEEPALIVE, MJPEG_BOUNDARY, recent_alerts, session_detail,
+    violations_summary as summary_payload, live_stats, preview_broadcaster, mjpeg_part
+)
 
-# Load configuration
-with open('config/config.yaml') as f:
-    config = yaml.safe_load(f)
+# Threaded development server; see dashboard/async_app.py for many concurrent streams
+app = Flask(__name__)
 
 @app.route('/')
 def dashboard():
@@ -15,24 +19,84 @@ def dashboard():
 
 @app.route('/api/alerts')
 def get_alerts():
-    log_file = os.path.join(config['logging']['log_path'], "alerts.log")
-    alerts = []
-    
-    if os.path.exists(log_file):
-        with open(log_file, 'r') as f:
-            alerts = [line.strip() for line in f.readlines()[-10:]]  # Get last 10 alerts
-            
-    return jsonify(alerts)
+    return jsonify(recent_alerts(request.args.get('session')))  # Get last 10 alerts
+
+@app.route('/api/alerts/stream')
+def stream_alerts():
+    """Server-Sent Events: one 'data:' message per new alerts.log line"""
+    backlog = min(request.args.get('backlog', 0, type=int), 100)
+
+    def events():
+        q = alerts.subscribe()
+        try:
+            for line in alerts.recent(backlog) if backlog else []:
+                yield f"data: {json.dumps(line)}\n\n"
+            while True:
+                try:
+                    line = q.get(timeout=SSE_KEEPALIVE)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {json.dumps(line)}\n\n"
+        finally:
+            alerts.unsubscribe(q)
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/sessions')
+def list_sessions():
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+    offset = request.args.get('offset', 0, type=int)
+    return jsonify(store.list_sessions(limit=limit, offset=offset, since=request.args.get('since')))
+
+@app.route('/api/sessions/<session_id>')
+def session_summary(session_id):
+    session = session_detail(session_id)
+    if session is None:
+        abort(404)
+    return jsonify(session)
+
+@app.route('/api/sessions/<session_id>/violations')
+def session_violations(session_id):
+    types = request.args.getlist('type') or None
+    return jsonify(store.get_violations(
+        session_id,
+        start=request.args.get('start', type=float),
+        end=request.args.get('end', type=float),
+        types=types,
+        limit=min(request.args.get('limit', 1000, type=int), 10000)
+    ))
+
+@app.route('/api/violations/summary')
+def violations_summary():
+    return jsonify(summary_payload(
+        start=request.args.get('start', type=float),
+        end=request.args.get('end', type=float),
+        bucket=request.args.get('bucket', 60, type=int)
+    ))
+
+@app.route('/api/sessions/<session_id>/preview.mjpg')
+def session_preview(session_id):
+    """MJPEG stream of a running session, encoded by the pipeline only while watched"""
+    broadcaster = preview_broadcaster(session_id)
+    if broadcaster is None:
+        abort(404)
+
+    def parts():
+        broadcaster.join()
+        try:
+            for jpeg in broadcaster.frames():
+                yield mjpeg_part(jpeg)
+        finally:
+            broadcaster.leave()
+
+    return Response(stream_with_context(parts()), mimetype=f'multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}',
+                    headers={'Cache-Control': 'no-cache'})
 
 @app.route('/api/stats')
 def get_stats():
-    # This would be more sophisticated in a real implementation
-    return jsonify({
-        'face_detected': True,
-        'current_activity': 'Normal',
-        'cheating_probability': 15,
-        'last_alert': datetime.now().strftime("%H:%M:%S")
-    })
+    return jsonify(live_stats(request.args.get('session')))
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True, threaded=True)
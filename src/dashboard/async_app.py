@@ -0,0 +1,210 @@
+import os
+import sys
+import json
+import asyncio
+import argparse
+import functools
+from aiohttp import web
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from dashboard.common import (
+    store, alerts, TEMPLATE_DIR, SSE_KEEPALIVE, MJPEG_BOUNDARY, recent_alerts, session_detail,
+    violations_summary, live_stats, preview_broadcaster, mjpeg_part
+)
+
+# Same routes as the Flask app, served from one event loop so long-lived
+# alert and preview streams cost a coroutine each instead of a thread.
+routes = web.RouteTableDef()
+PREVIEWS = web.AppKey('previews', dict)  # preview segment name -> AsyncPreview
+
+
+def _arg(request, name, default=None, type=str):
+    value = request.query.get(name)
+    if value is None:
+        return default
+    try:
+        return type(value)
+    except ValueError:
+        return default
+
+
+async def _blocking(fn, *args, **kwargs):
+    """Run a store query on the default executor so the loop keeps serving"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+
+class AsyncSink:
+    """put_nowait() target for AlertBroadcaster that feeds an asyncio queue"""
+
+    def __init__(self, loop, maxsize=256):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+
+    def put_nowait(self, line):
+        self.loop.call_soon_threadsafe(self._put, line)
+
+    def _put(self, line):
+        if self.queue.full():
+            self.queue.get_nowait()  # drop the oldest line for a slow client
+        self.queue.put_nowait(line)
+
+
+class AsyncPreview:
+    """Wakes every asyncio viewer of one PreviewBroadcaster with one callback per frame.
+
+    Viewers await the shared next_frame future, which is resolved and
+    replaced on each new frame, so the per-frame cost does not grow with
+    the number of viewers.
+    """
+
+    def __init__(self, broadcaster, loop):
+        self.broadcaster = broadcaster
+        self.loop = loop
+        self.next_frame = loop.create_future()
+        broadcaster.listeners.add(self._on_frame)
+
+    def _on_frame(self):
+        self.loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self):
+        ready, self.next_frame = self.next_frame, self.loop.create_future()
+        ready.set_result(None)
+
+
+@routes.get('/')
+async def dashboard(request):
+    path = os.path.join(TEMPLATE_DIR, 'dashboard.html')
+    if not os.path.exists(path):
+        raise web.HTTPNotFound()
+    return web.FileResponse(path)
+
+
+@routes.get('/api/alerts')
+async def get_alerts(request):
+    return web.json_response(await _blocking(recent_alerts, request.query.get('session')))
+
+
+@routes.get('/api/alerts/stream')
+async def stream_alerts(request):
+    """Server-Sent Events: one 'data:' message per new alerts.log line"""
+    backlog = min(_arg(request, 'backlog', 0, int), 100)
+    response = web.StreamResponse(headers={
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    await response.prepare(request)
+
+    sink = AsyncSink(asyncio.get_running_loop())
+    alerts.subscribe(sink)
+    try:
+        for line in alerts.recent(backlog) if backlog else []:
+            await response.write(f"data: {json.dumps(line)}\n\n".encode())
+        while True:
+            try:
+                line = await asyncio.wait_for(sink.queue.get(), SSE_KEEPALIVE)
+            except asyncio.TimeoutError:
+                await response.write(b": keepalive\n\n")
+                continue
+            await response.write(f"data: {json.dumps(line)}\n\n".encode())
+    except ConnectionResetError:
+        pass
+    finally:
+        alerts.unsubscribe(sink)
+    return response
+
+
+@routes.get('/api/sessions')
+async def list_sessions(request):
+    return web.json_response(await _blocking(
+        store.list_sessions,
+        limit=min(_arg(request, 'limit', 100, int), 1000),
+        offset=_arg(request, 'offset', 0, int),
+        since=request.query.get('since')
+    ))
+
+
+@routes.get('/api/sessions/{session_id}')
+async def session_summary(request):
+    session = await _blocking(session_detail, request.match_info['session_id'])
+    if session is None:
+        raise web.HTTPNotFound()
+    return web.json_response(session)
+
+
+@routes.get('/api/sessions/{session_id}/violations')
+async def session_violations(request):
+    return web.json_response(await _blocking(
+        store.get_violations,
+        request.match_info['session_id'],
+        start=_arg(request, 'start', None, float),
+        end=_arg(request, 'end', None, float),
+        types=request.query.getall('type', None) or None,
+        limit=min(_arg(request, 'limit', 1000, int), 10000)
+    ))
+
+
+@routes.get('/api/violations/summary')
+async def get_violations_summary(request):
+    return web.json_response(await _blocking(
+        violations_summary,
+        start=_arg(request, 'start', None, float),
+        end=_arg(request, 'end', None, float),
+        bucket=_arg(request, 'bucket', 60, int)
+    ))
+
+
+@routes.get('/api/sessions/{session_id}/preview.mjpg')
+async def session_preview(request):
+    """MJPEG stream of a running session, encoded by the pipeline only while watched"""
+    broadcaster = await _blocking(preview_broadcaster, request.match_info['session_id'])
+    if broadcaster is None:
+        raise web.HTTPNotFound()
+    hubs = request.app[PREVIEWS]
+    hub = hubs.get(broadcaster.name)
+    if hub is None or hub.broadcaster is not broadcaster:
+        hub = hubs[broadcaster.name] = AsyncPreview(broadcaster, asyncio.get_running_loop())
+
+    response = web.StreamResponse(headers={
+        'Content-Type': f'multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}',
+        'Cache-Control': 'no-cache'
+    })
+    await response.prepare(request)
+    broadcaster.join()
+    try:
+        while True:
+            try:
+                await asyncio.wait_for(asyncio.shield(hub.next_frame), 10.0)
+            except asyncio.TimeoutError:
+                break  # the session stopped publishing
+            await response.write(mjpeg_part(broadcaster.jpeg))
+    except ConnectionResetError:
+        pass
+    finally:
+        broadcaster.leave()
+    return response
+
+
+@routes.get('/api/stats')
+async def get_stats(request):
+    return web.json_response(await _blocking(live_stats, request.query.get('session')))
+
+
+def create_app():
+    app = web.Application()
+    app[PREVIEWS] = {}
+    app.add_routes(routes)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async dashboard server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args()
+    web.run_app(create_app(), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+import os
+import sys
+import time
+import threading
+import yaml
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.violation_store import ViolationStore
+from utils.live_state import LiveStateReader
+from dashboard.streams import AlertBroadcaster, PreviewBroadcaster
+
+# Load configuration (same lookup as main_final.load_config, independent of the cwd)
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+CONFIG_CANDIDATES = [
+    os.environ.get('PROCTOR_CONFIG'),
+    os.path.join(ROOT, 'config', 'config.yaml'),
+    os.path.join(ROOT, 'config.yaml')
+]
+config_path = next(path for path in CONFIG_CANDIDATES if path and os.path.exists(path))
+with open(config_path) as f:
+    config = yaml.safe_load(f)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+SSE_KEEPALIVE = 15  # seconds between comment pings on an idle stream
+MJPEG_BOUNDARY = 'frame'
+
+store = ViolationStore(config)
+
+# One follower of alerts.log shared by every poller and stream client
+alerts = AlertBroadcaster(os.path.join(config['logging']['log_path'], "alerts.log"))
+
+# Latest pipeline state of each running session, read from the shared-memory
+# segment the session registered in the store (see utils.live_state)
+LIVE_REFRESH = 1.0  # seconds between store lookups of the running sessions
+live_readers = {}  # segment name -> LiveStateReader
+live_segments = {}  # session id -> segment name, newest session first
+live_checked = 0.0
+live_lock = threading.Lock()
+
+# One preview reader per session's preview segment, shared by all its viewers
+previews = {}  # session id -> PreviewBroadcaster
+previews_lock = threading.Lock()
+
+
+def recent_alerts(session_id=None, n=10):
+    """Last n alerts, from the store when it has any, otherwise from alerts.log"""
+    recent = store.recent_alerts(n, session_id=session_id)
+    if recent or session_id:
+        return [
+            f"{datetime.fromtimestamp(a['ts']).strftime('%Y-%m-%d %H:%M:%S')} - {a['type']}: {a['message']}"
+            for a in recent
+        ]
+    return alerts.recent(n)
+
+
+def session_detail(session_id):
+    """Session row with its summary, or None for an unknown id"""
+    session = store.get_session(session_id)
+    if session is not None:
+        session['summary'] = store.session_summary(session_id)
+    return session
+
+
+def violations_summary(start=None, end=None, bucket=60):
+    return {
+        'by_type': store.count_by_type(start=start, end=end),
+        'timeline': store.count_by_interval(bucket, start=start, end=end)
+    }
+
+
+def _live_readers():
+    """{session id: reader} of the running sessions, newest first, refreshed once per LIVE_REFRESH"""
+    global live_segments, live_checked
+    with live_lock:
+        if time.time() - live_checked >= LIVE_REFRESH:
+            live_segments = {s['id']: s['live_segment'] for s in store.live_sessions()}
+            live_checked = time.time()
+            for segment in set(live_readers) - set(live_segments.values()):
+                live_readers.pop(segment).close()  # the session has ended
+            with previews_lock:
+                for session_id in set(previews) - set(live_segments):
+                    del previews[session_id]  # its reader thread exits with the last viewer
+        readers = {}
+        for session_id, segment in live_segments.items():
+            if segment not in live_readers:
+                live_readers[segment] = LiveStateReader(segment)
+            readers[session_id] = live_readers[segment]
+        return readers
+
+
+def read_live_state(session_id=None):
+    """(reader, state) of a running session, the newest publishing one by default"""
+    readers = _live_readers()
+    candidates = [session_id] if session_id is not None else list(readers)
+    for candidate in candidates:
+        reader = readers.get(candidate)
+        state = reader.read() if reader else None
+        if state is not None:
+            return reader, state
+    return None, None
+
+
+def live_stats(session_id=None):
+    """Latest pipeline state plus the summary fields the dashboard page shows"""
+    reader, state = read_live_state(session_id)
+    if state is None:
+        return {'running': False}
+    results = state.get('results', {})
+    state.update({
+        'running': time.time() - state.get('updated_at', 0) < reader.stale_after,
+        'face_detected': results.get('face_present', False),
+        'current_activity': state.get('current_alert') or 'Normal',
+        'last_update': datetime.fromtimestamp(state.get('updated_at', 0)).strftime("%H:%M:%S")
+    })
+    return state
+
+
+def preview_broadcaster(session_id):
+    """Shared preview reader for a running session, or None if it is not live"""
+    _, state = read_live_state(session_id)
+    if not state or not state.get('preview'):
+        return None
+    with previews_lock:
+        broadcaster = previews.get(session_id)
+        if broadcaster is None or broadcaster.name != state['preview']:
+            broadcaster = previews[session_id] = PreviewBroadcaster(state['preview'])
+        return broadcaster
+
+
+def mjpeg_part(jpeg):
+    return (f"--{MJPEG_BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+            f"Content-Length: {len(jpeg)}\r\n\r\n").encode() + jpeg + b"\r\n"
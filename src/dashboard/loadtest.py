@@ -0,0 +1,108 @@
+import time
+import asyncio
+import argparse
+import numpy as np
+import aiohttp
+
+
+async def _hold_stream(session, url, stop, counts):
+    """Keep one streaming connection open and count the bytes it receives"""
+    try:
+        async with session.get(url) as response:
+            counts['open'] += 1
+            while not stop.is_set():
+                chunk = await response.content.readany()
+                if not chunk:
+                    break
+                counts['bytes'] += len(chunk)
+    except aiohttp.ClientError:
+        counts['failed'] += 1
+
+
+async def _poll(session, urls, stop, latencies, errors):
+    i = 0
+    while not stop.is_set():
+        url = urls[i % len(urls)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            async with session.get(url) as response:
+                await response.read()
+                if response.status >= 400:
+                    errors.append(response.status)
+                    continue
+        except aiohttp.ClientError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(base_url, paths, concurrency, duration, streams, stream_path):
+    """
+    Measure request latency while many clients poll and hold streams open
+
+    Args:
+        base_url (str): Dashboard address, e.g. http://127.0.0.1:5000
+        paths (list): Endpoints polled round-robin by every client
+        concurrency (int): Number of polling clients
+        duration (float): Seconds to run
+        streams (int): Streaming connections held open during the run
+        stream_path (str): Endpoint of those streams
+
+    Returns:
+        dict: Request count, rate, error count and latency percentiles in ms
+    """
+    stop = asyncio.Event()
+    latencies, errors = [], []
+    stream_counts = {'open': 0, 'failed': 0, 'bytes': 0}
+    connector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=10)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        holders = [asyncio.create_task(_hold_stream(session, base_url + stream_path, stop, stream_counts))
+                   for _ in range(streams)]
+        await asyncio.sleep(1.0 if streams else 0)  # let the streams connect first
+        pollers = [asyncio.create_task(_poll(session, [base_url + p for p in paths], stop, latencies, errors))
+                   for _ in range(concurrency)]
+        await asyncio.sleep(duration)
+        stop.set()
+        await asyncio.gather(*pollers)
+        for task in holders:
+            task.cancel()
+        await asyncio.gather(*holders, return_exceptions=True)
+
+    ms = np.array(latencies) * 1000
+    percentiles = np.percentile(ms, [50, 90, 99]) if len(ms) else [0, 0, 0]
+    return {
+        'requests': len(ms),
+        'rps': len(ms) / duration,
+        'errors': len(errors),
+        'p50': percentiles[0],
+        'p90': percentiles[1],
+        'p99': percentiles[2],
+        'max': ms.max() if len(ms) else 0,
+        'streams_open': stream_counts['open'],
+        'streams_failed': stream_counts['failed']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the dashboard API")
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--path', action='append', help="Endpoint to poll (repeatable), default /api/stats")
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--streams', type=int, default=0, help="Streaming connections held open meanwhile")
+    parser.add_argument('--stream-path', default='/api/alerts/stream')
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.url.rstrip('/'), args.path or ['/api/stats'], args.concurrency,
+                             args.duration, args.streams, args.stream_path))
+    print(f"{result['requests']} requests, {result['rps']:.0f} req/s, {result['errors']} errors")
+    print(f"latency ms  p50 {result['p50']:.1f}  p90 {result['p90']:.1f}  "
+          f"p99 {result['p99']:.1f}  max {result['max']:.1f}")
+    if args.streams:
+        print(f"streams     {result['streams_open']} open, {result['streams_failed']} failed")
+
+
+if __name__ == '__main__':
+    main()
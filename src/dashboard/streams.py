@@ -0,0 +1,196 @@
+import os
+import time
+import queue
+import threading
+from collections import deque
+from utils.preview import PreviewReader
+
+
+def tail_lines(path, n=10, block_size=4096):
+    """Return the last n lines of a file by reading blocks backwards from the end.
+
+    Cost depends on n and the line length, not on the size of the file.
+    """
+    if n <= 0 or not os.path.exists(path):
+        return []
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b''
+        # n lines need n+1 newlines unless we reach the start of the file
+        while position > 0 and data.count(b'\n') <= n:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = data.decode('utf-8', errors='replace').splitlines()
+    return [line.strip() for line in lines[-n:] if line.strip()]
+
+
+class AlertBroadcaster:
+    """Follows an append-only log file once and fans new lines out to subscribers.
+
+    A single thread polls the file for growth, so any number of SSE clients
+    and /api/alerts pollers share one reader. The last `history` lines are
+    kept in memory while the follower runs. Slow subscribers lose their
+    oldest undelivered lines instead of holding the others back.
+    """
+
+    def __init__(self, path, poll_interval=0.5, history=100, queue_size=256):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.recent_lines = deque(maxlen=history)
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.offset = 0
+        self.inode = None
+
+    def subscribe(self, sink=None):
+        """Register a client and return the queue its new lines arrive on.
+
+        sink may be any object with put_nowait(), e.g. a bridge into an
+        asyncio queue; it must not block the follower thread.
+        """
+        q = sink if sink is not None else queue.Queue(maxsize=self.queue_size)
+        with self.lock:
+            self.subscribers.add(q)
+            if self.thread is None or not self.thread.is_alive():
+                # Follow from the current end; the history comes from a tail read
+                try:
+                    stat = os.stat(self.path)
+                    self.offset, self.inode = stat.st_size, stat.st_ino
+                except FileNotFoundError:
+                    self.offset, self.inode = 0, None
+                self.recent_lines.clear()
+                self.recent_lines.extend(tail_lines(self.path, self.recent_lines.maxlen))
+                self.stop_event.clear()
+                self.thread = threading.Thread(target=self._follow, daemon=True)
+                self.thread.start()
+        return q
+
+    def unsubscribe(self, q):
+        with self.lock:
+            self.subscribers.discard(q)
+
+    def recent(self, n=10):
+        """Last n lines, from memory while following, otherwise read from the tail"""
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return list(self.recent_lines)[-n:]
+        return tail_lines(self.path, n)
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def _read_new(self):
+        """Return complete lines appended since the last call"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            self.offset, self.inode = 0, stat.st_ino  # rotated or truncated
+        if stat.st_size == self.offset:
+            return []
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(stat.st_size - self.offset)
+        complete = data.rfind(b'\n') + 1  # leave a half-written last line for the next poll
+        self.offset += complete
+        return [line.strip() for line in data[:complete].decode('utf-8', errors='replace').splitlines() if line.strip()]
+
+    def _follow(self):
+        while not self.stop_event.wait(self.poll_interval):
+            lines = self._read_new()
+            with self.lock:
+                if not self.subscribers:
+                    self.thread = None
+                    return
+                self.recent_lines.extend(lines)
+                subscribers = list(self.subscribers)
+            for line in lines:
+                for q in subscribers:
+                    try:
+                        q.put_nowait(line)
+                    except queue.Full:
+                        try:
+                            q.get_nowait()
+                        except queue.Empty:
+                            pass
+                        q.put_nowait(line)
+
+
+class PreviewBroadcaster:
+    """Reads one session's preview frames once and hands them to every viewer.
+
+    While at least one viewer is connected a single thread keeps the
+    pipeline's viewer count and heartbeat fresh and picks up each new JPEG;
+    viewers wait on a condition for the next frame. With no viewers left the
+    thread reports zero viewers, which stops encoding in the pipeline, and
+    exits.
+    """
+
+    def __init__(self, name, poll_interval=1 / 30):
+        self.name = name
+        self.poll_interval = poll_interval
+        self.condition = threading.Condition()
+        self.viewers = 0
+        self.seq = 0
+        self.jpeg = None
+        self.thread = None
+        self.listeners = set()  # callables run on the reader thread after each new frame
+
+    def join(self):
+        with self.condition:
+            self.viewers += 1
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+
+    def leave(self):
+        with self.condition:
+            self.viewers -= 1
+
+    def frames(self, timeout=10.0):
+        """Yield each new JPEG; stops when no frame arrives within timeout"""
+        last = 0
+        while True:
+            with self.condition:
+                if not self.condition.wait_for(lambda: self.seq != last, timeout):
+                    return
+                last, jpeg = self.seq, self.jpeg
+            yield jpeg
+
+    def _run(self):
+        try:
+            reader = PreviewReader(self.name)
+        except FileNotFoundError:
+            with self.condition:
+                self.thread = None
+            return
+        try:
+            while True:
+                with self.condition:
+                    viewers = self.viewers
+                    if not viewers:
+                        self.thread = None
+                reader.set_viewers(viewers)
+                if not viewers:
+                    return
+                frame = reader.read(self.seq)
+                if frame:
+                    with self.condition:
+                        self.seq, self.jpeg = frame[0], frame[1]
+                        self.condition.notify_all()
+                        listeners = list(self.listeners)
+                    for listener in listeners:
+                        listener()
+                time.sleep(self.poll_interval)
+        finally:
+            reader.close()
@@ -1,12 +1,10 @@
-import pyaudio
 import numpy as np
 import threading
 from collections import deque
-import whisper
 import time
 
 class AudioMonitor:
-    def __init__(self, config):
+    def __init__(self, config, load_model=True):
         self.config = config['detection']['audio_monitoring']
         self.sample_rate = self.config['sample_rate']
         self.chunk_size = 512  # 32ms chunks for low latency
@@ -16,8 +14,11 @@ class AudioMonitor:
         self.audio_buffer = deque(maxlen=15)  # 480ms buffer
         self.alert_system = None
         self.alert_logger = None
+        self.levels_lock = threading.Lock()
+        self.loudest = None  # (energy, zcr) of the loudest chunk since take_levels()
         
-        if self.config['whisper_enabled']:
+        if self.config['whisper_enabled'] and load_model:
+            import whisper  # only needed when transcribing, not for replays
             self.whisper_model = whisper.load_model(self.config['whisper_model'])
         
     def start(self):
@@ -34,6 +35,7 @@ class AudioMonitor:
             
     def _run(self):
         """Main audio processing loop"""
+        import pyaudio
         p = pyaudio.PyAudio()
         stream = p.open(
             format=pyaudio.paInt16,
@@ -49,7 +51,11 @@ class AudioMonitor:
                 audio = np.frombuffer(data, dtype=np.int16)
                 self.audio_buffer.append(audio)
                 
-                if self._is_voice(audio):
+                levels = self._levels(audio)
+                with self.levels_lock:
+                    if self.loudest is None or levels[0] > self.loudest[0]:
+                        self.loudest = levels
+                if self.is_voice(levels):
                     self._handle_voice_detection()
                     
         finally:
@@ -57,17 +63,30 @@ class AudioMonitor:
             stream.close()
             p.terminate()
     
-    def _is_voice(self, audio):
-        """Ultra-fast voice detection"""
+    def _levels(self, audio):
+        """Energy and zero-crossing rate of one chunk, as float32"""
         audio_norm = audio / 32768.0
+        energy = np.mean(audio_norm**2)
+        zcr = np.mean(np.abs(np.diff(np.sign(audio_norm))))
+        return np.float32(energy), np.float32(zcr)
+
+    def take_levels(self):
+        """(energy, zcr) of the loudest chunk since the last call, None if no audio arrived"""
+        with self.levels_lock:
+            levels, self.loudest = self.loudest, None
+        return levels
+
+    def is_voice(self, levels):
+        """Ultra-fast voice detection on (energy, zcr) levels"""
+        if levels is None:
+            return False
+        energy, zcr = levels
         
         # 1. Energy detection
-        energy = np.mean(audio_norm**2)
         if energy < self.energy_threshold:
             return False
             
         # 2. Zero-crossing rate
-        zcr = np.mean(np.abs(np.diff(np.sign(audio_norm))))
         if zcr > self.zcr_threshold:
             return False
             
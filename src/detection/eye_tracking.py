@@ -1,29 +1,35 @@
-import cv2
-import mediapipe as mp
+import time
 import numpy as np
 from datetime import datetime
+from detection.landmarks import FaceLandmarker
+from utils.filters import OneEuroFilter
 
 class EyeTracker:
-    def __init__(self, config):
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5)
-        
+    # Landmark indices for left and right eyes
+    LEFT_EYE_INDICES = [33, 160, 158, 133, 153, 144]
+    RIGHT_EYE_INDICES = [362, 385, 387, 263, 373, 380]
+    NOSE_TIP = 4
+    LANDMARKS = LEFT_EYE_INDICES + RIGHT_EYE_INDICES + [NOSE_TIP]
+    EYES = np.array([LEFT_EYE_INDICES, RIGHT_EYE_INDICES])  # (2, 6) for both eyes at once
+
+    def __init__(self, config, landmarker=None):
+        self.landmarker = landmarker  # created on first track_eyes() if not shared
         self.config = config
-        self.eye_threshold = config['detection']['eyes']['gaze_threshold']
+        eyes_config = config['detection']['eyes']
+        self.eye_threshold = eyes_config['gaze_threshold']
+        self.gaze_sensitivity = eyes_config.get('gaze_sensitivity', 15)
+        smoothing = eyes_config.get('gaze_smoothing', {})
+        self.gaze_filter = OneEuroFilter(
+            min_cutoff=smoothing.get('min_cutoff', 1.0),
+            beta=smoothing.get('beta', 0.01),
+            d_cutoff=smoothing.get('d_cutoff', 1.0)
+        )
         self.last_gaze_change = datetime.now()
         self.gaze_direction = "center"  # Default value
         self.eye_ratio = 0.3  # Default open eye ratio
         self.gaze_changes = 0
         self.alert_logger = None
-        
-        # Landmark indices for left and right eyes
-        self.LEFT_EYE_INDICES = [33, 160, 158, 133, 153, 144]
-        self.RIGHT_EYE_INDICES = [362, 385, 387, 263, 373, 380]
-        
+
         # For EAR (Eye Aspect Ratio) calculation
         self.EYE_ASPECT_RATIO_THRESH = 0.3
         self.EYE_ASPECT_RATIO_CONSEC_FRAMES = 3
@@ -31,74 +37,58 @@ class EyeTracker:
     def set_alert_logger(self, alert_logger):
         self.alert_logger = alert_logger
 
-    def _calculate_ear(self, eye_points):
-        # Compute the euclidean distances between the two sets of
-        # vertical eye landmarks (x, y)-coordinates
-        A = np.linalg.norm(eye_points[1] - eye_points[5])
-        B = np.linalg.norm(eye_points[2] - eye_points[4])
-        
-        # Compute the euclidean distance between the horizontal
-        # eye landmark (x, y)-coordinates
-        C = np.linalg.norm(eye_points[0] - eye_points[3])
-        
-        # Compute the eye aspect ratio
-        ear = (A + B) / (2.0 * C)
-        return ear
+    def _calculate_ear(self, eyes):
+        """Eye aspect ratio of every eye in an (n_eyes, 6, 2) array of landmarks"""
+        # Distances between the two vertical landmark pairs (1-5, 2-4)
+        # and the horizontal pair (0-3) of each eye
+        vertical = np.linalg.norm(eyes[:, [1, 2]] - eyes[:, [5, 4]], axis=2).sum(axis=1)
+        horizontal = np.linalg.norm(eyes[:, 0] - eyes[:, 3], axis=1)
+        return vertical / (2.0 * horizontal)
 
     def track_eyes(self, frame):
+        if self.landmarker is None:
+            self.landmarker = FaceLandmarker(indices=self.LANDMARKS)
+        return self.evaluate(self.landmarker.infer(frame), frame.shape)
+
+    def evaluate(self, landmarks, frame_shape, timestamp=None):
+        """Gaze direction and eye ratio from FaceLandmarker output (None: no face)"""
         try:
-            # Convert frame to RGB and process
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.face_mesh.process(rgb_frame)
-            
-            if not results.multi_face_landmarks:
+            if landmarks is None:
                 return self.gaze_direction, self.eye_ratio  # Return last known values
-            
-            face_landmarks = results.multi_face_landmarks[0]
-            frame_h, frame_w = frame.shape[:2]
-            
-            # Get eye landmarks in pixel coordinates
-            left_eye_coords = np.array([(face_landmarks.landmark[i].x * frame_w, 
-                                       face_landmarks.landmark[i].y * frame_h) 
-                                      for i in self.LEFT_EYE_INDICES])
-            
-            right_eye_coords = np.array([(face_landmarks.landmark[i].x * frame_w, 
-                                        face_landmarks.landmark[i].y * frame_h) 
-                                       for i in self.RIGHT_EYE_INDICES])
-            
-            # Calculate Eye Aspect Ratio (EAR) for both eyes
-            left_ear = self._calculate_ear(left_eye_coords)
-            right_ear = self._calculate_ear(right_eye_coords)
-            self.eye_ratio = (left_ear + right_ear) / 2.0
-            
-            # Calculate gaze direction based on eye position
-            left_eye_center = np.mean(left_eye_coords, axis=0)
-            right_eye_center = np.mean(right_eye_coords, axis=0)
-            
-            # Calculate horizontal difference between eye centers and nose
-            nose_tip = np.array([face_landmarks.landmark[4].x * frame_w,
-                                face_landmarks.landmark[4].y * frame_h])
-            
-            left_diff = left_eye_center[0] - nose_tip[0]
-            right_diff = right_eye_center[0] - nose_tip[0]
-            horiz_diff = (left_diff + right_diff) / 2.0
-            
+
+            if timestamp is None:
+                timestamp = time.time()
+            frame_h, frame_w = frame_shape[:2]
+
+            # Both eyes as one (2, 6, 2) array in pixel coordinates
+            scale = np.array([frame_w, frame_h], dtype=np.float32)
+            eyes = landmarks[self.EYES] * scale
+            nose_tip = landmarks[self.NOSE_TIP] * scale
+
+            # Eye Aspect Ratio (EAR), averaged over both eyes
+            self.eye_ratio = float(self._calculate_ear(eyes).mean())
+
+            # Horizontal offset of the eye centres from the nose tip, smoothed
+            # over time so single-frame landmark jitter does not flip the gaze
+            horiz_diff = float(eyes[:, :, 0].mean() - nose_tip[0])
+            horiz_diff = self.gaze_filter.filter(horiz_diff, timestamp)
+
             # Determine gaze direction
             new_gaze = "center"
-            if horiz_diff < -15:  # Looking left
+            if horiz_diff < -self.gaze_sensitivity:  # Looking left
                 new_gaze = "left"
-            elif horiz_diff > 15:  # Looking right
+            elif horiz_diff > self.gaze_sensitivity:  # Looking right
                 new_gaze = "right"
-            
+
             # Update gaze changes
-            current_time = datetime.now()
+            current_time = datetime.fromtimestamp(timestamp)
             if new_gaze != self.gaze_direction:
                 self.gaze_changes += 1
                 self.gaze_direction = new_gaze
                 self.last_gaze_change = current_time
-                
+
             # Check for excessive eye movement
-            if (self.gaze_changes > 3 and 
+            if (self.gaze_changes > 3 and
                 (current_time - self.last_gaze_change).total_seconds() < 2 and
                 self.alert_logger):
                 self.alert_logger.log_alert(
@@ -106,9 +96,9 @@ class EyeTracker:
                     "Excessive eye movement detected"
                 )
                 self.gaze_changes = 0
-            
+
             return self.gaze_direction, self.eye_ratio
-            
+
         except Exception as e:
             if self.alert_logger:
                 self.alert_logger.log_alert(
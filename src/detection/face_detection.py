@@ -1,18 +1,35 @@
 import cv2
-import torch
-from facenet_pytorch import MTCNN
+import numpy as np
 from datetime import datetime
 
+
+def create_mtcnn():
+    # Imported here so replays can evaluate saved detections without torch
+    import torch
+    from facenet_pytorch import MTCNN
+    device = torch.device('cuda:0' if torch.cuda.is_available() else 'cpu')
+    return MTCNN(
+        keep_all=True,
+        post_process=False,
+        min_face_size=40,
+        thresholds=[0.6, 0.7, 0.7],
+        device=device
+    )
+
+
+def detect_boxes(detector, frame):
+    """MTCNN boxes (N, 4) and probabilities (N,) as float32, empty when no face"""
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    boxes, probs = detector.detect(rgb_frame)
+    if boxes is None or len(boxes) == 0:
+        return np.zeros((0, 4), np.float32), np.zeros(0, np.float32)
+    return np.asarray(boxes, np.float32), np.asarray(probs, np.float32)
+
+
 class FaceDetector:
-    def __init__(self, config):
-        self.device = torch.device('cuda:0' if torch.cuda.is_available() else 'cpu')
-        self.detector = MTCNN(
-            keep_all=True,
-            post_process=False,
-            min_face_size=40,
-            thresholds=[0.6, 0.7, 0.7],
-            device=self.device
-        )
+    def __init__(self, config, load_model=True):
+        # load_model=False only evaluates detections made elsewhere (replay)
+        self.detector = create_mtcnn() if load_model else None
         self.config = config
         self.detection_interval = config['detection']['face']['detection_interval']
         self.min_confidence = config['detection']['face']['min_confidence']
@@ -25,16 +42,20 @@ class FaceDetector:
     def set_alert_logger(self, alert_logger):
         self.alert_logger = alert_logger
 
-    def detect_face(self, frame):
+    def infer(self, frame):
+        return detect_boxes(self.detector, frame)
+
+    def detect_face(self, frame, timestamp=None):
         self.frame_count += 1
         if self.frame_count % self.detection_interval != 0:
             return self.face_present
-            
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        boxes, probs = self.detector.detect(rgb_frame)
-        
-        current_time = datetime.now()
-        if boxes is not None and len(boxes) > 0 and probs[0] > self.min_confidence:
+        return self.evaluate(self.infer(frame), timestamp)
+
+    def evaluate(self, detection, timestamp=None):
+        """Update face presence from one (boxes, probs) result of infer()"""
+        boxes, probs = detection
+        current_time = datetime.fromtimestamp(timestamp) if timestamp is not None else datetime.now()
+        if len(boxes) > 0 and probs[0] > self.min_confidence:
             if not self.face_present and self.face_disappeared_start:
                 disappearance_duration = (current_time - self.face_disappeared_start).total_seconds()
                 if disappearance_duration > 5 and self.alert_logger:
@@ -42,7 +63,7 @@ class FaceDetector:
                         "FACE_REAPPEARED",
                         f"Face reappeared after {disappearance_duration:.1f} seconds"
                     )
-            
+
             self.face_present = True
             self.last_face_time = current_time
             self.face_disappeared_start = None
@@ -50,7 +71,7 @@ class FaceDetector:
         else:
             if self.face_present:
                 self.face_disappeared_start = current_time
-                
+
             self.face_present = False
             if self.last_face_time and (current_time - self.last_face_time).total_seconds() > 5:
                 if self.alert_logger:
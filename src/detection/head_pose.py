@@ -0,0 +1,117 @@
+import math
+import cv2
+import numpy as np
+
+
+class HeadPoseEstimator:
+    """Head orientation from the shared FaceMesh landmarks.
+
+    The 3D face model and the per-resolution camera matrix are built once,
+    and solvePnP starts from the previous frame's pose, so a frame costs a
+    few refinement iterations. Angles are read straight off the rotation
+    matrix; pitch is measured from the model facing the camera, so a
+    frontal face is (0, 0, 0).
+    """
+
+    # FaceMesh landmarks: nose tip, chin, left/right eye corner, left/right mouth corner
+    LANDMARKS = [1, 199, 33, 263, 61, 291]
+    # Approximate 3D positions of the same points
+    MODEL_POINTS = np.array([
+        (0.0, 0.0, 0.0),
+        (0.0, -330.0, -65.0),
+        (-225.0, 170.0, -135.0),
+        (225.0, 170.0, -135.0),
+        (-150.0, -150.0, -125.0),
+        (150.0, -150.0, -125.0)
+    ])
+    DIST_COEFFS = np.zeros((4, 1))  # No lens distortion
+
+    def __init__(self, config):
+        head_config = config['detection'].get('head_pose', {})
+        self.yaw_threshold = head_config.get('yaw_threshold', 30)
+        self.pitch_down_threshold = head_config.get('pitch_down_threshold', 20)
+        self.pitch_up_threshold = head_config.get('pitch_up_threshold', 15)
+        self.camera_matrices = {}  # (w, h) -> camera matrix
+        self.rvec = None
+        self.tvec = None
+        self.angles = (0.0, 0.0, 0.0)  # pitch, yaw, roll in degrees
+        self.head_orientation = "Forward"
+        self.alert_logger = None
+
+    def set_alert_logger(self, alert_logger):
+        self.alert_logger = alert_logger
+
+    def _camera_matrix(self, w, h):
+        key = (w, h)
+        if key not in self.camera_matrices:
+            # Focal length approximated by the frame width, principal point at the centre
+            self.camera_matrices[key] = np.array([
+                [w, 0, w / 2],
+                [0, w, h / 2],
+                [0, 0, 1]
+            ], dtype=np.float64)
+        return self.camera_matrices[key]
+
+    @staticmethod
+    def _euler_angles(rmat):
+        """Pitch, yaw, roll in degrees of R = Rz(roll) Ry(yaw) Rx(pitch) (ZYX order)"""
+        pitch = math.degrees(math.atan2(rmat[2, 1], rmat[2, 2]))
+        yaw = math.degrees(math.atan2(-rmat[2, 0], math.hypot(rmat[0, 0], rmat[1, 0])))
+        roll = math.degrees(math.atan2(rmat[1, 0], rmat[0, 0]))
+        # The model's y axis points up and the image's down, so a frontal
+        # face has a pitch of 180; report it relative to facing the camera
+        return (pitch % 360) - 180, yaw, roll
+
+    def evaluate(self, landmarks, frame_shape):
+        """
+        Head orientation from FaceLandmarker output
+
+        Args:
+            landmarks (np.ndarray): (478, 2) normalised landmarks, None when no face
+            frame_shape (tuple): Shape of the frame the landmarks came from
+
+        Returns:
+            str: "Forward", "Looking Left", "Looking Right", "Looking Down" or "Looking Up";
+                "Forward" without a face, which FACE_DISAPPEARED already covers
+        """
+        if landmarks is None:
+            self.rvec = self.tvec = None  # the next face starts a fresh solve
+            self.head_orientation = "Forward"
+            return self.head_orientation
+
+        h, w = frame_shape[:2]
+        image_points = landmarks[self.LANDMARKS].astype(np.float64) * (w, h)
+        if np.isnan(image_points).any():
+            return self.head_orientation  # e.g. a replay log without these landmarks
+
+        camera_matrix = self._camera_matrix(w, h)
+        if self.rvec is None:
+            success, rvec, tvec = cv2.solvePnP(
+                self.MODEL_POINTS, image_points, camera_matrix, self.DIST_COEFFS
+            )
+        else:
+            success, rvec, tvec = cv2.solvePnP(
+                self.MODEL_POINTS, image_points, camera_matrix, self.DIST_COEFFS,
+                self.rvec.copy(), self.tvec.copy(), useExtrinsicGuess=True,
+                flags=cv2.SOLVEPNP_ITERATIVE
+            )
+        if not success:
+            self.rvec = self.tvec = None
+            return self.head_orientation
+        self.rvec, self.tvec = rvec, tvec
+
+        rmat, _ = cv2.Rodrigues(rvec)
+        self.angles = self._euler_angles(rmat)
+        pitch, yaw, _ = self.angles
+
+        head_orientation = "Forward"
+        if yaw > self.yaw_threshold:
+            head_orientation = "Looking Left"
+        elif yaw < -self.yaw_threshold:
+            head_orientation = "Looking Right"
+        elif pitch > self.pitch_down_threshold:
+            head_orientation = "Looking Down"
+        elif pitch < -self.pitch_up_threshold:
+            head_orientation = "Looking Up"
+        self.head_orientation = head_orientation
+        return head_orientation
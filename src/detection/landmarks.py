@@ -0,0 +1,38 @@
+import cv2
+import numpy as np
+from utils.replay_log import LANDMARK_COUNT
+
+
+class FaceLandmarker:
+    """Runs MediaPipe FaceMesh once per frame for every landmark consumer.
+
+    EyeTracker and MouthMonitor read the same (478, 2) array of normalised
+    x, y coordinates, so the mesh is computed once instead of per detector.
+    Given the indices its consumers read, only those landmarks are copied
+    out of the result and the rest of the array stays NaN.
+    """
+
+    def __init__(self, config=None, indices=None):
+        import mediapipe as mp  # only needed for live inference, not replays
+        self.indices = None if indices is None else sorted(set(indices))
+        self.empty = np.full((LANDMARK_COUNT, 2), np.nan, dtype=np.float32)
+        self.face_mesh = mp.solutions.face_mesh.FaceMesh(
+            max_num_faces=1,
+            refine_landmarks=True,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5)
+
+    def infer(self, frame):
+        """Landmarks of the first face as a float32 (478, 2) array, or None"""
+        results = self.face_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if not results.multi_face_landmarks:
+            return None
+        points = results.multi_face_landmarks[0].landmark
+        if self.indices is None:
+            return np.array([(p.x, p.y) for p in points], dtype=np.float32)
+        landmarks = self.empty.copy()
+        landmarks[self.indices] = np.fromiter(
+            (v for i in self.indices for v in (points[i].x, points[i].y)),
+            dtype=np.float32, count=2 * len(self.indices)
+        ).reshape(-1, 2)
+        return landmarks
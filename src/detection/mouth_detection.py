@@ -1,58 +1,46 @@
-import cv2
-import mediapipe as mp
-import numpy as np
+from detection.landmarks import FaceLandmarker
 
 class MouthMonitor:
-    def __init__(self, config):
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5)
-            
+    # Mouth landmarks: upper/lower inner lip, right/left corner
+    UPPER_LIP, LOWER_LIP, RIGHT_CORNER, LEFT_CORNER = 13, 14, 78, 306
+    LANDMARKS = [UPPER_LIP, LOWER_LIP, RIGHT_CORNER, LEFT_CORNER]
+
+    def __init__(self, config, landmarker=None):
+        self.landmarker = landmarker  # created on first monitor_mouth() if not shared
         self.mouth_threshold = config['detection']['mouth']['movement_threshold']
         self.mouth_movement_count = 0
         self.last_mouth_time = None
         self.alert_logger = None  # Will be set externally
-        
+
     def set_alert_logger(self, alert_logger):
         self.alert_logger = alert_logger
-        
+
     def monitor_mouth(self, frame):
-        results = self.face_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        
-        if not results.multi_face_landmarks:
+        if self.landmarker is None:
+            self.landmarker = FaceLandmarker(indices=self.LANDMARKS)
+        return self.evaluate(self.landmarker.infer(frame))
+
+    def evaluate(self, landmarks):
+        """Mouth movement from FaceLandmarker output (None: no face)"""
+        if landmarks is None:
             return False
-            
-        face_landmarks = results.multi_face_landmarks[0]
-        
-        # Get mouth landmarks (using more points for better accuracy)
-        mouth_points = [
-            13,  # Upper inner lip
-            14,  # Lower inner lip
-            78,  # Right corner
-            306,  # Left corner
-            312,  # Upper outer lip
-            317,  # Lower outer lip
-        ]
-        
+
         # Calculate mouth openness
-        upper_lip = face_landmarks.landmark[13].y
-        lower_lip = face_landmarks.landmark[14].y
+        upper_lip = landmarks[self.UPPER_LIP, 1]
+        lower_lip = landmarks[self.LOWER_LIP, 1]
         mouth_open = lower_lip - upper_lip
-        
+
         # Calculate mouth width
-        right_corner = face_landmarks.landmark[78].x
-        left_corner = face_landmarks.landmark[306].x
+        right_corner = landmarks[self.RIGHT_CORNER, 0]
+        left_corner = landmarks[self.LEFT_CORNER, 0]
         mouth_width = abs(right_corner - left_corner)
-        
+
         if mouth_open > 0.03 or mouth_width > 0.2:  # Thresholds for mouth movement
             self.mouth_movement_count += 1
-            
+
             if self.mouth_movement_count > self.mouth_threshold and self.alert_logger:
                 self.alert_logger.log_alert(
-                    "MOUTH_MOVEMENT", 
+                    "MOUTH_MOVEMENT",
                     "Excessive mouth movement detected (possible talking)"
                 )
                 self.mouth_movement_count = 0
@@ -1,32 +1,29 @@
-import cv2
-import torch
-from facenet_pytorch import MTCNN
+from detection.face_detection import create_mtcnn, detect_boxes
 
 class MultiFaceDetector:
-    def __init__(self, config):
-        self.device = torch.device('cuda:0' if torch.cuda.is_available() else 'cpu')
-        self.detector = MTCNN(
-            keep_all=True,
-            post_process=False,
-            min_face_size=40,
-            thresholds=[0.6, 0.7, 0.7],
-            device=self.device
-        )
+    def __init__(self, config, load_model=True):
+        # The pipeline passes FaceDetector's MTCNN result to evaluate() instead
+        self.detector = create_mtcnn() if load_model else None
         self.threshold = config['detection']['multi_face']['alert_threshold']
         self.consecutive_frames = 0
+        self.confidence = 0.0  # probability of the second most confident face
         self.alert_logger = None
 
     def set_alert_logger(self, alert_logger):
         self.alert_logger = alert_logger
 
     def detect_multiple_faces(self, frame):
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        boxes, probs = self.detector.detect(rgb_frame)
-        
-        if boxes is not None and len(boxes) > 1:
+        return self.evaluate(detect_boxes(self.detector, frame))
+
+    def evaluate(self, detection):
+        """Count confident faces in one (boxes, probs) MTCNN result"""
+        boxes, probs = detection
+        self.confidence = float(sorted(probs)[-2]) if len(probs) > 1 else 0.0
+
+        if len(boxes) > 1:
             # Count faces with high confidence
-            high_conf_faces = sum(p > 0.9 for p in probs)
-            
+            high_conf_faces = int(sum(p > 0.9 for p in probs))
+
             if high_conf_faces >= 2:
                 self.consecutive_frames += 1
                 if self.consecutive_frames >= self.threshold and self.alert_logger:
@@ -37,5 +34,5 @@ class MultiFaceDetector:
                     return True
         else:
             self.consecutive_frames = 0
-            
+
         return False
\ No newline at end of file
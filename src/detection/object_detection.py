@@ -72,12 +72,11 @@
 
 
 import cv2
-import torch
-from ultralytics import YOLO
+import numpy as np
 from datetime import datetime
 
 class ObjectDetector:
-    def __init__(self, config):
+    def __init__(self, config, load_model=True):
         self.config = config['detection']['objects']
         self.model = None
         self.class_map = {
@@ -87,11 +86,16 @@ class ObjectDetector:
         self.alert_logger = None
         self.detection_interval = self.config['detection_interval']
         self.frame_count = 0
-        self._initialize_model()
-        self.last_detection_time = datetime.now()
+        self.confidence = 0.0  # highest forbidden-object confidence of the last evaluate()
+        if load_model:
+            self._initialize_model()
+        self.last_detection_time = None  # the first infer() always runs
 
     def _initialize_model(self):
         """Initialize optimized YOLO model"""
+        # Imported here so replays can evaluate saved detections without torch
+        import torch
+        from ultralytics import YOLO
         try:
             # Use the smallest YOLOv8 model for speed
             self.model = YOLO('models/yolov8n.pt')
@@ -116,12 +120,26 @@ class ObjectDetector:
 
     def detect_objects(self, frame, visualize=False):
         """Optimized object detection with frame skipping"""
-        current_time = datetime.now()
-        time_since_last = (current_time - self.last_detection_time).total_seconds()
-        
+        return self.evaluate(self.infer(frame), frame if visualize else None)
+
+    def infer(self, frame, timestamp=None):
+        """
+        Run YOLO if the max_fps budget allows it
+
+        Args:
+            frame (np.ndarray): BGR frame
+            timestamp (float): Frame time in epoch seconds, defaults to now
+
+        Returns:
+            tuple: (boxes (N, 4) in frame pixels, confidences (N,), class ids (N,)),
+                or None when the frame was skipped or inference failed
+        """
+        current_time = datetime.fromtimestamp(timestamp) if timestamp is not None else datetime.now()
+
         # Skip detection if not enough time has passed
-        if time_since_last < (1.0 / self.config['max_fps']):
-            return False
+        if (self.last_detection_time is not None and
+                (current_time - self.last_detection_time).total_seconds() < 1.0 / self.config['max_fps']):
+            return None
             
         try:
             # Resize frame for faster processing (maintaining aspect ratio)
@@ -133,36 +151,18 @@ class ObjectDetector:
             # Run inference
             results = self.model(resized_frame, verbose=False)  # Disable logging
             
-            detected = False
-            for result in results:
-                for box in result.boxes:
-                    cls = int(box.cls)
-                    conf = float(box.conf)
-                    
-                    if cls in self.class_map and conf > self.config['min_confidence']:
-                        detected = True
-                        label = self.class_map[cls]
-                        
-                        if self.alert_logger:
-                            self.alert_logger.log_alert(
-                                "FORBIDDEN_OBJECT",
-                                f"Detected {label} with confidence {conf:.2f}"
-                            )
-                        
-                        if visualize:
-                            # Scale coordinates back to original frame size
-                            x1, y1, x2, y2 = box.xyxy[0]
-                            x1 = int(x1 * (orig_w / new_w))
-                            y1 = int(y1 * (orig_h / new_h))
-                            x2 = int(x2 * (orig_w / new_w))
-                            y2 = int(y2 * (orig_h / new_h))
-                            
-                            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 255), 2)
-                            cv2.putText(frame, f"{label} {conf:.2f}", (x1, y1-10),
-                                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
+            boxes = [result.boxes for result in results]
+            xyxy = np.concatenate([b.xyxy.cpu().numpy() for b in boxes]).reshape(-1, 4)
+            # Scale coordinates back to original frame size
+            xyxy *= np.array([orig_w / new_w, orig_h / new_h] * 2)
+            detections = (
+                xyxy.astype(np.float32),
+                np.concatenate([b.conf.cpu().numpy() for b in boxes]).astype(np.float32),
+                np.concatenate([b.cls.cpu().numpy() for b in boxes]).astype(np.int16)
+            )
             
             self.last_detection_time = current_time
-            return detected
+            return detections
             
         except Exception as e:
             if self.alert_logger:
@@ -170,4 +170,32 @@ class ObjectDetector:
                     "OBJECT_DETECTION_ERROR",
                     f"Object detection failed: {str(e)}"
                 )
-            return False
\ No newline at end of file
+            return None
+
+    def evaluate(self, detections, frame=None):
+        """Alert on forbidden objects in infer() output, drawing them on frame if given"""
+        self.confidence = 0.0
+        if detections is None:
+            return False
+
+        detected = False
+        for (x1, y1, x2, y2), conf, cls in zip(*detections):
+            cls, conf = int(cls), float(conf)
+            if cls in self.class_map and conf > self.config['min_confidence']:
+                detected = True
+                self.confidence = max(self.confidence, conf)
+                label = self.class_map[cls]
+                
+                if self.alert_logger:
+                    self.alert_logger.log_alert(
+                        "FORBIDDEN_OBJECT",
+                        f"Detected {label} with confidence {conf:.2f}"
+                    )
+                
+                if frame is not None:
+                    x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 255), 2)
+                    cv2.putText(frame, f"{label} {conf:.2f}", (x1, y1-10),
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
+        
+        return detected
\ No newline at end of file
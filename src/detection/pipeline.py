@@ -0,0 +1,115 @@
+import time
+import numpy as np
+from datetime import datetime
+
+from detection.face_detection import FaceDetector
+from detection.multi_face import MultiFaceDetector
+from detection.landmarks import FaceLandmarker
+from detection.eye_tracking import EyeTracker
+from detection.mouth_detection import MouthMonitor
+from detection.head_pose import HeadPoseEstimator
+from detection.object_detection import ObjectDetector
+
+
+class DetectionPipeline:
+    """Runs the frame detectors in two steps, infer() then evaluate().
+
+    infer() runs each model once per frame and returns its raw outputs:
+    the MTCNN result is shared by FaceDetector and MultiFaceDetector, the
+    FaceMesh landmarks by EyeTracker, MouthMonitor and HeadPoseEstimator.
+    evaluate() turns
+    those outputs into the results dict without touching a model, which is
+    what lets detection.replay re-run a session from its replay log.
+    """
+
+    def __init__(self, config, audio_monitor=None, load_models=True):
+        self.face_detector = FaceDetector(config, load_model=load_models)
+        self.multi_face_detector = MultiFaceDetector(config, load_model=False)
+        # Landmarks read by evaluate(), the only ones converted per frame and kept in a replay log
+        self.landmark_indices = sorted(
+            set(EyeTracker.LANDMARKS) | set(MouthMonitor.LANDMARKS) | set(HeadPoseEstimator.LANDMARKS)
+        )
+        self.landmarker = FaceLandmarker(config, self.landmark_indices) if load_models else None
+        self.eye_tracker = EyeTracker(config, self.landmarker)
+        self.mouth_monitor = MouthMonitor(config, self.landmarker)
+        self.head_pose_estimator = HeadPoseEstimator(config)
+        self.object_detector = ObjectDetector(config, load_model=load_models)
+        self.audio_monitor = audio_monitor
+        self.detectors = [
+            self.face_detector,
+            self.eye_tracker,
+            self.mouth_monitor,
+            self.multi_face_detector,
+            self.object_detector,
+            self.head_pose_estimator
+        ]
+        self.timings = {}  # per-model milliseconds of the last infer()
+
+    def set_alert_logger(self, alert_logger):
+        for detector in self.detectors:
+            detector.set_alert_logger(alert_logger)
+
+    def infer(self, frame, timestamp=None):
+        """
+        Run every model on one frame
+
+        Args:
+            frame (np.ndarray): BGR frame
+            timestamp (float): Frame time, paces the rate-limited object detector
+
+        Returns:
+            dict: 'faces' (boxes, probs), 'landmarks' (478, 2) array or None
+                (NaN outside landmark_indices),
+                'objects' (boxes, confidences, classes) or None when skipped,
+                'audio' (energy, zcr) or None
+        """
+        t0 = time.perf_counter()
+        faces = self.face_detector.infer(frame)
+        t1 = time.perf_counter()
+        landmarks = self.landmarker.infer(frame)
+        if landmarks is not None:
+            # Evaluate at the precision the replay log stores, so replays match exactly
+            landmarks = landmarks.astype(np.float16).astype(np.float32)
+        t2 = time.perf_counter()
+        objects = self.object_detector.infer(frame, timestamp)
+        t3 = time.perf_counter()
+        self.timings = {
+            'faces': (t1 - t0) * 1000,
+            'landmarks': (t2 - t1) * 1000,
+            'objects': (t3 - t2) * 1000
+        }
+        return {
+            'faces': faces,
+            'landmarks': landmarks,
+            'objects': objects,
+            'audio': self.audio_monitor.take_levels() if self.audio_monitor else None
+        }
+
+    def evaluate(self, outputs, frame_shape, timestamp):
+        """
+        Detection results for one frame from infer() outputs
+
+        Args:
+            outputs (dict): Return value of infer(), live or from a replay log
+            frame_shape (tuple): Shape of the frame the outputs came from
+            timestamp (float): Frame time in epoch seconds
+
+        Returns:
+            dict: Detection results keyed as in main_final
+        """
+        results = {'face_present': self.face_detector.evaluate(outputs['faces'], timestamp)}
+        results['gaze_direction'], results['eye_ratio'] = self.eye_tracker.evaluate(
+            outputs['landmarks'], frame_shape, timestamp
+        )
+        results['mouth_moving'] = self.mouth_monitor.evaluate(outputs['landmarks'])
+        results['head_pose'] = self.head_pose_estimator.evaluate(outputs['landmarks'], frame_shape)
+        results['multiple_faces'] = self.multi_face_detector.evaluate(outputs['faces'])
+        results['objects_detected'] = self.object_detector.evaluate(outputs['objects'])
+        results['audio_detected'] = bool(self.audio_monitor and self.audio_monitor.is_voice(outputs['audio']))
+        # Confidences of the detectors that report one, for the interval peak
+        results['confidences'] = {
+            'OBJECT_DETECTED': self.object_detector.confidence,
+            'MULTIPLE_FACES': self.multi_face_detector.confidence
+        }
+        results['timestamp'] = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+        return results
@@ -0,0 +1,161 @@
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import yaml
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from detection.pipeline import DetectionPipeline
+from detection.audio_detection import AudioMonitor
+from utils.intervals import IntervalTracker
+from utils.replay_log import ReplayLogReader
+from utils.rules import RulesEngine, extract_signals, signal_confidences
+
+
+class AlertCounter:
+    """Stands in for AlertLogger during a replay and only counts detector alerts"""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def log_alert(self, alert_type, message):
+        self.counts[alert_type] += 1
+
+
+def replay_session(config, path, stop_at_termination=True):
+    """
+    Re-evaluate detectors, rules and intervals over one replay log, without inference
+
+    Args:
+        config (dict): Configuration whose thresholds and rules are evaluated
+        path (str): Log written by the pipeline with replay_log.enabled
+        stop_at_termination (bool): End where the live session would have ended
+
+    Returns:
+        dict: Frame count, rule firings, intervals per type, detector alerts
+            and the time a termination rule was reached (None if never)
+    """
+    started = time.perf_counter()
+    reader = ReplayLogReader(path)
+    alerts = AlertCounter()
+    pipeline = DetectionPipeline(config, AudioMonitor(config, load_model=False), load_models=False)
+    pipeline.set_alert_logger(alerts)
+    rules_engine = RulesEngine(config)
+    interval_tracker = IntervalTracker(config)
+
+    fired_counts = Counter()
+    intervals = defaultdict(lambda: {'count': 0, 'duration': 0.0})
+    first = last = terminated_at = None
+    frames = 0
+
+    def add_intervals(events):
+        for event in events:
+            if event['end'] is not None:
+                intervals[event['type']]['count'] += 1
+                intervals[event['type']]['duration'] += event['duration']
+
+    try:
+        for timestamp, frame_shape, outputs in reader.frames():
+            frames += 1
+            first = timestamp if first is None else first
+            last = timestamp
+            results = pipeline.evaluate(outputs, frame_shape, timestamp)
+            signals = extract_signals(results)
+            _, fired = rules_engine.update(signals, timestamp)
+            add_intervals(interval_tracker.update(signal_confidences(signals, results), timestamp))
+            fired_counts.update(rule.name for rule in fired)
+            if terminated_at is None and rules_engine.should_terminate(fired):
+                terminated_at = timestamp
+                if stop_at_termination:
+                    break
+        add_intervals(interval_tracker.close_all())
+    finally:
+        reader.close()
+
+    return {
+        'path': path,
+        'session_id': reader.meta.get('session_id', os.path.basename(path)),
+        'frames': frames,
+        'duration': (last - first) if frames else 0.0,
+        'rules': dict(fired_counts),
+        'intervals': {t: dict(v) for t, v in intervals.items()},
+        'detector_alerts': dict(alerts.counts),
+        'terminated_at': terminated_at,
+        'seconds': time.perf_counter() - started
+    }
+
+
+def _replay(config, path, stop_at_termination):
+    try:
+        result = replay_session(config, path, stop_at_termination)
+        result['error'] = None
+    except Exception as e:
+        result = {'path': path, 'session_id': os.path.basename(path), 'error': str(e)}
+    return result
+
+
+def replay_cohort(config, paths, workers=None, stop_at_termination=True, progress=None):
+    """Replay many logs across a process pool, one session per task"""
+    workers = max(1, min(workers or os.cpu_count(), len(paths)))
+    results = []
+    if not paths:
+        return results
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_replay, config, path, stop_at_termination) for path in paths]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results.append(result)
+            if progress:
+                progress(done, len(paths), result)
+    return results
+
+
+def _print_progress(done, total, result):
+    if result['error']:
+        print(f"[{done}/{total}] {result['session_id']} ❌ {result['error']}")
+        return
+    ended = "terminated" if result['terminated_at'] is not None else "completed"
+    fired = ", ".join(f"{name} x{n}" for name, n in sorted(result['rules'].items())) or "no rules fired"
+    print(f"[{done}/{total}] {result['session_id']} {result['frames']} frames, {ended}: {fired}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-evaluate alert rules over recorded replay logs")
+    parser.add_argument('logs', nargs='+', help="Replay log files or directories containing *.replay")
+    parser.add_argument('--config', default=os.path.join(os.path.dirname(__file__), '..', '..', 'config.yaml'))
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--full', action='store_true', help="Keep evaluating after a termination rule is reached")
+    parser.add_argument('--output', help="Write the per-session results to this JSON file")
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+
+    paths = []
+    for path in args.logs:
+        paths.extend(sorted(glob.glob(os.path.join(path, '*.replay'))) if os.path.isdir(path) else [path])
+
+    started = time.perf_counter()
+    results = replay_cohort(config, paths, args.workers, not args.full, _print_progress)
+    replayed = [r for r in results if not r['error']]
+    frames = sum(r['frames'] for r in replayed)
+    print(f"Replayed {len(replayed)}/{len(results)} sessions, {frames} frames "
+          f"in {time.perf_counter() - started:.1f}s")
+    terminated = sum(r['terminated_at'] is not None for r in replayed)
+    print(f"  terminated: {terminated}/{len(replayed)}")
+    sessions_fired = Counter(name for r in replayed for name in r['rules'])
+    for name, count in sorted(sessions_fired.items()):
+        print(f"  {name}: fired in {count} sessions")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 1 if len(replayed) < len(results) else 0
+
+
+if __name__ == "__main__":
+    # Run from src/ as: python -m detection.replay logs/replay [--config other.yaml]
+    sys.exit(main())
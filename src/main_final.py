@@ -4,77 +4,112 @@ import yaml
 import time
 import pygame
 import sys
+import signal
+import argparse
+import threading
 from datetime import datetime
 
 # --- Imports from your existing modules ---
-from detection.face_detection import FaceDetector
-from detection.eye_tracking import EyeTracker
-from detection.mouth_detection import MouthMonitor
-from detection.object_detection import ObjectDetector
-from detection.multi_face import MultiFaceDetector
+from detection.pipeline import DetectionPipeline
 from detection.audio_detection import AudioMonitor
 from utils.video_utils import VideoRecorder
 from utils.screen_capture import ScreenRecorder
 from utils.logging import AlertLogger
 from utils.alert_system import AlertSystem
 from utils.violation_logger import ViolationLogger
+from utils.violation_store import ViolationStore
+from utils.intervals import IntervalTracker
+from utils.rules import RulesEngine, extract_signals, signal_confidences
+from utils.screenshot_utils import ViolationCapturer
+from utils.evidence_clips import EvidenceRecorder
+from utils.annotations import AnnotationWriter
+from utils.overlay import display_detection_results, display_termination_banner
+from utils.control import ControlServer
+from utils.live_state import LiveStatePublisher, segment_name
+from utils.preview import PreviewPublisher
+from utils.replay_log import ReplayLogWriter
+from utils.frame_sources import open_frame_source
 from reporting.report_generator import ReportGenerator
-from ai_proctoring import ProctorAI
+
+
+WINDOW_NAME = "Enhanced Online Proctoring System"
 
 
 # ---------- CONFIG ----------
-def load_config():
-    cfg_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml')
-    with open(cfg_path, 'r') as f:
-        return yaml.safe_load(f)
-
-
-# ---------- DISPLAY ----------
-def display_detection_results(frame, results, current_alert, unique_alert_count, total_alert_types):
-    h, w = frame.shape[:2]
-
-    # --- Header Bar ---
-    cv2.rectangle(frame, (0, 0), (w, 60), (25, 25, 112), -1)
-    cv2.putText(frame, "Enhanced Online Proctoring System", (20, 30),
-                cv2.FONT_HERSHEY_TRIPLEX, 0.6, (255, 255, 255), 2)
-    cv2.putText(frame, results['timestamp'], (w - 220, 50),
-                cv2.FONT_HERSHEY_TRIPLEX, 0.6, (255, 255, 255), 2)
-
-    # --- Status Line ---
-    cv2.rectangle(frame, (0, 65), (w, 95), (230, 230, 230), -1)
-    status = (
-        f"Face: {'Present' if results['face_present'] else 'Absent'}   Gaze: {results['gaze_direction']}   "
-        f"Eyes: {'Open' if results['eye_ratio'] > 0.25 else 'Closed'}   Mouth: {'Moving' if results['mouth_moving'] else 'Still'}"
-    )
-    cv2.putText(frame, status, (15, 85), cv2.FONT_HERSHEY_TRIPLEX, 0.5, (0, 0, 0), 2)
-
-    # --- Alert Bar ---
-    cv2.rectangle(frame, (0, h - 40), (w, h), (0, 215, 255), -1)
-    if current_alert:
-        alert_display = f"ALERT: {current_alert} | Unique Alerts: {unique_alert_count}/{total_alert_types}"
-    else:
-        alert_display = "Status: All clear"
-    cv2.putText(frame, alert_display, (15, h - 12),
-                cv2.FONT_HERSHEY_TRIPLEX, 0.6, (0, 0, 0), 2)
+def load_config(cfg_path=None):
+    candidates = [cfg_path] if cfg_path else [
+        os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml'),
+        os.path.join(os.path.dirname(__file__), '..', 'config.yaml')
+    ]
+    for path in candidates:
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                return yaml.safe_load(f)
+    raise FileNotFoundError(f"Config file not found: {', '.join(candidates)}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Enhanced Online Proctoring System")
+    parser.add_argument('--config', help="Path to config.yaml")
+    parser.add_argument('--headless', action='store_true',
+                        help="Run without a display window or overlay rendering")
+    parser.add_argument('--control-port', type=int,
+                        help="Localhost port accepting 'stop'/'status' commands")
+    parser.add_argument('--source',
+                        help="Device index, video file, image directory or 'synthetic'")
+    parser.add_argument('--fast', action='store_true',
+                        help="Read file/synthetic sources as fast as possible instead of in real time")
+    return parser.parse_args()
 
 
 # ---------- MAIN ----------
-def main():
+def main(args=None):
+    args = args or parse_args()
+
     # Load configuration
-    config = load_config()
+    config = load_config(args.config)
+    if args.fast:
+        config['video']['realtime'] = False
+    runtime = config.get('runtime', {})
+    headless = args.headless or runtime.get('headless', False)
+    control_port = args.control_port if args.control_port is not None else runtime.get('control_port', 0)
+
+    # --- Stop signals (SIGTERM and the optional control socket) ---
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+
+    student_info = {
+        'id': 'STUDENT_001',
+        'name': 'John Doe',
+        'exam': 'Final Examination',
+        'course': 'Computer Science 101'
+    }
 
     # Initialize components
-    alert_logger = AlertLogger(config)
+    store = ViolationStore(config)
+    session_id = store.start_session(student_info)
+    alert_logger = AlertLogger(config, store, session_id)
+    violation_logger = ViolationLogger(config, store, session_id)
+    interval_tracker = IntervalTracker(config)
+    violation_capturer = ViolationCapturer(config)
+    evidence_recorder = EvidenceRecorder(config)
     video_recorder = VideoRecorder(config)
     screen_recorder = ScreenRecorder(config)
     audio_monitor = AudioMonitor(config)
-    alert_system = AlertSystem(config)  # Initialize alert system
+    report_generator = ReportGenerator(config, store)
+
+    # --- Voice alerts and alert sounds (pygame.mixer), skipped headless or without an audio device ---
+    alert_system = None
+    if not headless:
+        try:
+            alert_system = AlertSystem(config)
+        except Exception as e:
+            print(f"⚠ Audio alerts disabled: {e}")
     audio_monitor.alert_system = alert_system  # Connect alert system to audio monitor
-    report_generator = ReportGenerator(config)
 
-    # --- Initialize pygame for alert sounds ---
-    pygame.mixer.init()
     def play_alert_sound():
+        if alert_system is None:
+            return
         try:
             sound_path = os.path.join(os.path.dirname(__file__), '..', 'assets', 'alert.wav')
             pygame.mixer.music.load(sound_path)
@@ -82,110 +117,150 @@ def main():
         except Exception:
             pass
 
-    # --- Audio Monitoring ---
-    if config['detection']['audio_monitoring']:
-        audio_monitor.start()
-
-    # --- Detectors ---
-    detectors = [
-        FaceDetector(config),
-        EyeTracker(config),
-        MouthMonitor(config),
-        MultiFaceDetector(config),
-        ObjectDetector(config)
-    ]
-
-    # Set alert logger for all detectors
-    for detector in detectors:
-        if hasattr(detector, 'set_alert_logger'):
-            detector.set_alert_logger(alert_logger)
-
-    # --- Webcam Setup ---
-    cap = cv2.VideoCapture(config['video'].get('source', 0), cv2.CAP_DSHOW)
-    if not cap.isOpened():
-        print("❌ Webcam not accessible. Check permissions or try different source index.")
-        return
-
-    print("✅ Webcam initialized successfully.")
-    print("👉 Press 'Q' to quit at any time.")
-
-    # --- Set up full screen window ---
-    cv2.namedWindow("Enhanced Online Proctoring System", cv2.WINDOW_NORMAL)
-    cv2.setWindowProperty("Enhanced Online Proctoring System", cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-    # Force full screen mode
-    cv2.resizeWindow("Enhanced Online Proctoring System", 1920, 1080)
-
-    # --- Recording setup ---
-    video_recorder.start_recording()
-    if config['screen']['recording']:
-        screen_recorder.start_recording()
-
-    # --- Alert System Variables ---
-    alert_types = {
-        "Face disappear": False,
-        "Mobile detected": False,
-        "Don't speak, mouth movement": False,
-        "Audio detected, don't talk": False,
-        "Look straight": False,
-        "Multiple faces detected": False
-    }
-    total_alert_types = len(alert_types)
+    # Everything below is torn down in the finally block, also when setup fails part-way
+    audio_monitoring = bool(config['detection']['audio_monitoring'])
+    cap = replay_log = annotation_writer = control_server = live_state = preview = None
+    full_session_recording = screen_recording = False
+    frame_index = 0
     unique_alert_count = 0
-    last_alert_time = 0
-    cooldown = 2  # seconds between alerts
-    active_alerts = {}  # Dictionary to track active alerts with timestamps
-    alert_display_duration = 2  # seconds to display each alert
 
     try:
-        while True:
+        # --- Audio Monitoring ---
+        if audio_monitoring:
+            audio_monitor.start()
+
+        # --- Detectors (each model runs once per frame, outputs shared between detectors) ---
+        pipeline = DetectionPipeline(config, audio_monitor)
+        pipeline.set_alert_logger(alert_logger)
+
+        # Raw detector outputs for re-evaluating thresholds later with detection.replay
+        replay_config = config.get('replay_log', {})
+        if replay_config.get('enabled', False):
+            os.makedirs(replay_config.get('path', './logs/replay'), exist_ok=True)
+            replay_log = ReplayLogWriter(
+                os.path.join(replay_config.get('path', './logs/replay'), f"{session_id}.replay"),
+                pipeline.landmark_indices,
+                {'session_id': session_id, 'started': time.time()},
+                replay_config.get('block_frames', 300)
+            )
+
+        # --- Frame Source Setup ---
+        cap = open_frame_source(config, args.source)
+        if not cap.isOpened():
+            print("❌ Frame source not accessible. Check permissions or try a different source.")
+            return
+
+        print(f"✅ Frame source initialized: {type(cap).__name__}")
+
+        if headless:
+            print("👉 Running headless. Send SIGTERM or 'stop' to the control port to end the session.")
+        else:
+            print("👉 Press 'Q' to quit at any time.")
+
+            # --- Set up full screen window ---
+            cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
+            cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+            # Force full screen mode
+            cv2.resizeWindow(WINDOW_NAME, 1920, 1080)
+
+        # --- Recording setup ---
+        full_session_recording = config['video'].get('full_session_recording', True)
+        if full_session_recording:
+            video_recorder.start_recording()
+        evidence_recorder.start()
+        if config['screen']['recording']:
+            screen_recorder.on_screen_change = lambda ts, score: violation_logger.log_violation(
+                "SCREEN_CHANGED", ts, {'score': round(score, 1)}
+            )
+            screen_recorder.start_recording()
+            screen_recording = True
+
+        # Detection results go to a sidecar track instead of being burned into the recording
+        if full_session_recording:
+            annotations_path = os.path.splitext(video_recorder.filename)[0] + "_annotations.jsonl"
+        else:
+            os.makedirs(config['video']['recording_path'], exist_ok=True)
+            annotations_path = os.path.join(config['video']['recording_path'], f"{session_id}_annotations.jsonl")
+        annotation_writer = AnnotationWriter(annotations_path)
+
+        if control_port:
+            control_server = ControlServer(control_port, stop_event, lambda: {
+                'session_id': session_id,
+                'frames': frame_index,
+                'unique_alerts': unique_alert_count
+            })
+            control_server.start()
+            print(f"🔌 Control socket listening on 127.0.0.1:{control_server.port}")
+
+        # Latest results, FPS and stage timings for the dashboard's /api/stats
+        if runtime.get('live_state', True):
+            # One segment per session, registered in the store for the dashboard to find
+            live_state_prefix = runtime.get('live_state_name', 'proctoring_live')
+            live_state_name = segment_name(live_state_prefix, session_id)
+            live_state = LiveStatePublisher(live_state_name)
+            store.set_live_segment(session_id, live_state_name)
+            # Dashboard preview, only encoded while someone is watching
+            if config.get('preview', {}).get('enabled', True):
+                preview = PreviewPublisher(segment_name(f"{live_state_prefix}_pv", session_id), config)
+        fps = 0.0
+        last_frame_time = None
+
+        # --- Alert rules (config.yaml rules: and termination:) ---
+        rules_engine = RulesEngine(config)
+        total_alert_types = rules_engine.termination_count
+        announced_rules = set()
+        active_alerts = {}  # Dictionary to track active alerts with timestamps
+        alert_display_duration = 2  # seconds to display each alert
+
+        while not stop_event.is_set():
             ret, frame = cap.read()
             if not ret:
-                print("⚠ Frame not captured from webcam.")
+                print("⚠ No more frames from source.")
                 break
+            # Wall clock for live sources, stream position for --fast/non-realtime runs
+            frame_time = cap.timestamp()
+            frame_index += 1
+            if last_frame_time is not None and frame_time > last_frame_time:
+                fps = 0.9 * fps + 0.1 / (frame_time - last_frame_time) if fps else 1.0 / (frame_time - last_frame_time)
+            last_frame_time = frame_time
+            video_recorder.record_frame(frame, frame_time)
+            evidence_recorder.push(frame, frame_time)
+            if preview:
+                preview.offer(frame, frame_time)
 
             # --- Detection Results ---
             results = {
                 'face_present': False,
                 'gaze_direction': 'Center',
                 'eye_ratio': 0.3,
+                'head_pose': 'Forward',
                 'mouth_moving': False,
                 'multiple_faces': False,
                 'objects_detected': False,
                 'emotion': 'Neutral',
                 'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'audio_detected': audio_monitor.is_noise_detected() if hasattr(audio_monitor, 'is_noise_detected') else False
+                'audio_detected': False
             }
 
+            timings = {}  # per-stage milliseconds
             try:
-                results['face_present'] = detectors[0].detect_face(frame)
-                results['gaze_direction'], results['eye_ratio'] = detectors[1].track_eyes(frame)
-                results['mouth_moving'] = detectors[2].monitor_mouth(frame)
-                results['multiple_faces'] = detectors[3].detect_multiple_faces(frame)
-                results['objects_detected'] = detectors[4].detect_objects(frame)
-                if hasattr(audio_monitor, 'is_noise_detected') and audio_monitor.is_noise_detected():
-                    results['audio_detected'] = True
+                outputs = pipeline.infer(frame, frame_time)
+                t0 = time.perf_counter()
+                results.update(pipeline.evaluate(outputs, frame.shape, frame_time))
+                timings = dict(pipeline.timings, evaluate=(time.perf_counter() - t0) * 1000)
+                if replay_log:
+                    replay_log.write(frame_time, frame.shape, outputs)
             except Exception as e:
                 print("Detection Error:", e)
 
             # --- Alert Conditions ---
-            triggered_alerts = []
-            if not results['face_present']:
-                triggered_alerts.append("Face disappear")
-            if results['objects_detected']:
-                triggered_alerts.append("Mobile detected")
-            if results['mouth_moving']:
-                triggered_alerts.append("Don't speak, mouth movement")
-            if results['audio_detected']:
-                triggered_alerts.append("Audio detected, don't talk")
-            if results['gaze_direction'] not in ['Center', 'center']:
-                triggered_alerts.append("Look straight")
-            if results['multiple_faces']:
-                triggered_alerts.append("Multiple faces detected")
+            signals = extract_signals(results)
+            satisfied_rules, fired_rules = rules_engine.update(signals, frame_time)
 
             # --- Update active alerts with timestamps ---
             now = time.time()
-            for alert in triggered_alerts:
-                active_alerts[alert] = now
+            for rule in satisfied_rules:
+                active_alerts[rule.message] = now
 
             # --- Remove expired alerts ---
             expired_alerts = [alert for alert, timestamp in active_alerts.items()
@@ -196,71 +271,115 @@ def main():
             # --- Set current alerts for display (only active ones) ---
             current_alert = " | ".join(sorted(active_alerts.keys())) if active_alerts else ""
 
-            # --- Update unique alerts ---
-            if triggered_alerts and (now - last_alert_time > cooldown):
-                for a in triggered_alerts:
-                    if a in alert_types and not alert_types[a]:
-                        alert_types[a] = True
-                        play_alert_sound()
-                        # Trigger voice alert for each new alert type
-                        if a == "Face disappear":
-                            alert_system.speak_alert("FACE_DISAPPEARED")
-                        elif a == "Mobile detected":
-                            alert_system.speak_alert("OBJECT_DETECTED")
-                        elif a == "Don't speak, mouth movement":
-                            alert_system.speak_alert("MOUTH_MOVING")
-                        elif a == "Audio detected, don't talk":
-                            alert_system.speak_alert("VOICE_DETECTED")
-                        elif a == "Look straight":
-                            alert_system.speak_alert("GAZE_AWAY")
-                        elif a == "Multiple faces detected":
-                            alert_system.speak_alert("MULTIPLE_FACES")
-                        print(f"⚠ Alert Triggered: {a}")
-
-                unique_alert_count = sum(1 for v in alert_types.values() if v)
-                last_alert_time = now
-
-            # --- Termination after all unique alerts ---
-            if unique_alert_count == total_alert_types:
-                cv2.rectangle(frame, (0, frame.shape[0] - 60),
-                              (frame.shape[1], frame.shape[0]), (0, 0, 255), -1)
-                cv2.putText(frame, "Session Terminated - All Alerts Triggered 🚫",
-                            (20, frame.shape[0] - 20),
-                            cv2.FONT_HERSHEY_DUPLEX, 0.8, (255, 255, 255), 2)
-                cv2.imshow("Enhanced Online Proctoring System", frame)
-                cv2.waitKey(3000)
-                print("Session terminated: All alert types triggered.")
+            # --- Log violations as intervals: evidence on open, duration on close ---
+            for event in interval_tracker.update(signal_confidences(signals, results), frame_time):
+                if event['end'] is None:
+                    capture = violation_capturer.capture_violation(frame, event['type'], frame_time)
+                    violation_logger.log_interval(event, {
+                        'gaze_direction': results['gaze_direction'],
+                        'eye_ratio': results['eye_ratio'],
+                        'image_path': capture['image_path'],
+                        'clip_path': evidence_recorder.trigger(event['type'], frame_time)
+                    })
+                else:
+                    violation_logger.log_interval(event)
+
+            # --- Fired rules: log, and sound/voice the first time each rule fires ---
+            for rule in fired_rules:
+                alert_logger.log_alert(rule.name, rule.message)
+                if rule.name not in announced_rules:
+                    announced_rules.add(rule.name)
+                    play_alert_sound()
+                    if rule.speak and alert_system:
+                        alert_system.speak_alert(rule.speak)
+                    print(f"⚠ Alert Triggered: {rule.message}")
+            unique_alert_count = rules_engine.distinct_fired()
+
+            annotation_writer.write(frame_time, frame_index, results, current_alert,
+                                    unique_alert_count, total_alert_types)
+            if live_state:
+                session_stats = violation_logger.stats
+                live_state.publish({
+                    'session_id': session_id,
+                    'preview': preview.name if preview else None,
+                    'updated_at': time.time(),  # the dashboard checks staleness on the wall clock
+                    'frame_index': frame_index,
+                    'fps': round(fps, 1),
+                    'timings': {stage: round(ms, 2) for stage, ms in timings.items()},
+                    'results': results,
+                    'current_alert': current_alert,
+                    'unique_alerts': unique_alert_count,
+                    'total_alert_types': total_alert_types,
+                    'open_intervals': interval_tracker.active(),
+                    'violations': session_stats.total,
+                    'severity_score': session_stats.severity_score
+                })
+
+            # --- Termination (termination: rules in config.yaml) ---
+            if rules_engine.should_terminate(fired_rules):
+                reason = rules_engine.termination_reason(fired_rules)
+                if not headless:
+                    display_frame = frame.copy()
+                    display_termination_banner(display_frame, reason)
+                    cv2.imshow(WINDOW_NAME, display_frame)
+                    cv2.waitKey(3000)
+                print(f"Session terminated: {reason}.")
                 break
 
-            # --- Display Results ---
-            display_detection_results(frame, results, current_alert, unique_alert_count, total_alert_types)
-            video_recorder.record_frame(frame)
-            cv2.imshow("Enhanced Online Proctoring System", frame)
+            if headless:
+                continue
+
+            # --- Display Results (on a copy, the recorder still holds the raw frame) ---
+            display_frame = frame.copy()
+            display_detection_results(display_frame, results, current_alert, unique_alert_count, total_alert_types)
+            cv2.imshow(WINDOW_NAME, display_frame)
 
             # --- Quit manually ---
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 print("🟡 Session terminated by user.")
                 break
 
+        if stop_event.is_set():
+            print("🟡 Session stopped by signal.")
+
     finally:
         # Cleanup
-        if config['screen']['recording']:
+        if audio_monitoring:
+            audio_monitor.stop()
+        if screen_recording:
             screen_recorder.stop_recording()
-        video_recorder.stop_recording()
-        if cap.isOpened():
+        if full_session_recording:
+            video_stats = video_recorder.stop_recording()
+            if video_stats and video_stats['dropped_frames']:
+                print(f"⚠ Video encoder dropped {video_stats['dropped_frames']} frames "
+                      f"(max backlog {video_stats['max_backlog']})")
+        evidence_recorder.stop()
+        if annotation_writer:
+            annotation_writer.close()
+        if replay_log:
+            replay_log.close()
+        if live_state:
+            live_state.close()
+        if preview:
+            preview.close()
+        if cap and cap.isOpened():
             cap.release()
-        cv2.destroyAllWindows()
+        if control_server:
+            control_server.stop()
+        if not headless:
+            cv2.destroyAllWindows()
         pygame.quit()
 
         # --- Report Generation ---
-        student_info = {
-            'id': 'STUDENT_001',
-            'name': 'John Doe',
-            'exam': 'Final Examination',
-            'course': 'Computer Science 101'
-        }
-        violations = [f"Alert {i+1}" for i in range(unique_alert_count)]
-        report_path = report_generator.generate_report(student_info, violations)
+        for event in interval_tracker.close_all():
+            violation_logger.log_interval(event)
+        violation_logger.close()
+        violation_capturer.close()
+        store.end_session(session_id)
+        report_path = report_generator.generate_session_report(
+            session_id, student_info, stats=violation_logger.stats.snapshot()
+        )
+        store.close()
         print(f"✅ Report generated: {report_path}")
 
 
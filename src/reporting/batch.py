@@ -0,0 +1,105 @@
+import os
+import sys
+import time
+import argparse
+import logging
+import yaml
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from reporting.report_generator import ReportGenerator
+from utils.violation_store import ViolationStore
+
+# One generator per worker process, created by _init_worker
+_generator = None
+
+
+def _init_worker(config):
+    """Open the store and compile the report template once per worker"""
+    global _generator
+    _generator = ReportGenerator(config, ViolationStore(config))
+    _generator.template = _generator.template_env.get_template('base_report.html')
+
+
+def _generate(session_id, output_format):
+    started = time.perf_counter()
+    try:
+        path = _generator.generate_session_report(session_id, output_format=output_format)
+        error = None if path else "report generation failed (see ReportGenerator log)"
+    except Exception as e:
+        path, error = None, str(e)
+    return {
+        'session_id': session_id,
+        'path': path,
+        'error': error,
+        'seconds': time.perf_counter() - started
+    }
+
+
+def _print_progress(done, total, result):
+    status = "✅" if result['error'] is None else f"❌ {result['error']}"
+    print(f"[{done}/{total}] {result['session_id']} {status} ({result['seconds']:.1f}s)")
+
+
+def generate_batch_reports(config, session_ids, output_format='pdf', workers=None, progress=_print_progress):
+    """
+    Render reports for many sessions across a process pool
+    
+    Args:
+        config (dict): Configuration dictionary from YAML
+        session_ids (list): Sessions recorded in the violation store
+        output_format (str): 'pdf' or 'html'
+        workers (int): Worker processes, defaults to reporting.batch_workers or the CPU count
+        progress (callable): Called as progress(done, total, result) after each report
+        
+    Returns:
+        list: One result dict per session with 'path' or 'error'
+    """
+    workers = workers or config.get('reporting', {}).get('batch_workers') or os.cpu_count()
+    workers = max(1, min(workers, len(session_ids)))
+    results = []
+    if not session_ids:
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config,)) as pool:
+        futures = [pool.submit(_generate, session_id, output_format) for session_id in session_ids]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results.append(result)
+            if progress:
+                progress(done, len(session_ids), result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate reports for a whole exam cohort")
+    parser.add_argument('--config', default=os.path.join(os.path.dirname(__file__), '..', '..', 'config.yaml'))
+    parser.add_argument('sessions', nargs='*', help="Session ids (default: all sessions in the store)")
+    parser.add_argument('--since', help="Only sessions started at or after this timestamp")
+    parser.add_argument('--limit', type=int, default=10000)
+    parser.add_argument('--format', default='pdf', choices=['pdf', 'html'])
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+
+    session_ids = args.sessions
+    if not session_ids:
+        store = ViolationStore(config)
+        session_ids = [s['id'] for s in store.list_sessions(limit=args.limit, since=args.since)]
+        store.close()
+
+    started = time.perf_counter()
+    results = generate_batch_reports(config, session_ids, args.format, args.workers)
+    failed = [r for r in results if r['error']]
+    print(f"Generated {len(results) - len(failed)}/{len(results)} reports "
+          f"in {time.perf_counter() - started:.1f}s")
+    for result in failed:
+        print(f"  {result['session_id']}: {result['error']}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    # Run from src/ as: python -m reporting.batch [session ...]
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+from reporting.report_generator import ReportGenerator
+
+VIOLATION_TYPES = ['FACE_DISAPPEARED', 'GAZE_AWAY', 'MOUTH_MOVING', 'MULTIPLE_FACES', 'OBJECT_DETECTED']
+
+
+def make_violations(count, start=None):
+    """Deterministic synthetic violations spread over an hour-long exam, every
+    other one an interval with a duration like ViolationLogger writes"""
+    start = start or datetime(2025, 1, 1, 9, 0, 0)
+    step = 3600.0 / max(count, 1)
+    violations = []
+    for i in range(count):
+        violation = {
+            'type': VIOLATION_TYPES[i % len(VIOLATION_TYPES)],
+            'timestamp': (start + timedelta(seconds=i * step)).strftime("%Y%m%d_%H%M%S_%f"),
+            'metadata': {'gaze_direction': 'left', 'eye_ratio': 0.28}
+        }
+        if i % 2 == 0:
+            violation.update(duration=step / 2, frame_count=int(step / 2 * 30) + 1)
+        violations.append(violation)
+    return violations
+
+
+def run(backend, reports, violations, output_dir):
+    """Generate `reports` PDFs with one backend and return seconds per report"""
+    config = {'reporting': {'output_dir': output_dir, 'pdf_backend': backend}}
+    generator = ReportGenerator(config)
+    timings = []
+    for i in range(reports):
+        student = {'id': f"BENCH_{backend}_{i}", 'name': 'Benchmark Student', 'exam': 'Benchmark'}
+        started = time.perf_counter()
+        path = generator.generate_report(student, violations, 'pdf')
+        timings.append(time.perf_counter() - started)
+        if path is None:
+            return None
+    return sum(timings) / len(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare native and wkhtmltopdf PDF report rendering")
+    parser.add_argument('--reports', type=int, default=20)
+    parser.add_argument('--violations', type=int, default=200)
+    args = parser.parse_args()
+
+    violations = make_violations(args.violations)
+    output_dir = tempfile.mkdtemp(prefix='pdf_bench_')
+    try:
+        for backend in ('native', 'wkhtmltopdf'):
+            if backend == 'wkhtmltopdf' and not shutil.which('wkhtmltopdf'):
+                print(f"{backend:12s} skipped (wkhtmltopdf not on PATH)")
+                continue
+            seconds = run(backend, args.reports, violations, output_dir)
+            if seconds is None:
+                print(f"{backend:12s} failed")
+            else:
+                print(f"{backend:12s} {seconds * 1000:8.1f} ms/report over {args.reports} reports")
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    # Run from src/ as: python -m reporting.bench_pdf
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import os
+import json
+import logging
+import matplotlib
+matplotlib.use('Agg')  # Set non-interactive backend
+import matplotlib.image as mpimg
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_pdf import PdfPages
+
+# A4 portrait in inches
+PAGE_SIZE = (8.27, 11.69)
+LINES_PER_PAGE = 48
+
+# Built-in PDF fonts need no glyph layout or embedding, which dominates render time otherwise
+PDF_RC = {
+    'pdf.use14corefonts': True,
+    'font.family': 'sans-serif',
+    'font.sans-serif': ['Helvetica']
+}
+
+# The core-font AFM metrics declare weight 'Medium', which findfont warns about on every lookup
+logging.getLogger('matplotlib.font_manager').setLevel(logging.ERROR)
+
+
+def _new_page():
+    return Figure(figsize=PAGE_SIZE)
+
+
+def _draw_image(fig, path, rect):
+    """Place a PNG chart in figure coordinates (left, bottom, width, height)"""
+    if not path or not os.path.exists(path):
+        return
+    ax = fig.add_axes(rect)
+    ax.imshow(mpimg.imread(path))
+    ax.axis('off')
+
+
+def _violation_line(violation):
+    line = f"{violation.get('timestamp', '')}  {violation.get('type', '')}"
+    if violation.get('duration') is not None:
+        line += f"  {violation['duration']:.1f}s, {violation.get('frame_count')} frames"
+    if violation.get('image_path'):
+        line += f"  [{os.path.basename(violation['image_path'])}]"
+    return line
+
+
+def render_pdf(report_data, output_path):
+    """
+    Render the report layout to PDF in-process with matplotlib's PDF backend
+
+    Args:
+        report_data (dict): The same data passed to the HTML template
+        output_path (str): Destination .pdf path
+
+    Returns:
+        str: output_path
+    """
+    with matplotlib.rc_context(PDF_RC):
+        return _render_pages(report_data, output_path)
+
+
+def _render_pages(report_data, output_path):
+    student = report_data['student']
+    stats = report_data['stats']
+
+    with PdfPages(output_path) as pdf:
+        # --- Summary page ---
+        fig = _new_page()
+        fig.text(0.06, 0.95, "Exam Proctoring Report", fontsize=20, weight='bold')
+        fig.text(0.06, 0.92, f"{student.get('name')} (ID: {student.get('id')})", fontsize=13)
+        fig.text(0.06, 0.895, f"Exam: {student.get('exam')} | Date: {report_data['generated_at']}",
+                 fontsize=10, color='dimgray')
+
+        rows = [["Total Violations", str(stats['total'])]]
+        rows += [[vtype, str(count)] for vtype, count in stats['by_type'].items()]
+        rows.append(["Average Severity", f"{stats.get('average_severity', 0):.2f}"])
+        table_height = min(0.03 * len(rows), 0.3)
+        ax = fig.add_axes([0.06, 0.87 - table_height, 0.5, table_height])
+        ax.axis('off')
+        table = ax.table(cellText=rows, colLabels=["Summary", "Count"], loc='upper left', cellLoc='left')
+        table.auto_set_font_size(False)
+        table.set_fontsize(9)
+
+        chart_top = 0.85 - table_height
+        _draw_image(fig, report_data.get('timeline_image'), [0.04, chart_top - 0.36, 0.92, 0.34])
+        _draw_image(fig, report_data.get('heatmap_image'), [0.04, chart_top - 0.72, 0.92, 0.34])
+        pdf.savefig(fig)
+
+        # --- Detailed violations ---
+        lines = []
+        for violation in report_data['violations']:
+            lines.append(_violation_line(violation))
+            if violation.get('metadata'):
+                lines.append("    " + json.dumps(violation['metadata'], default=str)[:110])
+        if report_data.get('omitted_violations'):
+            lines.append(f"... {report_data['omitted_violations']} more violations not listed individually")
+
+        for page_start in range(0, len(lines), LINES_PER_PAGE):
+            fig = _new_page()
+            fig.text(0.06, 0.95, "Detailed Violations", fontsize=14, weight='bold')
+            fig.text(0.06, 0.93, "\n".join(lines[page_start:page_start + LINES_PER_PAGE]),
+                     fontsize=7, family='monospace', va='top', linespacing=1.6)
+            pdf.savefig(fig)
+
+        info = pdf.infodict()
+        info['Title'] = f"Exam Proctoring Report - {student.get('name')}"
+        info['Subject'] = str(student.get('exam'))
+
+    return output_path
@@ -1,22 +1,35 @@
 import os
-import pdfkit
+import json
+import hashlib
 import matplotlib
 matplotlib.use('Agg')  # Set non-interactive backend
 from jinja2 import Environment, FileSystemLoader
-import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from datetime import datetime
 import numpy as np
 import logging
+from utils.violation_store import parse_timestamps
+from reporting.pdf_renderer import render_pdf
+
+# Bump when chart styling changes so cached images are re-rendered
+CHART_VERSION = 2
+
+# Candidate timeline bin sizes in seconds, the smallest that fits is used
+BIN_SIZES = (1, 5, 10, 30, 60, 300, 600, 1800, 3600, 21600, 86400)
 
 class ReportGenerator:
-    def __init__(self, config):
+    def __init__(self, config, store=None):
         """
         Initialize the report generator with configuration
         
         Args:
             config (dict): Configuration dictionary from YAML
+            store (ViolationStore): Optional indexed violation store
         """
         self.config = config.get('reporting', {})
+        self.store = store
         self.output_dir = self.config.get('output_dir', './reports/generated')
         self.image_dir = os.path.join(self.output_dir, 'images')
         
@@ -27,6 +40,14 @@ class ReportGenerator:
         # Configure templates
         template_path = os.path.join(os.path.dirname(__file__), 'templates')
         self.template_env = Environment(loader=FileSystemLoader(template_path))
+        self.template = None  # compiled on first use, then reused for every report
+
+        # Charts are drawn on reusable figures and cached by content hash
+        self.chart_dpi = self.config.get('chart_dpi', 100)
+        self.pdf_backend = self.config.get('pdf_backend', 'native')  # 'native' or 'wkhtmltopdf'
+        self.max_timeline_bins = self.config.get('max_timeline_bins', 120)
+        self.max_detailed_violations = self.config.get('max_detailed_violations', 500)
+        self._figures = {}
         
         # Configure logging
         self.logger = logging.getLogger('ReportGenerator')
@@ -39,10 +60,58 @@ class ReportGenerator:
             'MOUTH_MOVING': 3,
             'MULTIPLE_FACES': 4,
             'OBJECT_DETECTED': 5,
-            'AUDIO_DETECTED': 3
+            'AUDIO_DETECTED': 3,
+            'HEAD_TURNED': 2
+        }
+
+    def generate_session_report(self, session_id, student_info=None, output_format='pdf', stats=None):
+        """
+        Generate a report for a session recorded in the violation store
+        
+        Args:
+            session_id (str): Session id returned by ViolationStore.start_session
+            student_info (dict): Overrides the student data stored with the session
+            output_format (str): 'pdf' or 'html'
+            stats (dict): SessionStats snapshot kept during the session, skips
+                the aggregate queries and only the listed violations are read
+            
+        Returns:
+            str: Path to generated report file (ValueError for an unknown session)
+        """
+        if self.store is None:
+            raise ValueError("generate_session_report requires a ViolationStore")
+        session = self.store.get_session(session_id)
+        if session is None:
+            raise ValueError(f"Unknown session: {session_id}")
+
+        if student_info is None:
+            student_info = {
+                'id': session.get('student_id') or session_id,
+                'name': session.get('student_name'),
+                'exam': session.get('exam'),
+                'course': session.get('course')
+            }
+
+        if stats is not None:
+            violations = self.store.get_violations(session_id, limit=self.max_detailed_violations)
+            return self.generate_report(student_info, violations, output_format, stats=stats,
+                                        report_id=session_id)
+
+        # Full rows only for the listed entries; the charts need just times and types
+        violations = self.store.get_violations(session_id, limit=self.max_detailed_violations)
+        summary = self.store.session_summary(session_id)
+        stats = {
+            'total': summary['total'],
+            'by_type': summary['by_type'],
+            'severity_score': summary['severity_score'],
+            'average_severity': summary['average_severity']
         }
+        ts, types = self.store.violation_times(session_id)
+        return self.generate_report(student_info, violations, output_format, stats=stats,
+                                    report_id=session_id, arrays=self._arrays(types, ts))
 
-    def generate_report(self, student_info, violations, output_format='pdf'):
+    def generate_report(self, student_info, violations, output_format='pdf', stats=None, report_id=None,
+                        arrays=None):
         """
         Generate a comprehensive exam violation report
         
@@ -50,19 +119,40 @@ class ReportGenerator:
             student_info (dict): Student identification data
             violations (list): List of violation dictionaries
             output_format (str): 'pdf' or 'html'
+            stats (dict): Precomputed statistics, skips _calculate_stats. A
+                SessionStats snapshot also supplies the timeline bins, so
+                violations then only needs the entries to list in detail
+            report_id (str): Names the output files, defaults to the student id
+            arrays (dict): Chart arrays of every violation, as from _arrays(), so
+                violations only needs the entries to list in detail
             
         Returns:
             str: Path to generated report file
         """
+        report_id = report_id or student_info['id']
         try:
+            if stats is not None and 'bins' in stats:
+                # Live aggregates already hold the per-minute counts
+                arrays, bins = self._arrays_from_stats(stats)
+            else:
+                # Parse everything once into arrays shared by stats and charts
+                arrays = arrays or self._violation_arrays(violations)
+                if stats is None:
+                    stats = self._calculate_stats(violations, arrays)
+                bins = self._bin_timeline(arrays)
+            total = stats.get('total', len(violations))
+            if 'timeline' not in stats:
+                stats['timeline'] = self._timeline_entries(arrays, bins)
+
             # Prepare report data
             report_data = {
                 'student': student_info,
-                'violations': violations,
+                'violations': violations[:self.max_detailed_violations],
+                'omitted_violations': max(0, total - min(len(violations), self.max_detailed_violations)),
                 'generated_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'stats': self._calculate_stats(violations),
-                'timeline_image': self._generate_timeline(violations, student_info['id']),
-                'heatmap_image': self._generate_heatmap(violations, student_info['id']),
+                'stats': stats,
+                'timeline_image': self._generate_timeline(arrays, bins, report_id),
+                'heatmap_image': self._generate_heatmap(stats['by_type'], report_id),
                 'has_images': False
             }
             
@@ -70,17 +160,17 @@ class ReportGenerator:
             if report_data['timeline_image'] or report_data['heatmap_image']:
                 report_data['has_images'] = True
 
-            # Render HTML template
-            template = self.template_env.get_template('base_report.html')
-            html_content = template.render(report_data)
-
             # Generate output filename
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"report_{student_info['id']}_{timestamp}"
+            filename = f"report_{report_id}_{timestamp}"
             output_path = os.path.join(self.output_dir, f"{filename}.{output_format.lower()}")
 
             # Generate the chosen output format
-            if output_format.lower() == 'pdf':
+            if output_format.lower() == 'pdf' and self.pdf_backend == 'native':
+                render_pdf(report_data, output_path)
+            elif output_format.lower() == 'pdf':
+                import pdfkit
+                html_content = self._render_html(report_data)
                 options = {
                     'enable-local-file-access': None,
                     'quiet': '',
@@ -91,10 +181,10 @@ class ReportGenerator:
                 }
                 pdfkit_config = self.config.get('wkhtmltopdf_path')
                 config = pdfkit.configuration(wkhtmltopdf=pdfkit_config) if pdfkit_config else None
-                pdfkit.from_string(html_content, output_path, options=options)
+                pdfkit.from_string(html_content, output_path, options=options, configuration=config)
             else:
                 with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(html_content)
+                    f.write(self._render_html(report_data))
 
             self.logger.info(f"Report generated at: {output_path}")
             return output_path
@@ -103,84 +193,170 @@ class ReportGenerator:
             self.logger.error(f"Failed to generate report: {str(e)}")
             return None
 
-    def _calculate_stats(self, violations):
-        """Calculate summary statistics from violations"""
-        stats = {
-            'total': len(violations),
-            'by_type': {},
-            'timeline': [],
-            'severity_score': 0
+    def _render_html(self, report_data):
+        """Render the HTML template, compiling it on first use"""
+        if self.template is None:
+            self.template = self.template_env.get_template('base_report.html')
+        return self.template.render(report_data)
+
+    def _violation_arrays(self, violations):
+        """Parse violation types and timestamps into numpy arrays in bulk"""
+        if violations and all('ts' in v for v in violations):
+            ts = np.fromiter((v['ts'] for v in violations), dtype=np.float64, count=len(violations))
+        else:
+            ts = parse_timestamps([v['timestamp'] for v in violations])
+        return self._arrays([v['type'] for v in violations], ts)
+
+    def _arrays(self, types, ts):
+        """Chart arrays from parallel lists of violation types and epoch timestamps"""
+        types = np.array(types, dtype=object)
+        names, type_idx = np.unique(types.astype(str), return_inverse=True) if len(types) else (np.array([]), np.array([], dtype=np.intp))
+        ts = np.asarray(ts, dtype=np.float64)
+        severity = np.array([self.severity_map.get(n, 1) for n in names], dtype=np.int64)
+        return {'ts': ts, 'names': names, 'type_idx': type_idx, 'type_severity': severity}
+
+    def _arrays_from_stats(self, stats):
+        """Chart arrays and timeline bins from a SessionStats snapshot.
+
+        The per-minute bins are merged into the smallest BIN_SIZES entry
+        that keeps the timeline within max_timeline_bins.
+        """
+        names = np.array(sorted(stats['by_type']), dtype=str)
+        severity = np.array([self.severity_map.get(n, 1) for n in names], dtype=np.int64)
+        arrays = {'names': names, 'type_severity': severity}
+        live_bins = stats['bins']
+        if not stats['total'] or live_bins['start'] is None:
+            return arrays, None
+
+        base = live_bins['bin_seconds']
+        counts = np.array([live_bins['counts'].get(n, []) for n in names], dtype=np.int64)
+        n_bins = counts.shape[1]
+        bin_seconds = next(
+            (size for size in BIN_SIZES
+             if size >= base and size % base == 0 and n_bins * base / size <= self.max_timeline_bins),
+            BIN_SIZES[-1]
+        )
+        factor = max(bin_seconds // base, 1)
+        if factor > 1:
+            counts = np.pad(counts, ((0, 0), (0, -n_bins % factor)))
+            counts = counts.reshape(len(names), -1, factor).sum(axis=2)
+        return arrays, {'start': live_bins['start'], 'bin_seconds': bin_seconds, 'counts': counts}
+
+    def _calculate_stats(self, violations, arrays=None):
+        """Calculate summary statistics from violations in one vectorised pass"""
+        arrays = arrays or self._violation_arrays(violations)
+        counts = np.bincount(arrays['type_idx'], minlength=len(arrays['names']))
+        total = int(counts.sum())
+        severity_score = int((counts * arrays['type_severity']).sum())
+        return {
+            'total': total,
+            'by_type': {str(name): int(n) for name, n in zip(arrays['names'], counts)},
+            'severity_score': severity_score,
+            'average_severity': severity_score / total if total else 0
         }
-        
-        for violation in violations:
-            # Count by type
-            stats['by_type'][violation['type']] = stats['by_type'].get(violation['type'], 0) + 1
-            
-            # Add to timeline
-            stats['timeline'].append({
-                'time': violation['timestamp'],
-                'type': violation['type'],
-                'severity': self.severity_map.get(violation['type'], 1)
-            })
-            
-            # Calculate total severity score
-            stats['severity_score'] += self.severity_map.get(violation['type'], 1)
-            
-        # Calculate average severity
-        if stats['total'] > 0:
-            stats['average_severity'] = stats['severity_score'] / stats['total']
+
+    def _bin_timeline(self, arrays):
+        """Count violations per type in time bins sized to the session length"""
+        ts = arrays['ts']
+        if not len(ts):
+            return None
+        start = np.floor(ts.min())
+        span = ts.max() - start
+        bin_seconds = next(
+            (size for size in BIN_SIZES if span / size <= self.max_timeline_bins), BIN_SIZES[-1]
+        )
+        n_bins = int(span // bin_seconds) + 1
+        bin_idx = ((ts - start) // bin_seconds).astype(np.intp)
+        n_types = len(arrays['names'])
+        counts = np.bincount(arrays['type_idx'] * n_bins + bin_idx, minlength=n_types * n_bins)
+        return {
+            'start': start,
+            'bin_seconds': bin_seconds,
+            'counts': counts.reshape(n_types, n_bins)
+        }
+
+    def _timeline_entries(self, arrays, bins):
+        """Non-empty bins as template-friendly dicts"""
+        if bins is None:
+            return []
+        type_rows, bin_cols = np.nonzero(bins['counts'])
+        order = np.argsort(bin_cols, kind='stable')
+        return [
+            {
+                'time': datetime.fromtimestamp(bins['start'] + col * bins['bin_seconds']).isoformat(),
+                'type': str(arrays['names'][row]),
+                'count': int(bins['counts'][row, col]),
+                'severity': int(arrays['type_severity'][row])
+            }
+            for row, col in zip(type_rows[order], bin_cols[order])
+        ]
+
+    def _figure(self, name, figsize):
+        """Return a cleared, reusable Figure with its own Agg canvas"""
+        fig = self._figures.get(name)
+        if fig is None:
+            fig = Figure(figsize=figsize)
+            FigureCanvasAgg(fig)
+            self._figures[name] = fig
         else:
-            stats['average_severity'] = 0
-            
-        return stats
+            fig.clear()
+        return fig
+
+    def _chart_path(self, kind, report_id, payload, arrays=()):
+        """Image path keyed by a hash of everything the chart is drawn from"""
+        digest = hashlib.sha1(
+            json.dumps([CHART_VERSION, self.chart_dpi, payload], default=str).encode('utf-8')
+        )
+        for array in arrays:
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return os.path.join(self.image_dir, f'{kind}_{report_id}_{digest.hexdigest()[:16]}.png')
 
-    def _generate_timeline(self, violations, student_id):
-        """Generate violation timeline visualization"""
-        if not violations:
+    def _generate_timeline(self, arrays, bins, student_id):
+        """Generate violation timeline as stacked per-type counts per time bin"""
+        if bins is None:
             return None
             
         try:
-            # Prepare data
-            times = []
-            severities = []
-            labels = []
-            
-            for violation in violations:
-                timestamp = datetime.strptime(violation['timestamp'], "%Y%m%d_%H%M%S_%f")
-                times.append(timestamp)
-                severities.append(self.severity_map.get(violation['type'], 1))
-                labels.append(violation['type'])
+            # Reuse the cached image if the input data is unchanged
+            timeline_path = self._chart_path(
+                'timeline', student_id,
+                [list(arrays['names']), bins['start'], bins['bin_seconds'], self.severity_map],
+                [bins['counts']]
+            )
+            if os.path.exists(timeline_path):
+                return timeline_path
             
             # Create figure
-            plt.figure(figsize=(12, 5))
-            ax = plt.gca()
-            
-            # Plot timeline
-            plt.plot(times, severities, 'o-', markersize=8)
-            
-            # Add labels
-            for i, (time, severity, label) in enumerate(zip(times, severities, labels)):
-                plt.annotate(
-                    label,
-                    (time, severity),
-                    textcoords="offset points",
-                    xytext=(0, 10),
-                    ha='center',
-                    fontsize=8
-                )
+            fig = self._figure('timeline', (12, 5))
+            ax = fig.add_subplot()
+
+            counts = bins['counts']
+            n_bins = counts.shape[1]
+            edges = mdates.date2num([
+                datetime.fromtimestamp(bins['start'] + i * bins['bin_seconds']) for i in range(n_bins + 1)
+            ])
+            
+            # Plot stacked counts as one filled step artist per type, most severe types on top
+            order = np.argsort(arrays['type_severity'], kind='stable')
+            bottom = np.zeros(n_bins)
+            for row in order:
+                top = bottom + counts[row]
+                ax.stairs(top, edges, baseline=bottom, fill=True,
+                          label=f"{arrays['names'][row]} ({int(counts[row].sum())})")
+                bottom = top
             
             # Format plot
-            plt.title(f"Violation Timeline - {student_id}")
-            plt.xlabel("Time")
-            plt.ylabel("Severity Level")
-            plt.grid(True, linestyle='--', alpha=0.7)
-            plt.xticks(rotation=45)
-            plt.tight_layout()
+            ax.set_title(f"Violation Timeline - {student_id} ({self._format_bin(bins['bin_seconds'])} bins)")
+            ax.set_xlabel("Time")
+            ax.set_ylabel("Violations per bin")
+            ax.grid(True, linestyle='--', alpha=0.7, axis='y')
+            ax.legend(loc='upper right', fontsize=8)
+            ax.xaxis_date()
+            ax.tick_params(axis='x', labelrotation=45)
+            fig.tight_layout()
             
             # Save image
-            timeline_path = os.path.join(self.image_dir, f'timeline_{student_id}.png')
-            plt.savefig(timeline_path, dpi=150, bbox_inches='tight')
-            plt.close()
+            fig.savefig(timeline_path, dpi=self.chart_dpi, bbox_inches='tight')
             
             return timeline_path
             
@@ -188,29 +364,39 @@ class ReportGenerator:
             self.logger.error(f"Failed to generate timeline: {str(e)}")
             return None
 
-    def _generate_heatmap(self, violations, student_id):
+    @staticmethod
+    def _format_bin(seconds):
+        if seconds < 60:
+            return f"{seconds}s"
+        if seconds < 3600:
+            return f"{seconds // 60}min"
+        return f"{seconds // 3600}h"
+
+    def _generate_heatmap(self, violation_counts, student_id):
         """Generate violation frequency heatmap"""
-        if not violations:
+        if not violation_counts:
             return None
             
         try:
-            # Count violations by type
-            violation_counts = {}
-            for violation in violations:
-                violation_counts[violation['type']] = violation_counts.get(violation['type'], 0) + 1
-            
             # Sort by count
             sorted_types = sorted(violation_counts.items(), key=lambda x: x[1], reverse=True)
             types, counts = zip(*sorted_types) if sorted_types else ([], [])
+
+            # Reuse the cached image if the counts are unchanged
+            heatmap_path = self._chart_path('heatmap', student_id, [sorted_types, self.severity_map])
+            if os.path.exists(heatmap_path):
+                return heatmap_path
             
             # Create figure
-            plt.figure(figsize=(10, 5))
+            fig = self._figure('heatmap', (10, 5))
+            ax = fig.add_subplot()
             
             # Create colormap based on severity
-            colors = [plt.cm.Reds(self.severity_map.get(t, 1)/5) for t in types]
+            reds = matplotlib.colormaps['Reds']
+            colors = [reds(self.severity_map.get(t, 1)/5) for t in types]
             
             # Plot horizontal bars
-            bars = plt.barh(
+            bars = ax.barh(
                 types,
                 counts,
                 color=colors,
@@ -221,7 +407,7 @@ class ReportGenerator:
             # Add count labels
             for bar in bars:
                 width = bar.get_width()
-                plt.text(
+                ax.text(
                     width + 0.3,
                     bar.get_y() + bar.get_height()/2,
                     f"{int(width)}",
@@ -231,19 +417,17 @@ class ReportGenerator:
                 )
             
             # Format plot
-            plt.title(f"Violation Frequency - {student_id}")
-            plt.xlabel("Count")
-            plt.ylabel("Violation Type")
-            plt.grid(True, linestyle='--', alpha=0.3, axis='x')
-            plt.tight_layout()
+            ax.set_title(f"Violation Frequency - {student_id}")
+            ax.set_xlabel("Count")
+            ax.set_ylabel("Violation Type")
+            ax.grid(True, linestyle='--', alpha=0.3, axis='x')
+            fig.tight_layout()
             
             # Save image
-            heatmap_path = os.path.join(self.image_dir, f'heatmap_{student_id}.png')
-            plt.savefig(heatmap_path, dpi=150, bbox_inches='tight')
-            plt.close()
+            fig.savefig(heatmap_path, dpi=self.chart_dpi, bbox_inches='tight')
             
             return heatmap_path
             
         except Exception as e:
             self.logger.error(f"Failed to generate heatmap: {str(e)}")
-            return None
\ No newline at end of file
+            return None
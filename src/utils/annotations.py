@@ -0,0 +1,158 @@
+import os
+import json
+import bisect
+from datetime import datetime
+
+# Compact keys used in the sidecar -> detection result keys
+FIELDS = {
+    'face': 'face_present',
+    'gaze': 'gaze_direction',
+    'ear': 'eye_ratio',
+    'head': 'head_pose',
+    'mouth': 'mouth_moving',
+    'multi': 'multiple_faces',
+    'obj': 'objects_detected',
+    'audio': 'audio_detected'
+}
+
+
+class AnnotationWriter:
+    """Writes per-frame detection results as a timestamped JSON-lines track.
+
+    A line is only written when the displayed state changes, so a player
+    holds each state until the next line. Eye ratio is rounded and does
+    not by itself trigger a new line.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'w', buffering=1 << 16)
+        self.last_state = None
+        self.lines = 0
+
+    def write(self, timestamp, frame_index, results, current_alert="",
+              unique_alert_count=0, total_alert_types=0):
+        record = {short: results.get(key) for short, key in FIELDS.items()}
+        record['ear'] = round(float(record['ear'] or 0), 2)
+        for short in ('face', 'mouth', 'multi', 'obj', 'audio'):
+            record[short] = int(bool(record[short]))
+        record['alert'] = current_alert
+        record['n'] = unique_alert_count
+        record['of'] = total_alert_types
+
+        state = tuple(v for k, v in record.items() if k != 'ear') + (record['ear'] > 0.25,)
+        if state == self.last_state:
+            return
+        self.last_state = state
+
+        record['t'] = round(timestamp, 3)
+        record['f'] = frame_index
+        self.file.write(json.dumps(record, separators=(',', ':')) + "\n")
+        self.lines += 1
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+def read_annotations(path):
+    """Return the sidecar as a list of records sorted by timestamp"""
+    with open(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return sorted(records, key=lambda r: r['t'])
+
+
+def expand(record):
+    """Convert a compact record back into a detection results dict"""
+    results = {key: record.get(short) for short, key in FIELDS.items()}
+    results['timestamp'] = datetime.fromtimestamp(record['t']).strftime("%Y-%m-%d %H:%M:%S")
+    return results
+
+
+class AnnotationTrack:
+    """Looks up the annotation state in effect at any timestamp"""
+
+    def __init__(self, path):
+        self.records = read_annotations(path)
+        self.times = [r['t'] for r in self.records]
+
+    def at(self, timestamp):
+        i = bisect.bisect_right(self.times, timestamp) - 1
+        return self.records[i] if i >= 0 else None
+
+
+def _vtt_time(seconds):
+    hours, rem = divmod(max(seconds, 0), 3600)
+    minutes, secs = divmod(rem, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}"
+
+
+def export_webvtt(path, vtt_path, start_time=None):
+    """Write the track as WebVTT cues relative to start_time (defaults to the first record)"""
+    records = read_annotations(path)
+    if not records:
+        return None
+    start_time = records[0]['t'] if start_time is None else start_time
+    with open(vtt_path, 'w', encoding='utf-8') as f:
+        f.write("WEBVTT\n\n")
+        for record, following in zip(records, records[1:] + [None]):
+            end = following['t'] if following else record['t'] + 1.0
+            results = expand(record)
+            text = (
+                f"Face: {'Present' if results['face_present'] else 'Absent'} | "
+                f"Gaze: {results['gaze_direction']} | "
+                f"Mouth: {'Moving' if results['mouth_moving'] else 'Still'}"
+            )
+            if record['alert']:
+                text += f"\nALERT: {record['alert']}"
+            f.write(f"{_vtt_time(record['t'] - start_time)} --> {_vtt_time(end - start_time)}\n{text}\n\n")
+    return vtt_path
+
+
+def render_annotated(manifest_path, annotations_path, output_path):
+    """Burn the annotation track into a copy of a segmented recording"""
+    import cv2
+    import numpy as np
+    from utils.overlay import display_detection_results
+    from utils.segmented_writer import read_manifest
+
+    track = AnnotationTrack(annotations_path)
+    folder = os.path.dirname(manifest_path)
+    writer = None
+    for entry in read_manifest(manifest_path):
+        timestamps = np.load(os.path.join(folder, entry['timestamps']))
+        cap = cv2.VideoCapture(os.path.join(folder, entry['file']))
+        try:
+            for ts in timestamps:
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                record = track.at(ts)
+                if record:
+                    display_detection_results(frame, expand(record), record['alert'],
+                                              record['n'], record['of'])
+                if writer is None:
+                    h, w = frame.shape[:2]
+                    writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'),
+                                             entry['fps'], (w, h))
+                writer.write(frame)
+        finally:
+            cap.release()
+    if writer:
+        writer.release()
+        return output_path
+    return None
+
+
+if __name__ == "__main__":
+    # Run from src/ as: python -m utils.annotations ...
+    import sys
+    if len(sys.argv) == 4 and sys.argv[1] == 'vtt':
+        print(export_webvtt(sys.argv[2], sys.argv[3]))
+    elif len(sys.argv) == 5 and sys.argv[1] == 'render':
+        print(render_annotated(sys.argv[2], sys.argv[3], sys.argv[4]))
+    else:
+        print("Usage: python -m utils.annotations vtt <annotations.jsonl> <out.vtt>")
+        print("       python -m utils.annotations render <manifest.jsonl> <annotations.jsonl> <out.mp4>")
+        sys.exit(1)
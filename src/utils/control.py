@@ -0,0 +1,47 @@
+import json
+import threading
+import socketserver
+
+
+class _ControlServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True  # restart on the same port while the old socket is in TIME_WAIT
+    daemon_threads = True
+
+
+class ControlServer:
+    """Line-based control socket on localhost for headless sessions.
+
+    Commands: ``stop`` ends the session, ``status`` returns a JSON status line.
+    """
+
+    def __init__(self, port, stop_event, status_fn=None, host='127.0.0.1'):
+        self.stop_event = stop_event
+        self.status_fn = status_fn or (lambda: {})
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for raw in self.rfile:
+                    command = raw.decode('utf-8', 'ignore').strip().lower()
+                    if command == 'stop':
+                        server.stop_event.set()
+                        reply = {'ok': True}
+                    elif command == 'status':
+                        reply = dict(server.status_fn(), ok=True)
+                    else:
+                        reply = {'ok': False, 'error': f"unknown command: {command}"}
+                    self.wfile.write((json.dumps(reply, default=str) + "\n").encode('utf-8'))
+                    if command == 'stop':
+                        break
+
+        self.server = _ControlServer((host, port), Handler)
+        self.port = self.server.server_address[1]
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,129 @@
+import cv2
+import os
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+class EvidenceRecorder:
+    """Keeps the last few seconds of JPEG-compressed frames in memory and
+    writes a short pre/post-roll clip whenever a violation fires."""
+
+    def __init__(self, config):
+        clip_config = config['video'].get('evidence_clips', {})
+        self.enabled = clip_config.get('enabled', True)
+        self.pre_seconds = clip_config.get('pre_seconds', 5)
+        self.post_seconds = clip_config.get('post_seconds', 5)
+        self.jpeg_quality = clip_config.get('jpeg_quality', 70)
+        self.max_width = clip_config.get('max_width', 640)
+        self.output_dir = os.path.join(config['global']['output_path'], "violation_captures")
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        self.buffer = deque()  # (timestamp, jpeg bytes)
+        self.pending = {}      # violation_type -> open clip
+        self.frames = queue.Queue(maxsize=clip_config.get('queue_size', 60))
+        self.lock = threading.Lock()
+        self.writer_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='evidence-clip')
+        self.thread = None
+        self.running = False
+        self.dropped_frames = 0
+
+    def start(self):
+        if not self.enabled:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._encode_loop, daemon=True)
+        self.thread.start()
+
+    def push(self, frame, timestamp=None):
+        """Queue a frame for the ring buffer; never blocks the caller"""
+        if not self.running:
+            return
+        h, w = frame.shape[:2]
+        if self.max_width and w > self.max_width:
+            image = cv2.resize(frame, (self.max_width, int(h * self.max_width / w)),
+                               interpolation=cv2.INTER_AREA)
+        else:
+            image = frame.copy()
+        try:
+            self.frames.put_nowait((timestamp or time.time(), image))
+        except queue.Full:
+            self.dropped_frames += 1
+
+    def trigger(self, violation_type, timestamp=None):
+        """Start a clip for a violation and return the path it will be written to.
+
+        A violation of the same type that fires while its clip is still
+        collecting post-roll extends that clip instead of starting a new one.
+        """
+        if not self.running:
+            return None
+        now = timestamp or time.time()
+        with self.lock:
+            clip = self.pending.get(violation_type)
+            if clip:
+                clip['end'] = now + self.post_seconds
+                return clip['path']
+
+            stamp = datetime.fromtimestamp(now).strftime("%Y%m%d_%H%M%S_%f")
+            path = os.path.abspath(os.path.join(self.output_dir, f"{violation_type}_{stamp}.mp4"))
+            self.pending[violation_type] = {
+                'path': path,
+                'end': now + self.post_seconds,
+                'frames': list(self.buffer)
+            }
+            return path
+
+    def _encode_loop(self):
+        while self.running or not self.frames.empty():
+            try:
+                ts, image = self.frames.get(timeout=0.2)
+            except queue.Empty:
+                continue
+
+            ok, jpeg = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not ok:
+                continue
+
+            with self.lock:
+                self.buffer.append((ts, jpeg))
+                while self.buffer and ts - self.buffer[0][0] > self.pre_seconds:
+                    self.buffer.popleft()
+
+                for violation_type, clip in list(self.pending.items()):
+                    clip['frames'].append((ts, jpeg))
+                    if ts >= clip['end']:
+                        del self.pending[violation_type]
+                        self.writer_pool.submit(self._write_clip, clip['path'], clip['frames'])
+
+    @staticmethod
+    def _write_clip(path, frames):
+        """Decode the buffered JPEGs and write them as an mp4 clip"""
+        if not frames:
+            return
+        try:
+            duration = frames[-1][0] - frames[0][0]
+            fps = (len(frames) - 1) / duration if duration > 0 else 10
+            first = cv2.imdecode(frames[0][1], cv2.IMREAD_COLOR)
+            h, w = first.shape[:2]
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (w, h))
+            for _, jpeg in frames:
+                writer.write(cv2.imdecode(jpeg, cv2.IMREAD_COLOR))
+            writer.release()
+        except Exception as e:
+            print(f"Evidence clip failed: {str(e)}")
+
+    def stop(self):
+        """Flush open clips with the frames collected so far"""
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        with self.lock:
+            for clip in self.pending.values():
+                self.writer_pool.submit(self._write_clip, clip['path'], clip['frames'])
+            self.pending = {}
+            self.buffer.clear()
+        self.writer_pool.shutdown(wait=True)
@@ -0,0 +1,45 @@
+import math
+
+
+class OneEuroFilter:
+    """One-euro low-pass filter for a noisy scalar signal (Casiez et al., 2012).
+
+    The cutoff frequency rises with the signal's speed: slow drift and
+    jitter are smoothed strongly (min_cutoff), while fast real movements
+    pass with little lag (beta). Works on irregular frame timestamps.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.x = None
+        self.dx = 0.0
+        self.timestamp = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def filter(self, x, timestamp):
+        """Smoothed value of x observed at timestamp (seconds)"""
+        if self.x is None:
+            self.x, self.timestamp = x, timestamp
+            return x
+        dt = timestamp - self.timestamp
+        if dt <= 0:
+            return self.x
+        self.timestamp = timestamp
+
+        dx = (x - self.x) / dt
+        a_d = self._alpha(self.d_cutoff, dt)
+        self.dx = a_d * dx + (1 - a_d) * self.dx
+
+        cutoff = self.min_cutoff + self.beta * abs(self.dx)
+        a = self._alpha(cutoff, dt)
+        self.x = a * x + (1 - a) * self.x
+        return self.x
@@ -0,0 +1,226 @@
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class FrameSource:
+    """Common interface for everything main() can read frames from.
+
+    Mirrors the parts of cv2.VideoCapture the pipeline uses (read,
+    isOpened, release). With realtime=True frames are paced at the
+    source fps; otherwise they are delivered as fast as possible.
+    """
+
+    def __init__(self, fps=30, realtime=True):
+        self.fps = fps or 30
+        self.realtime = realtime
+        self.frame_index = 0
+        self.start_time = None
+        self._next_deadline = None
+
+    def timestamp(self):
+        """Time of the frame last read, in epoch seconds.
+
+        Realtime sources use the wall clock. Sources read as fast as possible
+        use the frame's position in the stream, start + (frame_index - 1) / fps,
+        so a run sees the same frame times on any machine. The start is a
+        whole second, which keeps the differences between frame times exact.
+        """
+        if self.realtime:
+            return time.time()
+        if self.start_time is None:
+            self.start_time = float(int(time.time()))
+        return self.start_time + (self.frame_index - 1) / self.fps
+
+    def _pace(self):
+        if not self.realtime:
+            return
+        now = time.perf_counter()
+        if self._next_deadline is None:
+            self._next_deadline = now
+        delay = self._next_deadline - now
+        if delay > 0:
+            time.sleep(delay)
+        elif delay < -1.0:  # fell far behind, don't try to catch up with a burst
+            self._next_deadline = now
+        self._next_deadline += 1.0 / self.fps
+
+    def read(self):
+        raise NotImplementedError
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+
+class DeviceSource(FrameSource):
+    """Webcam or capture device; the device itself paces the frames"""
+
+    BACKENDS = {
+        'any': cv2.CAP_ANY,
+        'dshow': cv2.CAP_DSHOW,
+        'msmf': cv2.CAP_MSMF,
+        'v4l2': cv2.CAP_V4L2,
+        'avfoundation': cv2.CAP_AVFOUNDATION
+    }
+
+    def __init__(self, index=0, backend='auto', resolution=None, fps=30):
+        super().__init__(fps, realtime=False)
+        if backend == 'auto':
+            backend = 'dshow' if sys.platform == 'win32' else 'v4l2' if sys.platform.startswith('linux') else 'any'
+        self.cap = cv2.VideoCapture(index, self.BACKENDS.get(backend, cv2.CAP_ANY))
+        if resolution:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, resolution[0])
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution[1])
+
+    def read(self):
+        ok, frame = self.cap.read()
+        if ok:
+            self.frame_index += 1
+        return ok, frame
+
+    def timestamp(self):
+        return time.time()  # a live device is paced by the device, never replayed
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """Recorded video file, optionally played back at its native rate"""
+
+    def __init__(self, path, realtime=True, loop=False):
+        self.cap = cv2.VideoCapture(path)
+        super().__init__(self.cap.get(cv2.CAP_PROP_FPS) or 30, realtime)
+        self.loop = loop
+
+    def read(self):
+        self._pace()
+        ok, frame = self.cap.read()
+        if not ok and self.loop and self.frame_index:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.cap.read()
+        if ok:
+            self.frame_index += 1
+        return ok, frame
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirSource(FrameSource):
+    """Directory of still images read in filename order"""
+
+    def __init__(self, path, fps=30, realtime=True, loop=False):
+        super().__init__(fps, realtime)
+        self.files = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self.loop = loop
+
+    def read(self):
+        if not self.files or (self.frame_index >= len(self.files) and not self.loop):
+            return False, None
+        self._pace()
+        frame = cv2.imread(self.files[self.frame_index % len(self.files)])
+        self.frame_index += 1
+        return frame is not None, frame
+
+    def isOpened(self):
+        return bool(self.files)
+
+
+class SyntheticSource(FrameSource):
+    """Deterministic generator of face-like blobs and injected objects.
+
+    The same seed always yields the same frames, which makes benchmark
+    and regression runs repeatable without a camera. The scene contains
+    one face moving on a Lissajous path, an optional second face from
+    second_face_at onwards, a phone-like rectangle every object_every
+    frames and a face-absent gap every absent_every frames.
+    """
+
+    def __init__(self, resolution=(1280, 720), fps=30, realtime=True, seed=42, frames=900,
+                 object_every=150, object_frames=30, absent_every=300, absent_frames=45,
+                 second_face_at=None):
+        super().__init__(fps, realtime)
+        self.width, self.height = resolution
+        self.frames = frames
+        self.object_every = object_every
+        self.object_frames = object_frames
+        self.absent_every = absent_every
+        self.absent_frames = absent_frames
+        self.second_face_at = second_face_at
+
+        rng = np.random.default_rng(seed)
+        self.background = rng.integers(60, 120, size=(self.height, self.width, 3), dtype=np.uint8)
+        self.background = cv2.GaussianBlur(self.background, (31, 31), 0)
+        self.phase = rng.uniform(0, 2 * np.pi, size=2)
+
+    def _draw_face(self, frame, cx, cy, scale):
+        axes = (int(70 * scale), int(90 * scale))
+        cv2.ellipse(frame, (cx, cy), axes, 0, 0, 360, (140, 170, 210), -1)
+        for dx in (-28, 28):
+            cv2.circle(frame, (cx + int(dx * scale), cy - int(20 * scale)), int(9 * scale), (40, 30, 30), -1)
+        cv2.ellipse(frame, (cx, cy + int(40 * scale)), (int(25 * scale), int(8 * scale)),
+                    0, 0, 360, (60, 60, 150), -1)
+
+    def read(self):
+        if self.frames and self.frame_index >= self.frames:
+            return False, None
+        self._pace()
+        i = self.frame_index
+        t = i / self.fps
+        frame = self.background.copy()
+
+        absent = self.absent_every and i % self.absent_every >= self.absent_every - self.absent_frames
+        if not absent:
+            cx = int(self.width / 2 + self.width * 0.15 * np.sin(0.7 * t + self.phase[0]))
+            cy = int(self.height / 2 + self.height * 0.08 * np.sin(1.1 * t + self.phase[1]))
+            self._draw_face(frame, cx, cy, 1.0)
+
+        if self.second_face_at is not None and i >= self.second_face_at:
+            self._draw_face(frame, int(self.width * 0.15), int(self.height * 0.35), 0.7)
+
+        if self.object_every and i % self.object_every < self.object_frames:
+            x, y = int(self.width * 0.75), int(self.height * 0.6)
+            cv2.rectangle(frame, (x, y), (x + 60, y + 120), (20, 20, 20), -1)
+            cv2.rectangle(frame, (x + 5, y + 10), (x + 55, y + 100), (180, 120, 60), -1)
+
+        self.frame_index += 1
+        return True, frame
+
+
+def open_frame_source(config, source=None):
+    """Build a frame source from the video config.
+
+    ``source`` (or video.source) may be a device index, a video file, an
+    image directory or the string "synthetic".
+    """
+    video_config = config['video']
+    source = video_config.get('source', 0) if source is None else source
+    realtime = video_config.get('realtime', True)
+    fps = video_config.get('fps', 30)
+    resolution = tuple(video_config.get('resolution', (1280, 720)))
+
+    if isinstance(source, int) or (isinstance(source, str) and source.isdigit()):
+        return DeviceSource(int(source), video_config.get('backend', 'auto'), resolution, fps)
+    if source == 'synthetic':
+        options = video_config.get('synthetic', {})
+        return SyntheticSource(resolution, fps, realtime, **options)
+    if os.path.isdir(source):
+        return ImageDirSource(source, fps, realtime, video_config.get('loop', False))
+    return VideoFileSource(source, realtime, video_config.get('loop', False))
@@ -0,0 +1,88 @@
+class IntervalTracker:
+    """Turns per-frame detector signals into violation intervals.
+
+    A signal must be active in open_frames frames, each within close_seconds
+    of the previous one, before its interval opens, and inactive for
+    close_seconds before it closes, so single-frame flickers neither open
+    nor split an interval. Gaps shorter than close_seconds do not reset the
+    count, which lets rate-limited detectors (YOLO runs at objects.max_fps)
+    open intervals too. update() returns only the open and close events;
+    everything in between just extends the running interval.
+    """
+
+    def __init__(self, config):
+        interval_config = config.get('intervals', {})
+        self.open_frames = interval_config.get('open_frames', 3)
+        self.close_seconds = interval_config.get('close_seconds', 1.0)
+        self.per_type = interval_config.get('per_type', {})
+        self.states = {}  # violation type -> running state
+        self.next_id = 1
+
+    def _settings(self, violation_type):
+        overrides = self.per_type.get(violation_type, {})
+        return (overrides.get('open_frames', self.open_frames),
+                overrides.get('close_seconds', self.close_seconds))
+
+    @staticmethod
+    def _event(state, closed):
+        return {
+            'id': state['id'],
+            'type': state['type'],
+            'start': state['start'],
+            'end': state['last'] if closed else None,
+            'duration': state['last'] - state['start'] if closed else None,
+            'peak_confidence': state['peak'],
+            'frame_count': state['frames']
+        }
+
+    def update(self, signals, timestamp):
+        """
+        Feed one frame of signals and return the interval events it caused
+
+        Args:
+            signals (dict): {violation type: confidence} for active signals;
+                booleans count as confidence 1.0, falsy values as inactive
+            timestamp (float): Frame time in epoch seconds
+
+        Returns:
+            list: Event dicts, 'end' is None for an opened interval
+        """
+        events = []
+        for violation_type, confidence in signals.items():
+            if not confidence:
+                continue
+            confidence = float(confidence)
+            state = self.states.get(violation_type)
+            if state is None:
+                state = self.states[violation_type] = {
+                    'id': None, 'type': violation_type, 'start': timestamp,
+                    'last': timestamp, 'peak': 0.0, 'frames': 0
+                }
+            state['last'] = timestamp
+            state['peak'] = max(state['peak'], confidence)
+            state['frames'] += 1
+            open_frames, _ = self._settings(violation_type)
+            if state['id'] is None and state['frames'] >= open_frames:
+                state['id'] = self.next_id
+                self.next_id += 1
+                events.append(self._event(state, closed=False))
+
+        for violation_type, state in list(self.states.items()):
+            if signals.get(violation_type):
+                continue
+            _, close_seconds = self._settings(violation_type)
+            if timestamp - state['last'] >= close_seconds:
+                del self.states[violation_type]
+                if state['id'] is not None:  # else it never reached open_frames: a flicker
+                    events.append(self._event(state, closed=True))
+        return events
+
+    def active(self):
+        """Types whose interval is currently open"""
+        return [t for t, state in self.states.items() if state['id'] is not None]
+
+    def close_all(self):
+        """Close every open interval at its last active frame, e.g. at session end"""
+        events = [self._event(state, closed=True) for state in self.states.values() if state['id'] is not None]
+        self.states = {}
+        return events
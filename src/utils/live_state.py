@@ -0,0 +1,118 @@
+import json
+import struct
+import time
+import hashlib
+from multiprocessing import shared_memory
+
+# Header: sequence number (odd while a write is in progress) and payload length
+HEADER = struct.Struct('<QI')
+DEFAULT_NAME = 'proctoring_live'
+DEFAULT_SIZE = 64 * 1024
+
+
+def segment_name(prefix, session_id):
+    """Per-session segment name, hashed to stay within the 31-character macOS limit"""
+    return f"{prefix}_{hashlib.sha1(session_id.encode()).hexdigest()[:10]}"
+
+
+def attach_shared_memory(name):
+    """Open an existing segment without letting this process unlink it on exit"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers the segment with the resource
+        # tracker, which would unlink it when this process exits
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+def create_shared_memory(name, size):
+    """Create a new segment; an existing one may still be in use, so it is never replaced"""
+    try:
+        return shared_memory.SharedMemory(name=name, create=True, size=size)
+    except FileExistsError:
+        raise FileExistsError(
+            f"Shared memory segment '{name}' already exists; another session may be "
+            f"publishing to it (remove /dev/shm/{name} if it was left by a crashed run)"
+        ) from None
+
+
+def _json_default(value):
+    # numpy scalars from the detectors
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class LiveStatePublisher:
+    """Publishes the latest pipeline state to a shared-memory slot.
+
+    The slot holds one JSON document guarded by a seqlock: the writer bumps
+    the sequence to odd, writes, then bumps it to even, and readers retry
+    when the sequence changed underneath them. Publishing never blocks on
+    readers and readers never touch the pipeline or any files.
+    """
+
+    def __init__(self, name=DEFAULT_NAME, size=DEFAULT_SIZE):
+        self.size = size
+        self.shm = create_shared_memory(name, size)
+        self.seq = 0
+        HEADER.pack_into(self.shm.buf, 0, 0, 0)
+
+    def publish(self, state):
+        """Replace the published state with a JSON-serialisable dict"""
+        payload = json.dumps(state, default=_json_default).encode('utf-8')
+        if len(payload) > self.size - HEADER.size:
+            payload = json.dumps({'error': 'state too large', 'updated_at': time.time()}).encode('utf-8')
+        buf = self.shm.buf
+        self.seq += 1
+        HEADER.pack_into(buf, 0, self.seq, 0)
+        buf[HEADER.size:HEADER.size + len(payload)] = payload
+        self.seq += 1
+        HEADER.pack_into(buf, 0, self.seq, len(payload))
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+class LiveStateReader:
+    """Reads the state published by LiveStatePublisher from another process"""
+
+    def __init__(self, name=DEFAULT_NAME, retries=100, stale_after=5.0):
+        self.name = name
+        self.retries = retries
+        self.stale_after = stale_after
+        self.shm = None
+
+    def read(self):
+        """Return the latest state dict, or None when no pipeline is publishing"""
+        state = self._read_once()
+        if state is not None and time.time() - state.get('updated_at', 0) > self.stale_after:
+            # The pipeline may have restarted with a new segment under the same name
+            self.close()
+            state = self._read_once() or state
+        return state
+
+    def _read_once(self):
+        if self.shm is None:
+            try:
+                self.shm = attach_shared_memory(self.name)
+            except FileNotFoundError:
+                return None
+        buf = self.shm.buf
+        for _ in range(self.retries):
+            seq, length = HEADER.unpack_from(buf, 0)
+            if seq % 2:
+                continue
+            payload = bytes(buf[HEADER.size:HEADER.size + length])
+            if HEADER.unpack_from(buf, 0)[0] == seq:
+                return json.loads(payload) if length else None
+        return None
+
+    def close(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm = None
@@ -37,11 +37,13 @@ import os
 from datetime import datetime
 
 class AlertLogger:
-    def __init__(self, config):
+    def __init__(self, config, store=None, session_id=None):
         self.log_path = config['logging']['log_path']
         self.alerts = []
         self.cooldown = config['logging']['alert_cooldown']
         self.last_alert_time = {}
+        self.store = store
+        self.session_id = session_id
         
         # Create log directory if it doesn't exist
         os.makedirs(self.log_path, exist_ok=True)
@@ -65,5 +67,8 @@ class AlertLogger:
         log_file = os.path.join(self.log_path, "alerts.log")
         with open(log_file, "a") as f:
             f.write(log_entry + "\n")
+
+        if self.store:
+            self.store.add_alert(self.session_id, alert_type.upper(), message, current_time)
             
         return log_entry
\ No newline at end of file
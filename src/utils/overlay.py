@@ -0,0 +1,40 @@
+import cv2
+
+
+def display_detection_results(frame, results, current_alert, unique_alert_count, total_alert_types):
+    """Draws the header, status line and alert bar onto the frame in place"""
+    h, w = frame.shape[:2]
+
+    # --- Header Bar ---
+    cv2.rectangle(frame, (0, 0), (w, 60), (25, 25, 112), -1)
+    cv2.putText(frame, "Enhanced Online Proctoring System", (20, 30),
+                cv2.FONT_HERSHEY_TRIPLEX, 0.6, (255, 255, 255), 2)
+    cv2.putText(frame, results['timestamp'], (w - 220, 50),
+                cv2.FONT_HERSHEY_TRIPLEX, 0.6, (255, 255, 255), 2)
+
+    # --- Status Line ---
+    cv2.rectangle(frame, (0, 65), (w, 95), (230, 230, 230), -1)
+    status = (
+        f"Face: {'Present' if results['face_present'] else 'Absent'}   Gaze: {results['gaze_direction']}   "
+        f"Head: {results.get('head_pose') or 'Forward'}   "
+        f"Eyes: {'Open' if results['eye_ratio'] > 0.25 else 'Closed'}   Mouth: {'Moving' if results['mouth_moving'] else 'Still'}"
+    )
+    cv2.putText(frame, status, (15, 85), cv2.FONT_HERSHEY_TRIPLEX, 0.5, (0, 0, 0), 2)
+
+    # --- Alert Bar ---
+    cv2.rectangle(frame, (0, h - 40), (w, h), (0, 215, 255), -1)
+    if current_alert:
+        alert_display = f"ALERT: {current_alert} | Unique Alerts: {unique_alert_count}/{total_alert_types}"
+    else:
+        alert_display = "Status: All clear"
+    cv2.putText(frame, alert_display, (15, h - 12),
+                cv2.FONT_HERSHEY_TRIPLEX, 0.6, (0, 0, 0), 2)
+
+
+def display_termination_banner(frame, reason="All Alerts Triggered"):
+    """Draws the session-terminated banner with the termination reason onto the frame in place"""
+    cv2.rectangle(frame, (0, frame.shape[0] - 60),
+                  (frame.shape[1], frame.shape[0]), (0, 0, 255), -1)
+    cv2.putText(frame, f"Session Terminated - {reason}",
+                (20, frame.shape[0] - 20),
+                cv2.FONT_HERSHEY_DUPLEX, 0.8, (255, 255, 255), 2)
@@ -0,0 +1,125 @@
+import time
+import struct
+import cv2
+import psutil
+from utils.live_state import attach_shared_memory, create_shared_memory
+
+# Control block written by the dashboard: viewer count and a heartbeat time
+CONTROL = struct.Struct('<Id')
+# Frame header written by the pipeline: seqlock sequence, JPEG length, frame time
+FRAME = struct.Struct('<QId')
+FRAME_OFFSET = 16
+DEFAULT_SIZE = 2 * 1024 * 1024
+
+# (cpu percent above which, max width, jpeg quality, fps)
+QUALITY_STEPS = (
+    (85, 320, 45, 5),
+    (65, 480, 60, 8),
+    (0, 640, 75, 12)
+)
+
+
+class PreviewPublisher:
+    """Shares JPEG preview frames of the running session with the dashboard.
+
+    Frames are only encoded while the dashboard reports at least one viewer
+    with a fresh heartbeat. Width, quality and frame rate drop as CPU load
+    rises, and quality drops further for many viewers since every viewer
+    receives the same bytes. Each frame is encoded once no matter how many
+    viewers are watching.
+    """
+
+    def __init__(self, name, config=None, size=DEFAULT_SIZE):
+        preview_config = (config or {}).get('preview', {})
+        self.max_width = preview_config.get('max_width', 640)
+        self.max_fps = preview_config.get('max_fps', 12)
+        self.heartbeat_timeout = preview_config.get('heartbeat_timeout', 3.0)
+        self.name = name
+        self.size = size
+        self.shm = create_shared_memory(name, size)
+        CONTROL.pack_into(self.shm.buf, 0, 0, 0.0)
+        FRAME.pack_into(self.shm.buf, FRAME_OFFSET, 0, 0, 0.0)
+        self.seq = 0
+        self.last_encode = 0.0
+        self.cpu = 0.0
+        self.cpu_checked = 0.0
+        self.encoded_frames = 0
+        psutil.cpu_percent(interval=None)  # prime the non-blocking measurement
+
+    def viewers(self):
+        count, heartbeat = CONTROL.unpack_from(self.shm.buf, 0)
+        return count if time.time() - heartbeat < self.heartbeat_timeout else 0
+
+    def _settings(self, viewers):
+        now = time.monotonic()
+        if now - self.cpu_checked >= 1.0:
+            self.cpu = psutil.cpu_percent(interval=None)
+            self.cpu_checked = now
+        for threshold, width, quality, fps in QUALITY_STEPS:
+            if self.cpu > threshold:
+                break
+        if viewers > 4:
+            quality -= 10
+        return min(width, self.max_width), quality, min(fps, self.max_fps)
+
+    def offer(self, frame, timestamp=None):
+        """Encode and publish the frame if anyone is watching and it is due"""
+        viewers = self.viewers()
+        if not viewers:
+            return False
+        width, quality, fps = self._settings(viewers)
+        now = time.monotonic()
+        if now - self.last_encode < 1.0 / fps:
+            return False
+        self.last_encode = now
+
+        h, w = frame.shape[:2]
+        if w > width:
+            frame = cv2.resize(frame, (width, int(h * width / w)), interpolation=cv2.INTER_AREA)
+        ok, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok or len(jpeg) > self.size - FRAME_OFFSET - FRAME.size:
+            return False
+
+        buf = self.shm.buf
+        start = FRAME_OFFSET + FRAME.size
+        self.seq += 1
+        FRAME.pack_into(buf, FRAME_OFFSET, self.seq, 0, 0.0)
+        buf[start:start + len(jpeg)] = jpeg.tobytes()
+        self.seq += 1
+        FRAME.pack_into(buf, FRAME_OFFSET, self.seq, len(jpeg), timestamp or time.time())
+        self.encoded_frames += 1
+        return True
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+class PreviewReader:
+    """Dashboard side of PreviewPublisher: announces viewers and reads frames"""
+
+    def __init__(self, name, retries=100):
+        self.shm = attach_shared_memory(name)
+        self.retries = retries
+
+    def set_viewers(self, count):
+        """Report the viewer count; call at least every heartbeat_timeout / 2"""
+        CONTROL.pack_into(self.shm.buf, 0, count, time.time())
+
+    def read(self, last_seq=0):
+        """Return (seq, jpeg bytes, timestamp) for a frame newer than last_seq, else None"""
+        buf = self.shm.buf
+        start = FRAME_OFFSET + FRAME.size
+        for _ in range(self.retries):
+            seq, length, timestamp = FRAME.unpack_from(buf, FRAME_OFFSET)
+            if seq % 2:
+                continue
+            if seq == last_seq or not length:
+                return None
+            jpeg = bytes(buf[start:start + length])
+            if FRAME.unpack_from(buf, FRAME_OFFSET)[0] == seq:
+                return seq, jpeg, timestamp
+        return None
+
+    def close(self):
+        self.shm.close()
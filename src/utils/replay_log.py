@@ -0,0 +1,180 @@
+import json
+import struct
+import numpy as np
+
+MAGIC = b'PROCTOR-REPLAY\x01\n'
+LENGTH = struct.Struct('<I')  # byte length of the JSON header that follows
+LANDMARK_COUNT = 478  # FaceMesh landmarks with refine_landmarks=True
+
+
+def _column(values, dtype, width=None):
+    shape = (-1,) if width is None else (-1,) + width
+    if not len(values):
+        return np.zeros((0,) + (width or ()), dtype)
+    return np.asarray(values, dtype).reshape(shape)
+
+
+class ReplayLogWriter:
+    """Writes the raw detector outputs of every frame to a columnar binary log.
+
+    Frames are buffered and written in blocks: a JSON header naming each
+    column's dtype and shape, then the raw column arrays. Per-frame values
+    (time, frame size, audio levels, landmarks) are one row per frame;
+    face and object detections vary in number, so they are stored flat
+    with a per-frame count column (object_count is -1 where YOLO skipped
+    the frame).
+    Landmarks keep only the indices the detectors read, as float16.
+    """
+
+    def __init__(self, path, landmark_indices, meta=None, block_frames=300):
+        self.path = path
+        self.landmark_indices = sorted(set(landmark_indices))
+        self.block_frames = block_frames
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC)
+        self._write_header(dict(meta or {}, landmark_indices=self.landmark_indices))
+        self.frames = 0
+        self._reset()
+
+    def _write_header(self, header):
+        data = json.dumps(header).encode()
+        self.file.write(LENGTH.pack(len(data)) + data)
+
+    def _reset(self):
+        self.rows = {name: [] for name in (
+            'ts', 'frame_size', 'face_count', 'face_boxes', 'face_probs', 'landmarks',
+            'object_count', 'object_boxes', 'object_conf', 'object_cls', 'audio'
+        )}
+
+    def write(self, timestamp, frame_shape, outputs):
+        """Buffer one frame of DetectionPipeline.infer() outputs"""
+        rows = self.rows
+        rows['ts'].append(timestamp)
+        rows['frame_size'].append(frame_shape[:2])
+
+        boxes, probs = outputs['faces']
+        rows['face_count'].append(len(boxes))
+        rows['face_boxes'].extend(boxes)
+        rows['face_probs'].extend(probs)
+
+        landmarks = outputs['landmarks']
+        rows['landmarks'].append(np.nan if landmarks is None else landmarks[self.landmark_indices])
+
+        objects = outputs['objects']
+        rows['object_count'].append(-1 if objects is None else len(objects[0]))
+        if objects is not None:
+            rows['object_boxes'].extend(objects[0])
+            rows['object_conf'].extend(objects[1])
+            rows['object_cls'].extend(objects[2])
+
+        rows['audio'].append((np.nan, np.nan) if outputs['audio'] is None else outputs['audio'])
+
+        self.frames += 1
+        if len(rows['ts']) >= self.block_frames:
+            self.flush()
+
+    def flush(self):
+        rows = self.rows
+        if not rows['ts']:
+            return
+        landmarks = np.full((len(rows['landmarks']), len(self.landmark_indices), 2), np.nan, np.float16)
+        for i, points in enumerate(rows['landmarks']):
+            landmarks[i] = points
+        columns = {
+            'ts': _column(rows['ts'], np.float64),
+            'frame_size': _column(rows['frame_size'], np.uint16, (2,)),
+            'face_count': _column(rows['face_count'], np.int16),
+            'face_boxes': _column(rows['face_boxes'], np.float32, (4,)),
+            'face_probs': _column(rows['face_probs'], np.float32),
+            'landmarks': landmarks,
+            'object_count': _column(rows['object_count'], np.int16),
+            'object_boxes': _column(rows['object_boxes'], np.float32, (4,)),
+            'object_conf': _column(rows['object_conf'], np.float32),
+            'object_cls': _column(rows['object_cls'], np.int16),
+            'audio': _column(rows['audio'], np.float32, (2,))
+        }
+        self._write_header({
+            'frames': len(rows['ts']),
+            'columns': [[name, array.dtype.str, array.shape] for name, array in columns.items()]
+        })
+        for array in columns.values():
+            self.file.write(np.ascontiguousarray(array).tobytes())
+        self.file.flush()
+        self._reset()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class ReplayLogReader:
+    """Reads a ReplayLogWriter file back as per-frame detector outputs"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.meta = self._read_header() if self.file.read(len(MAGIC)) == MAGIC else None
+        if self.meta is None:
+            raise ValueError(f"Not a replay log: {path}")
+        self.landmark_indices = self.meta['landmark_indices']
+
+    def _read_header(self):
+        prefix = self.file.read(LENGTH.size)
+        if len(prefix) < LENGTH.size:
+            return None
+        data = self.file.read(LENGTH.unpack(prefix)[0])
+        try:
+            return json.loads(data)
+        except ValueError:
+            return None  # cut off mid-write
+
+    def blocks(self):
+        """Yield each block as {column name: array}; stops at a truncated block"""
+        while True:
+            header = self._read_header()
+            if header is None:
+                return
+            block = {}
+            for name, dtype, shape in header['columns']:
+                dtype = np.dtype(dtype)
+                size = dtype.itemsize * int(np.prod(shape))
+                data = self.file.read(size)
+                if len(data) < size:
+                    return
+                block[name] = np.frombuffer(data, dtype).reshape(shape)
+            yield block
+
+    def frames(self):
+        """Yield (timestamp, frame_shape, outputs) with outputs shaped like DetectionPipeline.infer()"""
+        size = max(self.landmark_indices) + 1 if self.landmark_indices else 0
+        for block in self.blocks():
+            face_ends = np.cumsum(block['face_count'])
+            object_ends = np.cumsum(np.maximum(block['object_count'], 0))
+            for i, timestamp in enumerate(block['ts']):
+                face_start = face_ends[i] - block['face_count'][i]
+                faces = (block['face_boxes'][face_start:face_ends[i]],
+                         block['face_probs'][face_start:face_ends[i]])
+
+                objects = None
+                if block['object_count'][i] >= 0:
+                    object_start = object_ends[i] - block['object_count'][i]
+                    objects = (block['object_boxes'][object_start:object_ends[i]],
+                               block['object_conf'][object_start:object_ends[i]],
+                               block['object_cls'][object_start:object_ends[i]])
+
+                landmarks = None
+                if not np.isnan(block['landmarks'][i]).any():
+                    landmarks = np.full((max(size, LANDMARK_COUNT), 2), np.nan, np.float32)
+                    landmarks[self.landmark_indices] = block['landmarks'][i]
+
+                energy, zcr = block['audio'][i]
+                audio = None if np.isnan(energy) else (energy, zcr)
+                yield float(timestamp), tuple(int(v) for v in block['frame_size'][i]), {
+                    'faces': faces,
+                    'landmarks': landmarks,
+                    'objects': objects,
+                    'audio': audio
+                }
+
+    def close(self):
+        self.file.close()
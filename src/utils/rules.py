@@ -0,0 +1,200 @@
+import math
+from collections import defaultdict
+
+
+def extract_signals(results):
+    """Boolean detector signals for one frame, keyed by violation type"""
+    return {
+        'FACE_DISAPPEARED': not results['face_present'],
+        'OBJECT_DETECTED': bool(results['objects_detected']),
+        'MOUTH_MOVING': bool(results['mouth_moving']),
+        'AUDIO_DETECTED': bool(results['audio_detected']),
+        'GAZE_AWAY': str(results['gaze_direction']).lower() != 'center',
+        'MULTIPLE_FACES': bool(results['multiple_faces']),
+        'HEAD_TURNED': results.get('head_pose') not in (None, 'Forward')
+    }
+
+
+def signal_confidences(signals, results):
+    """IntervalTracker input: the detector confidence of each active signal, 1.0 where there is none"""
+    confidences = results.get('confidences', {})
+    return {name: confidences.get(name) or 1.0 for name, active in signals.items() if active}
+
+
+class WindowCounter:
+    """Active time and onset count of one signal over a sliding time window.
+
+    Time is split into fixed buckets held in a ring; each update clears the
+    buckets that fell out of the window and adjusts running sums, so reads
+    and writes are O(1) amortised whatever the frame rate.
+    """
+
+    def __init__(self, window, resolution=0.1):
+        self.resolution = resolution
+        self.size = max(int(math.ceil(window / resolution)), 1)
+        self.active = [0.0] * self.size
+        self.onsets = [0] * self.size
+        self.active_sum = 0.0
+        self.onset_sum = 0
+        self.origin = None  # first timestamp; buckets count from it so only relative times matter
+        self.bucket = None  # index of the newest bucket
+
+    def add(self, timestamp, active_seconds, onset):
+        if self.origin is None:
+            self.origin = timestamp
+        bucket = int((timestamp - self.origin) // self.resolution)
+        if self.bucket is None:
+            self.bucket = bucket
+        elif bucket > self.bucket:
+            for b in range(self.bucket + 1, min(bucket, self.bucket + self.size) + 1):
+                i = b % self.size
+                self.active_sum -= self.active[i]
+                self.onset_sum -= self.onsets[i]
+                self.active[i] = 0.0
+                self.onsets[i] = 0
+            self.bucket = bucket
+        i = self.bucket % self.size
+        self.active[i] += active_seconds
+        self.active_sum += active_seconds
+        if onset:
+            self.onsets[i] += 1
+            self.onset_sum += 1
+
+
+class Rule:
+    """One declarative alert rule from the rules: section of config.yaml.
+
+    A rule fires when every one of its signals meets the condition within
+    the trailing `within` seconds: active for at least `active_for` seconds,
+    at least `count` onsets, or simply active at some point (the default).
+    With within 0 the signals only have to be active in the same frame, so
+    active_for and count need a within window.
+    """
+
+    def __init__(self, spec):
+        self.name = spec['name']
+        self.signals = list(spec['signals'])
+        self.within = spec.get('within', 0)
+        self.active_for = spec.get('active_for', 0)
+        self.count = spec.get('count', 0)
+        if (self.active_for or self.count) and not self.within:
+            raise ValueError(f"Rule {self.name}: active_for and count need a within window")
+        self.message = spec.get('message', self.name)
+        self.speak = spec.get('speak')
+        self.cooldown = spec.get('cooldown', 2)
+        self.terminate = spec.get('terminate', False)
+        self.last_fired = None
+
+    def conditions(self):
+        """The rule as a set of (signal, within, active_for, count) conditions"""
+        return frozenset((signal, self.within, self.active_for, self.count) for signal in self.signals)
+
+
+class RulesEngine:
+    """Evaluates all rules incrementally, one frame at a time.
+
+    Window counters are shared per (signal, window). Rules with the same
+    conditions are grouped, and a frame only tests the groups that use one
+    of its active signals, checking each of their conditions at most once
+    however many groups share it. Frames without active signals check nothing.
+    """
+
+    def __init__(self, config, max_frame_gap=1.0):
+        rules_config = config.get('rules', [])
+        self.rules = [Rule(spec) for spec in rules_config]
+        self.max_frame_gap = max_frame_gap  # caps the active time credited to one frame
+        self.groups = {}  # condition set -> rules with exactly those conditions
+        self.counters = defaultdict(dict)  # signal -> {window: WindowCounter}
+        for rule in self.rules:
+            self.groups.setdefault(rule.conditions(), []).append(rule)
+            for signal in rule.signals:
+                if rule.within and rule.within not in self.counters[signal]:
+                    self.counters[signal][rule.within] = WindowCounter(rule.within)
+        self.by_signal = defaultdict(list)  # signal -> condition sets that use it
+        for conditions in self.groups:
+            for signal in {condition[0] for condition in conditions}:
+                self.by_signal[signal].append(conditions)
+
+        termination = config.get('termination', {})
+        names = termination.get('after_rules') or [rule.name for rule in self.rules]
+        self.termination_rules = set(names)
+        self.termination_count = termination.get('min_distinct', len(self.termination_rules))
+        self.fired = set()  # names of rules that have fired at least once
+        self.previous = {}  # signal -> active in the previous frame
+        self.last_active = {}  # signal -> timestamp it was last active
+        self.last_timestamp = None
+
+    def update(self, signals, timestamp):
+        """
+        Feed one frame of signals
+
+        Args:
+            signals (dict): {signal name: bool}
+            timestamp (float): Frame time in epoch seconds
+
+        Returns:
+            tuple: (rules satisfied in this frame, rules that fired in this frame)
+        """
+        dt = 0.0 if self.last_timestamp is None else min(max(timestamp - self.last_timestamp, 0.0),
+                                                           self.max_frame_gap)
+        self.last_timestamp = timestamp
+
+        candidates = set()
+        for signal, windows in self.counters.items():
+            active = bool(signals.get(signal))
+            onset = active and not self.previous.get(signal, False)
+            for counter in windows.values():
+                counter.add(timestamp, dt if active else 0.0, onset)
+        for signal, active in signals.items():
+            if active:
+                self.last_active[signal] = timestamp
+                candidates.update(self.by_signal.get(signal, ()))
+            self.previous[signal] = bool(active)
+
+        satisfied, fired = [], []
+        if not candidates:
+            return satisfied, fired
+        holding = {}  # condition -> holds in this frame, shared between candidate groups
+        for conditions in candidates:
+            if not all(self._holds_once(condition, signals, timestamp, holding) for condition in conditions):
+                continue
+            for rule in self.groups[conditions]:
+                satisfied.append(rule)
+                if rule.last_fired is None or timestamp - rule.last_fired >= rule.cooldown:
+                    rule.last_fired = timestamp
+                    self.fired.add(rule.name)
+                    fired.append(rule)
+        return satisfied, fired
+
+    def _holds_once(self, condition, signals, timestamp, holding):
+        if condition not in holding:
+            holding[condition] = self._holds(condition, signals, timestamp)
+        return holding[condition]
+
+    def _holds(self, condition, signals, timestamp):
+        signal, within, active_for, count = condition
+        if not within:
+            return bool(signals.get(signal))
+        counter = self.counters[signal][within]
+        if active_for and counter.active_sum < active_for:
+            return False
+        if count and counter.onset_sum < count:
+            return False
+        return timestamp - self.last_active.get(signal, -math.inf) <= within
+
+    def distinct_fired(self):
+        """Number of termination rules that have fired so far"""
+        return len(self.fired & self.termination_rules)
+
+    def should_terminate(self, fired):
+        return (any(rule.terminate for rule in fired) or
+                (self.termination_count and self.distinct_fired() >= self.termination_count))
+
+    def termination_reason(self, fired):
+        """Why should_terminate(fired) ended the session, for the banner and the console"""
+        for rule in fired:
+            if rule.terminate:
+                return rule.message
+        if self.termination_count >= len(self.termination_rules):
+            return "All Alerts Triggered"
+        return f"{self.distinct_fired()} of {len(self.termination_rules)} Alerts Triggered"
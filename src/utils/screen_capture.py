@@ -1,10 +1,40 @@
 import cv2
 import numpy as np
-from mss import mss
 from datetime import datetime
 import os
 import threading
 import time
+import logging
+from utils.segmented_writer import SegmentedVideoWriter
+
+# Change detection samples every SAMPLE_STRIDE-th pixel and averages the
+# samples over blocks of BLOCK_SAMPLES x BLOCK_SAMPLES (16 px blocks)
+SAMPLE_STRIDE = 4
+BLOCK_SAMPLES = 4
+
+
+def load_activity_index(path):
+    """Load a screen activity sidecar written by ScreenRecorder"""
+    with np.load(path) as index:
+        return {key: index[key] for key in index.files}
+
+
+def find_screen_changes(path, threshold=20.0, min_gap=1.0):
+    """Return (timestamp, score, frame_index) for large screen changes.
+
+    Changes closer than min_gap seconds to the previous one are merged so a
+    single page switch is reported once.
+    """
+    index = load_activity_index(path)
+    hits = np.flatnonzero(index['scores'] >= threshold)
+    changes = []
+    for i in hits:
+        ts = float(index['timestamps'][i])
+        if changes and ts - changes[-1][0] < min_gap:
+            continue
+        changes.append((ts, float(index['scores'][i]), int(index['frame_index'][i])))
+    return changes
+
 
 class ScreenRecorder:
     def __init__(self, config):
@@ -13,71 +43,242 @@ class ScreenRecorder:
         self.writer = None
         self.frame_count = 0
         self.recording_path = config['video']['recording_path']
+        self.segment_seconds = config['video'].get('segment_minutes', 5) * 60
         self.lock = threading.Lock()
         self.stop_event = threading.Event()
         self.thread = None
-        
+        self.logger = logging.getLogger('ScreenRecorder')
+
+        # Capture options
+        self.fps = self.config['fps']
+        self.scale = self.config.get('scale', 1.0)
+        self.block_threshold = self.config.get('change_block_threshold', 6.0)
+        self.change_fraction = self.config.get('change_fraction', 0.001)
+        self.static_policy = self.config.get('static_frame_policy', 'duplicate')  # or 'skip'
+        self.stats_interval = self.config.get('stats_interval', 60)
+        self.frame_size = None
+        self.timestamps = []
+        self.stats = {'captured': 0, 'encoded': 0, 'duplicated': 0, 'skipped': 0, 'missed': 0}
+        self.stats_history = []
+
+        # Activity index: one entry per captured frame
+        self.activity = {'timestamps': [], 'scores': [], 'hashes': [], 'frame_index': []}
+        self.event_threshold = self.config.get('activity_event_threshold', 20.0)
+        self.event_cooldown = self.config.get('activity_event_cooldown', 2.0)
+        self.last_event_time = 0
+        self.on_screen_change = None  # callback(timestamp, score)
+
+        # Change detection state of the capture thread
+        self.prev_signature = None  # previous capture, for the activity score
+        self.encoded_signature = None  # last encoded frame, for the encode decision
+        self.last_frame = None
+
     def _initialize_sct(self):
         """Initialize MSS in the thread where it will be used"""
+        from mss import mss  # only needed once recording starts
         self.sct = mss()
         monitors = self.sct.monitors
         if len(monitors) > self.config['monitor_index'] + 1:  # +1 because monitor 0 is all screens
             self.monitor = monitors[self.config['monitor_index'] + 1]
         else:
             self.monitor = monitors[1]  # Default to first monitor
-        
+
     def start_recording(self):
         if not os.path.exists(self.recording_path):
             os.makedirs(self.recording_path)
-            
+
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.filename = os.path.join(self.recording_path, f"screen_{timestamp}.mp4")
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        
-        # Initialize writer with monitor dimensions
+
+        # Initialize writer with monitor dimensions (optionally downscaled)
         self._initialize_sct()
-        self.writer = cv2.VideoWriter(
+        width, height = self.monitor['width'], self.monitor['height']
+        if self.scale != 1.0:
+            width, height = int(width * self.scale) // 2 * 2, int(height * self.scale) // 2 * 2
+        self.frame_size = (width, height)
+        self.writer = SegmentedVideoWriter(
             self.filename,
-            fourcc,
-            self.config['fps'],
-            (self.monitor['width'], self.monitor['height'])
+            self.fps,
+            self.frame_size,
+            self.segment_seconds
         )
-        
+
         # Start capture thread
         self.stop_event.clear()
         self.thread = threading.Thread(target=self._capture_loop)
         self.thread.start()
-        
+
+    @staticmethod
+    def _signature(raw):
+        """Mean green level of every 16 px block, from a strided sample of the screen"""
+        sample = np.ascontiguousarray(raw[::SAMPLE_STRIDE, ::SAMPLE_STRIDE, 1])
+        h, w = sample.shape
+        h, w = max(h - h % BLOCK_SAMPLES, BLOCK_SAMPLES), max(w - w % BLOCK_SAMPLES, BLOCK_SAMPLES)
+        blocks = cv2.resize(sample[:h, :w], (w // BLOCK_SAMPLES, h // BLOCK_SAMPLES),
+                            interpolation=cv2.INTER_AREA)
+        return blocks.astype(np.int16)
+
+    def _changed(self, signature):
+        """Whether enough blocks differ from the last encoded frame to encode this one.
+
+        Comparing against the last encoded frame rather than the previous
+        capture lets slow changes accumulate until they are recorded, and a
+        block count instead of a global mean catches small windows and popups.
+        """
+        if self.encoded_signature is None or signature.shape != self.encoded_signature.shape:
+            return True
+        changed_blocks = np.count_nonzero(np.abs(signature - self.encoded_signature) > self.block_threshold)
+        return changed_blocks > 0 and changed_blocks >= self.change_fraction * signature.size
+
+    @staticmethod
+    def _hash(signature):
+        """64-bit difference hash of the signature, identifies repeated screens"""
+        small = cv2.resize(signature.astype(np.uint8), (9, 8), interpolation=cv2.INTER_AREA)
+        bits = np.packbits(small[:, 1:] > small[:, :-1])
+        return int.from_bytes(bits.tobytes(), 'big')
+
+    def _index_frame(self, timestamp, signature, score, frame_index):
+        self.activity['timestamps'].append(timestamp)
+        self.activity['scores'].append(score)
+        self.activity['hashes'].append(self._hash(signature))
+        self.activity['frame_index'].append(frame_index)
+
+        if (self.on_screen_change and score >= self.event_threshold
+                and timestamp - self.last_event_time >= self.event_cooldown):
+            self.last_event_time = timestamp
+            try:
+                self.on_screen_change(timestamp, score)
+            except Exception as e:
+                self.logger.error(f"Screen change callback failed: {str(e)}")
+
     def _capture_loop(self):
         """Main capture loop running in separate thread"""
         self._initialize_sct()  # Initialize MSS in this thread
-        
+
+        interval = 1.0 / self.fps
+        next_deadline = time.perf_counter()
+        window_start = next_deadline
+        window = dict.fromkeys(self.stats, 0)
+        self.prev_signature = self.encoded_signature = self.last_frame = None
+
         while not self.stop_event.is_set():
-            with self.lock:
-                screenshot = self.sct.grab(self.monitor)
-                frame = np.array(screenshot)
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
-                
-                if self.writer:
-                    self.writer.write(frame)
-                    self.frame_count += 1
-                
-            # Control capture rate
-            time.sleep(1.0 / self.config['fps'])
-    
+            raw = np.asarray(self.sct.grab(self.monitor))
+            window[self._capture_frame(raw, time.time())] += 1
+            window['captured'] += 1
+
+            # Deadline-based pacing: sleep until the next slot, skip slots we already missed
+            next_deadline += interval
+            delay = next_deadline - time.perf_counter()
+            if delay > 0:
+                self.stop_event.wait(delay)
+            elif delay < -interval:
+                missed = int(-delay // interval)
+                next_deadline += missed * interval
+                window['missed'] += missed
+
+            elapsed = time.perf_counter() - window_start
+            if elapsed >= self.stats_interval:
+                self._report_window(window, elapsed)
+                window = dict.fromkeys(self.stats, 0)
+                window_start = time.perf_counter()
+
+        elapsed = time.perf_counter() - window_start
+        if window['captured']:
+            self._report_window(window, elapsed)
+
+    def _capture_frame(self, raw, now):
+        """Encode, duplicate or skip one captured BGRA screen; returns the stats key"""
+        signature = self._signature(raw)
+        # Activity score: how much the screen moved since the previous capture
+        score = 0.0 if self.prev_signature is None else float(np.abs(signature - self.prev_signature).mean())
+        self.prev_signature = signature
+        frame_index = self.frame_count
+
+        if self.last_frame is None or self._changed(signature):
+            frame = cv2.cvtColor(raw, cv2.COLOR_BGRA2BGR)
+            if self.scale != 1.0:
+                frame = cv2.resize(frame, self.frame_size, interpolation=cv2.INTER_AREA)
+            self.last_frame = frame
+            self.encoded_signature = signature
+            self._write(frame, now)
+            outcome = 'encoded'
+        elif self.static_policy == 'duplicate':
+            self._write(self.last_frame, now)
+            outcome = 'duplicated'
+        else:
+            frame_index = -1
+            outcome = 'skipped'
+        self._index_frame(now, signature, score, frame_index)
+        return outcome
+
+    def _write(self, frame, timestamp):
+        with self.lock:
+            if self.writer:
+                self.writer.write(frame, timestamp)
+                self.frame_count += 1
+                self.timestamps.append(timestamp)
+
+    def _report_window(self, window, elapsed):
+        """Fold one stats window into the totals and log achieved FPS"""
+        for key, value in window.items():
+            self.stats[key] += value
+        entry = dict(window, seconds=elapsed, achieved_fps=window['captured'] / elapsed if elapsed > 0 else 0)
+        self.stats_history.append(entry)
+        self.logger.info(
+            f"Screen capture: {entry['achieved_fps']:.1f}/{self.fps} fps, "
+            f"{window['duplicated']} duplicated, {window['skipped']} skipped, {window['missed']} missed"
+        )
+
+    def get_stats(self):
+        """Cumulative capture statistics plus the per-window history"""
+        return dict(self.stats, history=list(self.stats_history))
+
     def stop_recording(self):
         """Stop recording and clean up"""
         self.stop_event.set()
         if self.thread:
             self.thread.join()
             self.thread = None
-            
-        if self.writer:
-            self.writer.release()
-            self.writer = None
-            
+
+        manifest, segments = None, []
+        with self.lock:
+            if self.writer:
+                self.writer.release()
+                manifest, segments = self.writer.manifest_path, self.writer.segments
+                self.writer = None
+
+        activity_file = os.path.splitext(self.filename)[0] + "_activity.npz"
+        np.savez_compressed(
+            activity_file,
+            timestamps=np.asarray(self.activity['timestamps'], dtype=np.float64),
+            scores=np.asarray(self.activity['scores'], dtype=np.float32),
+            hashes=np.asarray(self.activity['hashes'], dtype=np.uint64),
+            frame_index=np.asarray(self.activity['frame_index'], dtype=np.int32)
+        )
+
+        if len(self.timestamps) > 1:
+            duration = self.timestamps[-1] - self.timestamps[0]
+        else:
+            duration = self.frame_count / self.fps
+
         return {
             'filename': self.filename,
+            'manifest': manifest,
+            'segments': [s['file'] for s in segments],
+            'activity_file': activity_file,
             'frame_count': self.frame_count,
-            'duration': self.frame_count / self.config['fps']
-        }
\ No newline at end of file
+            'duration': duration,
+            'stats': self.get_stats()
+        }
+
+
+if __name__ == "__main__":
+    # Run from src/ as: python -m utils.screen_capture <activity.npz>
+    import sys
+    if len(sys.argv) < 2:
+        print("Usage: python -m utils.screen_capture <screen_*_activity.npz> [threshold]")
+        sys.exit(1)
+    threshold = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+    for ts, score, frame_index in find_screen_changes(sys.argv[1], threshold):
+        print(f"{datetime.fromtimestamp(ts).strftime('%H:%M:%S.%f')[:-3]}  "
+              f"score={score:6.1f}  frame={frame_index}")
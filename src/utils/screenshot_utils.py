@@ -1,26 +1,88 @@
 import cv2
 import os
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from utils.violation_store import parse_timestamp
 
 class ViolationCapturer:
     def __init__(self, config):
         self.output_dir = os.path.join(config['global']['output_path'], "violation_captures")
         os.makedirs(self.output_dir, exist_ok=True)
-        
+
+        capture_config = config.get('capture', {})
+        self.jpeg_quality = capture_config.get('jpeg_quality', 80)
+        self.max_width = capture_config.get('max_width', 960)
+        self.dedup_distance = capture_config.get('dedup_distance', 4)
+        self.executor = ThreadPoolExecutor(
+            max_workers=capture_config.get('workers', 2),
+            thread_name_prefix='violation-capture'
+        )
+
+        self.lock = threading.Lock()
+        self.last_capture = {}  # violation_type -> (hash, image_path)
+        self.skipped = 0
+
+    def _prepare(self, frame):
+        """Downscale (or copy) the frame so the caller can reuse its buffer"""
+        h, w = frame.shape[:2]
+        if self.max_width and w > self.max_width:
+            new_h = int(h * self.max_width / w)
+            return cv2.resize(frame, (self.max_width, new_h), interpolation=cv2.INTER_AREA)
+        return frame.copy()
+
+    @staticmethod
+    def _dhash(image):
+        """64-bit difference hash, robust to noise and small lighting changes"""
+        small = cv2.resize(image, (9, 8), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        bits = np.packbits(gray[:, 1:] > gray[:, :-1])
+        return int.from_bytes(bits.tobytes(), 'big')
+
     def capture_violation(self, frame, violation_type, timestamp=None):
-        """Saves violation screenshot with metadata"""
-        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        filename = f"{violation_type}_{timestamp}.jpg"
-        path = os.path.join(self.output_dir, filename)
-        
-        # Draw violation label on image
-        labeled_frame = frame.copy()
-        cv2.putText(labeled_frame, f"{violation_type} - {timestamp}", (20, 40), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-        
-        cv2.imwrite(path, labeled_frame)
+        """Queues a violation screenshot and returns its metadata immediately.
+
+        Captures whose perceptual hash matches the previous capture of the
+        same violation type are skipped and point at the earlier image.
+        """
+        captured_at = datetime.fromtimestamp(parse_timestamp(timestamp))
+        timestamp = captured_at.isoformat()
+        stamp = captured_at.strftime("%Y%m%d_%H%M%S_%f")  # filename-safe form of the same instant
+        image = self._prepare(frame)
+        image_hash = self._dhash(image)
+
+        with self.lock:
+            previous = self.last_capture.get(violation_type)
+            if previous and bin(previous[0] ^ image_hash).count('1') <= self.dedup_distance:
+                self.skipped += 1
+                return {
+                    'type': violation_type,
+                    'timestamp': timestamp,
+                    'image_path': previous[1],
+                    'duplicate': True
+                }
+
+            filename = f"{violation_type}_{stamp}.jpg"
+            path = os.path.abspath(os.path.join(self.output_dir, filename))
+            self.last_capture[violation_type] = (image_hash, path)
+
+        self.executor.submit(self._write, image, path, f"{violation_type} - {timestamp}")
         return {
             'type': violation_type,
             'timestamp': timestamp,
-            'image_path': os.path.abspath(path)
-        }
\ No newline at end of file
+            'image_path': path
+        }
+
+    def _write(self, image, path, label):
+        """Draws the violation label and encodes the JPEG on a worker thread"""
+        try:
+            cv2.putText(image, label, (20, 40),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+            cv2.imwrite(path, image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        except Exception as e:
+            print(f"Violation capture failed: {str(e)}")
+
+    def close(self):
+        """Waits for queued captures to be written"""
+        self.executor.shutdown(wait=True)
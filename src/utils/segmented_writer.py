@@ -0,0 +1,161 @@
+import os
+import json
+import bisect
+import cv2
+import numpy as np
+
+
+class SegmentedVideoWriter:
+    """Writes a recording as rolling segments plus an append-only manifest.
+
+    Each closed segment is a complete mp4 with its own moov atom, so a crash
+    only loses the segment being written. The manifest (JSON lines) maps
+    wall-clock time to segments and each segment keeps a .npy of frame
+    timestamps for locating the frame offset.
+    """
+
+    def __init__(self, base_path, fps, frame_size, segment_seconds=300, fourcc='mp4v'):
+        self.base = os.path.splitext(base_path)[0]
+        self.manifest_path = self.base + "_manifest.jsonl"
+        self.fps = fps
+        self.frame_size = frame_size
+        self.segment_seconds = segment_seconds
+        self.fourcc = cv2.VideoWriter_fourcc(*fourcc)
+
+        self.writer = None
+        self.segment_index = -1
+        self.segment_file = None
+        self.segment_start = None
+        self.segment_timestamps = []
+        self.segments = []
+        self.frame_count = 0
+
+    def write(self, frame, timestamp):
+        if (self.writer is None or
+                (self.segment_seconds and timestamp - self.segment_start >= self.segment_seconds)):
+            self._roll(timestamp)
+        self.writer.write(frame)
+        self.segment_timestamps.append(timestamp)
+        self.frame_count += 1
+
+    def _roll(self, timestamp):
+        self._close_segment()
+        self.segment_index += 1
+        self.segment_file = f"{self.base}_{self.segment_index:03d}.mp4"
+        self.segment_start = timestamp
+        self.segment_timestamps = []
+        self.writer = cv2.VideoWriter(self.segment_file, self.fourcc, self.fps, self.frame_size)
+
+    def _close_segment(self):
+        if self.writer is None:
+            return
+        self.writer.release()
+        self.writer = None
+        if not self.segment_timestamps:
+            return
+
+        timestamps_file = os.path.splitext(self.segment_file)[0] + "_timestamps.npy"
+        np.save(timestamps_file, np.asarray(self.segment_timestamps, dtype=np.float64))
+        entry = {
+            'segment': self.segment_index,
+            'file': os.path.basename(self.segment_file),
+            'timestamps': os.path.basename(timestamps_file),
+            'start': self.segment_timestamps[0],
+            'end': self.segment_timestamps[-1],
+            'frames': len(self.segment_timestamps),
+            'fps': self.fps
+        }
+        with open(self.manifest_path, 'a') as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.segments.append(entry)
+
+    def release(self):
+        self._close_segment()
+
+
+def read_manifest(manifest_path):
+    """Return the manifest entries in time order"""
+    entries = []
+    with open(manifest_path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+    return sorted(entries, key=lambda e: e['start'])
+
+
+def locate_frame(manifest_path, timestamp, entries=None):
+    """Map a wall-clock timestamp to (segment entry, frame offset).
+
+    Returns the nearest recorded frame at or before the timestamp, or None
+    when the timestamp is outside every segment.
+    """
+    entries = entries or read_manifest(manifest_path)
+    starts = [e['start'] for e in entries]
+    i = bisect.bisect_right(starts, timestamp) - 1
+    if i < 0 or timestamp > entries[i]['end']:
+        return None
+    entry = entries[i]
+    folder = os.path.dirname(manifest_path)
+    timestamps = np.load(os.path.join(folder, entry['timestamps']))
+    offset = int(np.searchsorted(timestamps, timestamp, side='right')) - 1
+    return entry, max(offset, 0)
+
+
+def extract_frame(manifest_path, timestamp):
+    """Decode the single frame recorded at the given timestamp"""
+    located = locate_frame(manifest_path, timestamp)
+    if located is None:
+        return None
+    entry, offset = located
+    cap = cv2.VideoCapture(os.path.join(os.path.dirname(manifest_path), entry['file']))
+    try:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, offset)
+        ok, frame = cap.read()
+        return frame if ok else None
+    finally:
+        cap.release()
+
+
+def extract_range(manifest_path, start, end, output_path=None):
+    """Return (timestamp, frame) pairs between start and end.
+
+    Only the segments overlapping the range are opened, each seeked straight
+    to its first needed frame. When output_path is given the frames are
+    written to a new mp4 instead and the path is returned.
+    """
+    folder = os.path.dirname(manifest_path)
+    frames = []
+    for entry in read_manifest(manifest_path):
+        if entry['end'] < start or entry['start'] > end:
+            continue
+        timestamps = np.load(os.path.join(folder, entry['timestamps']))
+        first = int(np.searchsorted(timestamps, start, side='left'))
+        last = int(np.searchsorted(timestamps, end, side='right'))
+        if first >= last:
+            continue
+        cap = cv2.VideoCapture(os.path.join(folder, entry['file']))
+        try:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+            for ts in timestamps[first:last]:
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                frames.append((float(ts), frame))
+        finally:
+            cap.release()
+
+    if output_path is None:
+        return frames
+    if not frames:
+        return None
+    h, w = frames[0][1].shape[:2]
+    duration = frames[-1][0] - frames[0][0]
+    fps = (len(frames) - 1) / duration if duration > 0 else 10
+    writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (w, h))
+    for _, frame in frames:
+        writer.write(frame)
+    writer.release()
+    return output_path
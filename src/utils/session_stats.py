@@ -0,0 +1,77 @@
+import threading
+from collections import defaultdict
+from utils.violation_store import parse_timestamp
+
+
+class SessionStats:
+    """Running aggregates for one exam session.
+
+    Updated once per logged violation so the end-of-session report and the
+    dashboard can read totals, severity and a per-minute timeline without
+    re-scanning the violation log.
+    """
+
+    def __init__(self, severity_map=None, bin_seconds=60):
+        self.severity_map = severity_map or {}
+        self.bin_seconds = bin_seconds
+        self.lock = threading.Lock()
+        self.total = 0
+        self.severity_score = 0
+        self.by_type = defaultdict(int)
+        self.first_by_type = {}
+        self.last_by_type = {}
+        self.first_ts = None
+        self.last_ts = None
+        self.start = None  # left edge of bin 0
+        self.bins = defaultdict(list)  # violation type -> counts per bin
+
+    def add(self, violation_type, timestamp=None, severity=None):
+        """Fold one violation into the aggregates"""
+        ts = parse_timestamp(timestamp)
+        if severity is None:
+            severity = self.severity_map.get(violation_type, 1)
+
+        with self.lock:
+            self.total += 1
+            self.severity_score += severity
+            self.by_type[violation_type] += 1
+            self.first_by_type.setdefault(violation_type, ts)
+            self.last_by_type[violation_type] = ts
+            if self.first_ts is None or ts < self.first_ts:
+                self.first_ts = ts
+            if self.last_ts is None or ts > self.last_ts:
+                self.last_ts = ts
+
+            if self.start is None:
+                self.start = ts - ts % self.bin_seconds
+            elif ts < self.start:
+                # Out-of-order entry before the first bin: shift every row right
+                shift = int((self.start - ts) // self.bin_seconds) + 1
+                self.start -= shift * self.bin_seconds
+                for row in self.bins.values():
+                    row[:0] = [0] * shift
+            index = int((ts - self.start) // self.bin_seconds)
+            row = self.bins[violation_type]
+            if len(row) <= index:
+                row.extend([0] * (index + 1 - len(row)))
+            row[index] += 1
+
+    def snapshot(self):
+        """JSON-serialisable copy of the aggregates"""
+        with self.lock:
+            n_bins = max((len(row) for row in self.bins.values()), default=0)
+            return {
+                'total': self.total,
+                'by_type': dict(self.by_type),
+                'severity_score': self.severity_score,
+                'average_severity': self.severity_score / self.total if self.total else 0,
+                'first_ts': self.first_ts,
+                'last_ts': self.last_ts,
+                'first_by_type': dict(self.first_by_type),
+                'last_by_type': dict(self.last_by_type),
+                'bins': {
+                    'start': self.start,
+                    'bin_seconds': self.bin_seconds,
+                    'counts': {vtype: row + [0] * (n_bins - len(row)) for vtype, row in self.bins.items()}
+                }
+            }
@@ -32,7 +32,11 @@
 
 import cv2
 import os
+import time
+import queue
+import threading
 from datetime import datetime
+from utils.segmented_writer import SegmentedVideoWriter
 
 class VideoRecorder:
     def __init__(self, config):
@@ -40,10 +44,29 @@ class VideoRecorder:
         self.recording_path = config['video']['recording_path']
         self.resolution = tuple(config['video']['resolution'])
         self.fps = config['video']['fps']
+        self.segment_seconds = config['video'].get('segment_minutes', 5) * 60
         self.writer = None
+        self.manifest = None
+        self.segments = []
         self.filename = None
         self.frame_count = 0
         self.start_time = datetime.now()
+
+        # Encoder thread fed by a bounded queue
+        self.queue_size = self.config.get('encoder_queue_size', 64)
+        self.queue_policy = self.config.get('encoder_queue_policy', 'drop')  # 'drop' or 'block'
+        self.frames = queue.Queue(maxsize=self.queue_size)
+        self.put_timeout = self.config.get('encoder_put_timeout', 0.5)  # seconds between encoder liveness checks
+        self.stop_timeout = self.config.get('encoder_stop_timeout', 30)  # seconds to wait for the queue to drain
+        self.thread = None
+        self.encoder_error = None
+        self.frame_size = None
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.dropped_frames = 0
+        self.resized_frames = 0
+        self.max_backlog = 0
+        self.backlog_warned = False
         
     def start_recording(self):
         if not os.path.exists(self.recording_path):
@@ -51,28 +74,121 @@ class VideoRecorder:
             
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.filename = os.path.join(self.recording_path, f"webcam_{timestamp}.mp4")
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        self.writer = cv2.VideoWriter(
-            self.filename,
-            fourcc,
-            self.fps,
-            self.resolution
-        )
+        self.start_time = datetime.now()
+
+        # The writer is opened by the encoder thread once the first frame size is known
+        self.encoder_error = None
+        self.thread = threading.Thread(target=self._encode_loop, daemon=True)
+        self.thread.start()
         
-    def record_frame(self, frame):
-        if self.writer:
-            self.writer.write(frame)
-            self.frame_count += 1
-            
+    def record_frame(self, frame, timestamp=None):
+        """Queue a frame for encoding. The frame must not be modified afterwards."""
+        if self.thread is None:
+            return
+
+        item = (timestamp or time.time(), frame)
+        if self.queue_policy == 'block':
+            # Wait in short steps so a dead encoder cannot block the loop forever
+            while True:
+                if not self.thread.is_alive():
+                    self.dropped_frames += 1
+                    return
+                try:
+                    self.frames.put(item, timeout=self.put_timeout)
+                    break
+                except queue.Full:
+                    continue
+        else:
+            try:
+                self.frames.put_nowait(item)
+            except queue.Full:
+                self.dropped_frames += 1
+
+        backlog = self.frames.qsize()
+        self.max_backlog = max(self.max_backlog, backlog)
+        if backlog >= self.queue_size * 0.75 and not self.backlog_warned:
+            print(f"⚠ Video encoder falling behind: {backlog}/{self.queue_size} frames queued")
+            self.backlog_warned = True
+        elif backlog < self.queue_size * 0.25:
+            self.backlog_warned = False
+
+    def backlog(self):
+        """Number of frames waiting to be encoded"""
+        return self.frames.qsize()
+
+    def _encode_loop(self):
+        try:
+            while True:
+                item = self.frames.get()
+                if item is None:
+                    break
+                timestamp, frame = item
+
+                if self.writer is None:
+                    h, w = frame.shape[:2]
+                    self.frame_size = (w, h)
+                    self.writer = SegmentedVideoWriter(
+                        self.filename, self.fps, self.frame_size, self.segment_seconds
+                    )
+                elif (frame.shape[1], frame.shape[0]) != self.frame_size:
+                    frame = cv2.resize(frame, self.frame_size)
+                    self.resized_frames += 1
+
+                self.writer.write(frame, timestamp)
+                self.frame_count += 1
+                if self.first_timestamp is None:
+                    self.first_timestamp = timestamp
+                self.last_timestamp = timestamp
+        except Exception as e:
+            self.encoder_error = e
+            print(f"⚠ Video encoder stopped: {e}")
+        finally:
+            # Finish the segments written so far, also when encoding failed
+            if self.writer:
+                self.writer.release()
+                self.manifest, self.segments = self.writer.manifest_path, self.writer.segments
+                self.writer = None
+
     def stop_recording(self):
-        if self.writer:
-            self.writer.release()
-            self.writer = None
-            duration = (datetime.now() - self.start_time).total_seconds()
-            return {
-                'filename': self.filename,
-                'frame_count': self.frame_count,
-                'duration': duration,
-                'fps': self.frame_count / duration if duration > 0 else 0
-            }
-        return None
\ No newline at end of file
+        if self.thread is None:
+            return None
+
+        # The sentinel only matters while the encoder is still running
+        deadline = time.time() + self.stop_timeout
+        while self.thread.is_alive() and time.time() < deadline:
+            try:
+                self.frames.put(None, timeout=self.put_timeout)
+                break
+            except queue.Full:
+                continue
+        self.thread.join(max(deadline - time.time(), 0))
+        if self.thread.is_alive():
+            print(f"⚠ Video encoder still busy after {self.stop_timeout}s, "
+                  f"{self.frames.qsize()} frames not written")
+        self.thread = None
+
+        # A busy encoder still owns the writer and releases it when it finishes
+        writer = self.writer
+        if writer:
+            manifest, segments = writer.manifest_path, list(writer.segments)
+        else:
+            manifest, segments = self.manifest, self.segments
+
+        duration = (datetime.now() - self.start_time).total_seconds()
+        if self.frame_count > 1 and self.last_timestamp > self.first_timestamp:
+            fps = (self.frame_count - 1) / (self.last_timestamp - self.first_timestamp)
+        else:
+            fps = self.frame_count / duration if duration > 0 else 0
+        return {
+            'filename': self.filename,
+            'manifest': manifest,
+            'segments': [s['file'] for s in segments],
+            'frame_count': self.frame_count,
+            'duration': duration,
+            'fps': fps,
+            'frame_size': self.frame_size,
+            'dropped_frames': self.dropped_frames,
+            'resized_frames': self.resized_frames,
+            'max_backlog': self.max_backlog,
+            'encoder_error': str(self.encoder_error) if self.encoder_error else None
+        }
@@ -1,27 +1,102 @@
 import os
 import json
-from datetime import datetime
+import threading
+from utils.session_stats import SessionStats
+from utils.violation_record import ViolationRecord, to_array
 
 class ViolationLogger:
-    def __init__(self, config):
+    def __init__(self, config, store=None, session_id=None):
         self.log_file = os.path.join(config['global']['output_path'], "violations.json")
-        self.violations = []
+        # One line per open or closed violation as it happens; violations.json is written on close()
+        self.journal_file = os.path.join(config['global']['output_path'], "violations.jsonl")
+        self.journal = None
+        self.records = []
+        self.severity_map = config.get('reporting', {}).get('severity_levels', {})
+        self.store = store
+        self.session_id = session_id
+        self.lock = threading.Lock()
+        self.stats = SessionStats(self.severity_map)
+        self.open_intervals = {}  # IntervalTracker event id -> record
         
     def log_violation(self, violation_type, timestamp=None, metadata=None):
         """Logs a violation with timestamp and metadata"""
-        entry = {
-            'type': violation_type,
-            'timestamp': timestamp or datetime.now().isoformat(),
-            'metadata': metadata or {}
-        }
-        self.violations.append(entry)
-        self._save_to_file()
+        severity = self.severity_map.get(violation_type, 1)
+        record = ViolationRecord.from_metadata(violation_type, timestamp, metadata, severity=severity)
+        with self.lock:
+            self.records.append(record)
+            self._append_to_journal(record)
+        self.stats.add(violation_type, record.ts, severity)
+
+        if self.store:
+            self.store.add_violation(
+                self.session_id,
+                violation_type,
+                record.ts,
+                severity=severity,
+                metadata=record.metadata(),
+                image_path=record.image_path
+            )
+        return record
         
-    def _save_to_file(self):
-        """Saves violations to JSON file"""
-        with open(self.log_file, 'w') as f:
-            json.dump(self.violations, f, indent=2)
-            
+    def log_interval(self, event, metadata=None):
+        """Logs an IntervalTracker event.
+
+        An open event adds one record (counted in the session stats); the
+        matching close event fills in its end, peak confidence and frame
+        count and writes the finished interval to the store.
+        """
+        severity = self.severity_map.get(event['type'], 1)
+        with self.lock:
+            if event['end'] is None:
+                record = ViolationRecord.from_metadata(
+                    event['type'], event['start'], metadata, severity=severity,
+                    confidence=event['peak_confidence'], frame_count=event['frame_count']
+                )
+                self.open_intervals[event['id']] = record
+                self.records.append(record)
+            else:
+                record = self.open_intervals.pop(event['id'])
+                record.close(event['end'], event['frame_count'], event['peak_confidence'])
+            self._append_to_journal(record)
+
+        if event['end'] is None:
+            self.stats.add(event['type'], event['start'], severity)
+        elif self.store:
+            self.store.add_violation(
+                self.session_id,
+                event['type'],
+                event['start'],
+                severity=severity,
+                metadata=record.metadata(),
+                image_path=record.image_path,
+                end=event['end'],
+                confidence=record.confidence,
+                frame_count=record.frame_count
+            )
+        return record
+
+    def _append_to_journal(self, record):
+        """Appends one record to the JSONL journal; a closed interval repeats its open line with the end"""
+        if self.journal is None:
+            self.journal = open(self.journal_file, 'w')
+        self.journal.write(json.dumps(record.to_dict()) + "\n")
+        self.journal.flush()
+
+    def close(self):
+        """Writes all violations to the JSON file and closes the journal"""
+        with self.lock:
+            with open(self.log_file, 'w') as f:
+                json.dump([record.to_dict() for record in self.records], f, indent=2)
+            if self.journal:
+                self.journal.close()
+                self.journal = None
+
     def get_violations(self):
-        """Returns all logged violations"""
-        return self.violations
\ No newline at end of file
+        """Returns all logged violations as JSON-ready dicts"""
+        with self.lock:
+            return [record.to_dict() for record in self.records]
+
+    def get_records(self):
+        """Returns all logged violations as a RECORD_DTYPE array"""
+        with self.lock:
+            return to_array(self.records)
@@ -0,0 +1,201 @@
+import time
+import numpy as np
+from datetime import datetime
+from utils.violation_store import parse_timestamp
+
+# Stable integer codes, append new types at the end
+TYPE_CODES = {
+    'UNKNOWN': 0,
+    'FACE_DISAPPEARED': 1,
+    'GAZE_AWAY': 2,
+    'MOUTH_MOVING': 3,
+    'MULTIPLE_FACES': 4,
+    'OBJECT_DETECTED': 5,
+    'AUDIO_DETECTED': 6,
+    'SCREEN_CHANGED': 7,
+    'HEAD_TURNED': 8
+}
+TYPE_NAMES = {code: name for name, code in TYPE_CODES.items()}
+
+# EyeTracker reports lowercase directions
+GAZE_CODES = {'center': 0, 'left': 1, 'right': 2, 'up': 3, 'down': 4}
+GAZE_NAMES = {code: name for name, code in GAZE_CODES.items()}
+NO_GAZE = 255  # gaze code of a record without a gaze direction
+
+NO_END = -1  # end_ns of a point event or a still-open interval
+
+# Numeric part of a record; paths and extra metadata stay on the object
+RECORD_DTYPE = np.dtype([
+    ('type', np.uint8),
+    ('severity', np.float32),  # configured levels need not be whole numbers
+    ('gaze', np.uint8),
+    ('frame_count', np.uint32),
+    ('confidence', np.float32),
+    ('eye_ratio', np.float32),
+    ('mono_ns', np.int64),
+    ('epoch_ns', np.int64),
+    ('end_ns', np.int64)
+])
+
+
+def _iso(epoch_ns):
+    return datetime.fromtimestamp(epoch_ns / 1e9).isoformat()
+
+
+class ViolationRecord:
+    """Compact violation entry with integer type code and nanosecond timestamps.
+
+    epoch_ns is wall-clock time for display and joins with recordings,
+    mono_ns is time.monotonic_ns() for ordering and durations that must not
+    jump with clock changes. to_dict()/from_dict() round-trip losslessly
+    through JSON; from_dict() also accepts the older free-form entries.
+    """
+
+    __slots__ = ('type_code', 'severity', 'gaze', 'frame_count', 'confidence', 'eye_ratio',
+                 'mono_ns', 'epoch_ns', 'end_ns', 'image_path', 'clip_path', 'extra')
+
+    def __init__(self, violation_type, timestamp=None, severity=1, mono_ns=None, end=None,
+                 confidence=1.0, frame_count=1, gaze_direction=None, eye_ratio=float('nan'),
+                 image_path=None, clip_path=None, extra=None):
+        if isinstance(violation_type, str):
+            self.type_code = TYPE_CODES.get(violation_type, 0)
+            if not self.type_code:
+                extra = dict(extra or {}, type=violation_type)  # keep unknown names lossless
+        else:
+            self.type_code = int(violation_type)
+        self.severity = severity
+        if isinstance(gaze_direction, int):
+            self.gaze = gaze_direction
+        elif gaze_direction is None:
+            self.gaze = NO_GAZE
+        else:
+            self.gaze = GAZE_CODES.get(gaze_direction, NO_GAZE)
+            if self.gaze == NO_GAZE:
+                extra = dict(extra or {}, gaze_direction=gaze_direction)  # keep other spellings lossless
+        self.frame_count = frame_count
+        self.confidence = float(confidence)
+        self.eye_ratio = float(eye_ratio)
+        self.mono_ns = time.monotonic_ns() if mono_ns is None else mono_ns
+        self.epoch_ns = time.time_ns() if timestamp is None else int(round(parse_timestamp(timestamp) * 1e9))
+        self.end_ns = NO_END if end is None else int(round(parse_timestamp(end) * 1e9))
+        self.image_path = image_path
+        self.clip_path = clip_path
+        self.extra = extra  # anything outside the fixed payload, kept only for JSON
+
+    @property
+    def type(self):
+        if not self.type_code and self.extra and 'type' in self.extra:
+            return self.extra['type']
+        return TYPE_NAMES.get(self.type_code, 'UNKNOWN')
+
+    @property
+    def ts(self):
+        return self.epoch_ns / 1e9
+
+    @property
+    def duration(self):
+        return None if self.end_ns == NO_END else (self.end_ns - self.epoch_ns) / 1e9
+
+    def close(self, end, frame_count=None, confidence=None):
+        """Mark an interval record as finished"""
+        self.end_ns = int(round(parse_timestamp(end) * 1e9))
+        if frame_count is not None:
+            self.frame_count = frame_count
+        if confidence is not None:
+            self.confidence = confidence
+
+    def metadata(self):
+        """Fixed payload as the metadata dict used by the store and reports"""
+        metadata = {k: v for k, v in (self.extra or {}).items() if k != 'type'}
+        if self.gaze in GAZE_NAMES:
+            metadata['gaze_direction'] = GAZE_NAMES[self.gaze]
+        if self.eye_ratio == self.eye_ratio:  # not NaN
+            metadata['eye_ratio'] = self.eye_ratio
+        if self.image_path:
+            metadata['image_path'] = self.image_path
+        if self.clip_path:
+            metadata['clip_path'] = self.clip_path
+        return metadata
+
+    def to_dict(self):
+        """JSON-ready dict; 'timestamp' and 'metadata' keep old readers working"""
+        entry = {
+            'type': self.type,
+            'timestamp': _iso(self.epoch_ns),
+            'epoch_ns': self.epoch_ns,
+            'mono_ns': self.mono_ns,
+            'severity': self.severity,
+            'confidence': self.confidence,
+            'frame_count': self.frame_count,
+            'metadata': self.metadata()
+        }
+        if self.end_ns != NO_END:
+            entry['end'] = _iso(self.end_ns)
+            entry['end_ns'] = self.end_ns
+            entry['duration'] = self.duration
+        return entry
+
+    @classmethod
+    def from_metadata(cls, violation_type, timestamp=None, metadata=None, **fields):
+        """Build a record from a free-form metadata dict, moving the known keys
+        into the fixed payload and keeping the rest as extra"""
+        metadata = dict(metadata or {})
+        return cls(
+            violation_type,
+            timestamp,
+            gaze_direction=metadata.pop('gaze_direction', None),
+            eye_ratio=metadata.pop('eye_ratio', float('nan')),
+            image_path=metadata.pop('image_path', None),
+            clip_path=metadata.pop('clip_path', None),
+            extra=metadata or None,
+            **fields
+        )
+
+    @classmethod
+    def from_dict(cls, entry):
+        """Rebuild a record from to_dict() output or a legacy violation dict"""
+        record = cls.from_metadata(
+            entry['type'],
+            entry['timestamp'],
+            entry.get('metadata'),
+            severity=entry.get('severity', 1),
+            mono_ns=entry.get('mono_ns', 0),
+            end=entry.get('end'),
+            confidence=entry.get('confidence', entry.get('peak_confidence', 1.0)) or 0.0,
+            frame_count=entry.get('frame_count', 1)
+        )
+        if record.image_path is None:
+            record.image_path = entry.get('image_path')
+        # Exact integers win over the re-parsed ISO strings
+        if 'epoch_ns' in entry:
+            record.epoch_ns = entry['epoch_ns']
+        if 'end_ns' in entry:
+            record.end_ns = entry['end_ns']
+        return record
+
+    def __repr__(self):
+        return f"ViolationRecord({self.type}, {_iso(self.epoch_ns)}, duration={self.duration})"
+
+
+def to_array(records):
+    """Pack records into a RECORD_DTYPE array for vectorised analytics"""
+    array = np.empty(len(records), dtype=RECORD_DTYPE)
+    for i, r in enumerate(records):
+        array[i] = (r.type_code, r.severity, r.gaze, r.frame_count, r.confidence, r.eye_ratio,
+                    r.mono_ns, r.epoch_ns, r.end_ns)
+    return array
+
+
+def from_array(array):
+    """Records from a RECORD_DTYPE array (paths and extra metadata are not stored there)"""
+    records = []
+    for row in array:
+        severity = float(row['severity'])
+        record = ViolationRecord(int(row['type']), 0, severity=int(severity) if severity.is_integer() else severity,
+                                 mono_ns=int(row['mono_ns']), confidence=float(row['confidence']),
+                                 frame_count=int(row['frame_count']), gaze_direction=int(row['gaze']),
+                                 eye_ratio=float(row['eye_ratio']))
+        record.epoch_ns = int(row['epoch_ns'])
+        record.end_ns = int(row['end_ns'])
+        records.append(record)
+    return records
@@ -0,0 +1,376 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from datetime import datetime
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    student_id TEXT,
+    student_name TEXT,
+    exam TEXT,
+    course TEXT,
+    started_at REAL,
+    ended_at REAL,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS violations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    ts REAL NOT NULL,
+    severity INTEGER DEFAULT 1,
+    image_path TEXT,
+    metadata TEXT,
+    end_ts REAL,
+    confidence REAL,
+    frame_count INTEGER
+);
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT,
+    type TEXT NOT NULL,
+    ts REAL NOT NULL,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_started ON sessions(started_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_student ON sessions(student_id);
+CREATE INDEX IF NOT EXISTS idx_violations_session_ts ON violations(session_id, ts);
+CREATE INDEX IF NOT EXISTS idx_violations_type_ts ON violations(type, ts);
+CREATE INDEX IF NOT EXISTS idx_violations_ts ON violations(ts);
+CREATE INDEX IF NOT EXISTS idx_alerts_session_ts ON alerts(session_id, ts);
+CREATE INDEX IF NOT EXISTS idx_alerts_ts ON alerts(ts);
+"""
+
+# Columns added after the first release, applied to existing databases on open
+MIGRATIONS = (
+    ('violations', 'end_ts', 'REAL'),
+    ('violations', 'confidence', 'REAL'),
+    ('violations', 'frame_count', 'INTEGER'),
+    ('sessions', 'live_segment', 'TEXT'),
+)
+
+TIMESTAMP_FORMATS = ("%Y%m%d_%H%M%S_%f", "%Y%m%d_%H%M%S", "%Y-%m-%d %H:%M:%S")
+
+
+def parse_timestamp(value):
+    """Convert any timestamp used in the project to epoch seconds"""
+    if value is None:
+        return time.time()
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        pass
+    for fmt in TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised timestamp: {value}")
+
+
+def parse_timestamps(values):
+    """Vectorised parse_timestamp for a list of timestamps, returns a float64 array.
+
+    ISO strings and the capturer's %Y%m%d_%H%M%S_%f strings are converted
+    with numpy datetime64 in bulk; the local UTC offset is taken from the
+    first entry. Anything else falls back to parse_timestamp per value.
+    """
+    import numpy as np
+
+    if not len(values):
+        return np.empty(0, dtype=np.float64)
+    first = values[0]
+    if isinstance(first, (int, float)):
+        return np.asarray(values, dtype=np.float64)
+    try:
+        strings = np.asarray(values, dtype='U32')
+        if len(first) == 22 and first[8] == '_' and first[15] == '_':
+            # 20250920_202714_936652 -> 2025-09-20T20:27:14.936652
+            chars = strings.view('U1').reshape(len(strings), -1)[:, :22]
+            iso = np.full((len(strings), 26), '-', dtype='U1')
+            iso[:, [0, 1, 2, 3, 5, 6, 8, 9]] = chars[:, 0:8]
+            iso[:, 10] = 'T'
+            iso[:, [11, 12, 14, 15, 17, 18]] = chars[:, 9:15]
+            iso[:, [13, 16]] = ':'
+            iso[:, 19] = '.'
+            iso[:, 20:26] = chars[:, 16:22]
+            strings = iso.view('U26').ravel()
+        naive = strings.astype('datetime64[us]').astype(np.int64) / 1e6
+        return naive - (naive[0] - parse_timestamp(first))
+    except (ValueError, TypeError):
+        return np.array([parse_timestamp(v) for v in values], dtype=np.float64)
+
+
+class ViolationStore:
+    """SQLite store for sessions, violations and alerts.
+
+    Writes are buffered and committed in batches; reads flush pending rows
+    first so callers in the same process always see their own writes.
+    """
+
+    def __init__(self, config):
+        self.config = config.get('storage', {})
+        self.db_path = self.config.get('db_path', './reports/proctoring.db')
+        self.batch_size = self.config.get('batch_size', 200)
+        self.flush_interval = self.config.get('flush_interval', 1.0)
+
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self.conn.commit()
+
+        self._pending_violations = []
+        self._pending_alerts = []
+        self._last_flush = time.time()
+
+    def _migrate(self):
+        for table, column, column_type in MIGRATIONS:
+            columns = {row['name'] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+    # ----------------------------
+    # Writes
+    # ----------------------------
+    def start_session(self, student_info, session_id=None, started_at=None):
+        """Register a new exam session and return its id"""
+        session_id = session_id or f"{student_info.get('id', 'session')}_{uuid.uuid4().hex[:8]}"
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sessions "
+                "(id, student_id, student_name, exam, course, started_at, ended_at, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?, NULL, ?)",
+                (
+                    session_id,
+                    student_info.get('id'),
+                    student_info.get('name'),
+                    student_info.get('exam'),
+                    student_info.get('course'),
+                    parse_timestamp(started_at),
+                    json.dumps(student_info)
+                )
+            )
+            self.conn.commit()
+        return session_id
+
+    def set_live_segment(self, session_id, name):
+        """Record the shared-memory segment a running session publishes its live state to"""
+        with self.lock:
+            self.conn.execute("UPDATE sessions SET live_segment = ? WHERE id = ?", (name, session_id))
+            self.conn.commit()
+
+    def end_session(self, session_id, ended_at=None):
+        """Flush pending rows and mark the session as finished"""
+        with self.lock:
+            self._flush_locked()
+            self.conn.execute(
+                "UPDATE sessions SET ended_at = ? WHERE id = ?",
+                (parse_timestamp(ended_at), session_id)
+            )
+            self.conn.commit()
+
+    def add_violation(self, session_id, violation_type, timestamp=None, severity=1,
+                      metadata=None, image_path=None, end=None, confidence=None, frame_count=None):
+        """Queue a violation row for the next batch insert.
+
+        Interval violations pass end, confidence (peak) and frame_count;
+        point events leave them NULL.
+        """
+        row = (
+            session_id,
+            violation_type,
+            parse_timestamp(timestamp),
+            severity,
+            image_path,
+            json.dumps(metadata, default=str) if metadata else None,
+            parse_timestamp(end) if end is not None else None,
+            confidence,
+            frame_count
+        )
+        with self.lock:
+            self._pending_violations.append(row)
+            self._maybe_flush_locked()
+
+    def add_alert(self, session_id, alert_type, message, timestamp=None):
+        """Queue an alert row for the next batch insert"""
+        row = (session_id, alert_type, parse_timestamp(timestamp), message)
+        with self.lock:
+            self._pending_alerts.append(row)
+            self._maybe_flush_locked()
+
+    def flush(self):
+        """Commit all pending rows"""
+        with self.lock:
+            self._flush_locked()
+
+    def close(self):
+        with self.lock:
+            self._flush_locked()
+            self.conn.close()
+
+    def _maybe_flush_locked(self):
+        pending = len(self._pending_violations) + len(self._pending_alerts)
+        if pending >= self.batch_size or time.time() - self._last_flush >= self.flush_interval:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.time()
+        if not self._pending_violations and not self._pending_alerts:
+            return
+        with self.conn:
+            if self._pending_violations:
+                self.conn.executemany(
+                    "INSERT INTO violations (session_id, type, ts, severity, image_path, metadata, "
+                    "end_ts, confidence, frame_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._pending_violations
+                )
+            if self._pending_alerts:
+                self.conn.executemany(
+                    "INSERT INTO alerts (session_id, type, ts, message) VALUES (?, ?, ?, ?)",
+                    self._pending_alerts
+                )
+        self._pending_violations = []
+        self._pending_alerts = []
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def _query(self, sql, params=()):
+        with self.lock:
+            self._flush_locked()
+            return [dict(row) for row in self.conn.execute(sql, params).fetchall()]
+
+    @staticmethod
+    def _filters(session_id=None, start=None, end=None, types=None):
+        clauses, params = [], []
+        if session_id is not None:
+            clauses.append("session_id = ?")
+            params.append(session_id)
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(parse_timestamp(start))
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(parse_timestamp(end))
+        if types:
+            clauses.append(f"type IN ({', '.join('?' * len(types))})")
+            params.extend(types)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def get_session(self, session_id):
+        """Return a single session row or None"""
+        rows = self._query("SELECT * FROM sessions WHERE id = ?", (session_id,))
+        return rows[0] if rows else None
+
+    def live_sessions(self, limit=20):
+        """Sessions that have not ended and publish live state, newest first"""
+        return self._query(
+            "SELECT * FROM sessions WHERE ended_at IS NULL AND live_segment IS NOT NULL "
+            "ORDER BY started_at DESC LIMIT ?",
+            (limit,)
+        )
+
+    def list_sessions(self, limit=100, offset=0, since=None):
+        """List sessions, newest first, with their violation totals"""
+        where, params = "", []
+        if since is not None:
+            where = " WHERE s.started_at >= ?"
+            params.append(parse_timestamp(since))
+        sql = (
+            "SELECT s.*, "
+            "(SELECT COUNT(*) FROM violations v WHERE v.session_id = s.id) AS violation_count, "
+            "(SELECT COALESCE(SUM(v.severity), 0) FROM violations v WHERE v.session_id = s.id) AS severity_score "
+            f"FROM sessions s{where} ORDER BY s.started_at DESC LIMIT ? OFFSET ?"
+        )
+        return self._query(sql, params + [limit, offset])
+
+    def get_violations(self, session_id=None, start=None, end=None, types=None, limit=None):
+        """Return violations in time order as report-ready dicts"""
+        where, params = self._filters(session_id, start, end, types)
+        sql = f"SELECT * FROM violations{where} ORDER BY ts"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        violations = []
+        for row in self._query(sql, params):
+            violations.append({
+                'type': row['type'],
+                'timestamp': datetime.fromtimestamp(row['ts']).isoformat(),
+                'ts': row['ts'],
+                'severity': row['severity'],
+                'image_path': row['image_path'],
+                'metadata': json.loads(row['metadata']) if row['metadata'] else {},
+                'end': datetime.fromtimestamp(row['end_ts']).isoformat() if row['end_ts'] is not None else None,
+                'duration': row['end_ts'] - row['ts'] if row['end_ts'] is not None else None,
+                'confidence': row['confidence'],
+                'frame_count': row['frame_count']
+            })
+        return violations
+
+    def violation_times(self, session_id=None, start=None, end=None, types=None):
+        """(timestamps, types) of the matching violations in time order, without the row payload"""
+        where, params = self._filters(session_id, start, end, types)
+        with self.lock:
+            self._flush_locked()
+            cursor = self.conn.cursor()
+            cursor.row_factory = None  # plain tuples, no per-row dict
+            rows = cursor.execute(f"SELECT ts, type FROM violations{where} ORDER BY ts", params).fetchall()
+        return [row[0] for row in rows], [row[1] for row in rows]
+
+    def count_by_type(self, session_id=None, start=None, end=None):
+        """Return {type: count} for the matching violations"""
+        where, params = self._filters(session_id, start, end)
+        rows = self._query(f"SELECT type, COUNT(*) AS n FROM violations{where} GROUP BY type", params)
+        return {row['type']: row['n'] for row in rows}
+
+    def count_by_interval(self, bucket_seconds, session_id=None, start=None, end=None, types=None):
+        """Return violation counts per time bucket and type"""
+        where, params = self._filters(session_id, start, end, types)
+        sql = (
+            "SELECT CAST(ts / ? AS INTEGER) * ? AS bucket, type, COUNT(*) AS n "
+            f"FROM violations{where} GROUP BY bucket, type ORDER BY bucket"
+        )
+        return self._query(sql, [bucket_seconds, bucket_seconds] + params)
+
+    def session_summary(self, session_id):
+        """Aggregate statistics for one session, computed in SQL"""
+        by_type = self.count_by_type(session_id)
+        rows = self._query(
+            "SELECT COUNT(*) AS total, COALESCE(SUM(severity), 0) AS severity_score, "
+            "MIN(ts) AS first_ts, MAX(ts) AS last_ts, "
+            "COALESCE(SUM(end_ts - ts), 0) AS total_duration FROM violations WHERE session_id = ?",
+            (session_id,)
+        )
+        summary = rows[0]
+        summary['by_type'] = by_type
+        summary['average_severity'] = (
+            summary['severity_score'] / summary['total'] if summary['total'] else 0
+        )
+        return summary
+
+    def recent_alerts(self, limit=10, session_id=None):
+        """Return the newest alerts, oldest first"""
+        where, params = self._filters(session_id)
+        rows = self._query(
+            f"SELECT * FROM alerts{where} ORDER BY ts DESC LIMIT ?",
+            params + [limit]
+        )
+        return list(reversed(rows))
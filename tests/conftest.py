@@ -0,0 +1,27 @@
+import os
+import sys
+import json
+import yaml
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+
+@pytest.fixture
+def config(tmp_path):
+    """Repo config with every output path redirected into tmp_path"""
+    with open(os.path.join(ROOT, 'config.yaml')) as f:
+        config = yaml.safe_load(f)
+    config['logging']['log_path'] = str(tmp_path / 'logs')
+    config['storage']['db_path'] = str(tmp_path / 'proctoring.db')
+    config['reporting']['output_dir'] = str(tmp_path / 'reports')
+    config['global']['output_path'] = str(tmp_path / 'reports')
+    return config
+
+
+@pytest.fixture
+def legacy_violations():
+    """The violations.json shipped in reports/, written before intervals existed"""
+    with open(os.path.join(ROOT, 'reports', 'violations.json')) as f:
+        return json.load(f)
@@ -0,0 +1,26 @@
+import pytest
+
+from reporting import batch
+from reporting.report_generator import ReportGenerator
+from utils.violation_store import ViolationStore
+
+
+def test_unknown_session_fails(config):
+    store = ViolationStore(config)
+    with pytest.raises(ValueError):
+        ReportGenerator(config, store).generate_session_report('STUDENT_404', output_format='html')
+    store.close()
+
+
+def test_batch_reports_unknown_session_as_failed(config):
+    store = ViolationStore(config)
+    session_id = store.start_session({'id': 'STUDENT_001', 'name': 'Test Student'})
+    store.add_violation(session_id, 'FACE_DISAPPEARED', 1.7e9)
+    store.close()
+
+    batch._init_worker(config)
+    known = batch._generate(session_id, 'html')
+    unknown = batch._generate('STUDENT_404', 'html')
+    assert known['error'] is None and known['path']
+    assert unknown['path'] is None
+    assert unknown['error'] == "Unknown session: STUDENT_404"
@@ -0,0 +1,38 @@
+import pytest
+
+from utils.frame_sources import SyntheticSource
+from utils.intervals import IntervalTracker
+from utils.rules import RulesEngine
+
+RULES = {'rules': [
+    {'name': 'gaze_away', 'signals': ['GAZE_AWAY']},
+    {'name': 'sustained_gaze_away', 'signals': ['GAZE_AWAY'], 'active_for': 3, 'within': 10, 'cooldown': 10},
+    {'name': 'object_and_audio', 'signals': ['OBJECT_DETECTED', 'AUDIO_DETECTED'], 'within': 5}
+], 'termination': {'min_distinct': 0}}
+
+
+def test_fast_source_timestamps_follow_the_stream():
+    source = SyntheticSource(resolution=(64, 48), fps=30, realtime=False, frames=4)
+    times = []
+    while source.read()[0]:
+        times.append(source.timestamp())
+    assert times[0] == int(times[0])
+    assert [t - times[0] for t in times] == pytest.approx([i / 30 for i in range(4)])
+
+
+def evaluate(start):
+    """Rule firings and intervals of a fixed signal pattern with frames timed from start"""
+    rules, intervals, log = RulesEngine(RULES), IntervalTracker({}), []
+    source = SyntheticSource(resolution=(64, 48), fps=30, realtime=False, frames=900)
+    source.start_time = start
+    while source.read()[0]:
+        i, timestamp = source.frame_index, source.timestamp()
+        signals = {'GAZE_AWAY': i % 40 < 25, 'OBJECT_DETECTED': i % 97 == 0, 'AUDIO_DETECTED': i % 61 < 3}
+        _, fired = rules.update(signals, timestamp)
+        log.extend((i, rule.name) for rule in fired)
+        log.extend((i, event['type'], event['end'] is None) for event in intervals.update(signals, timestamp))
+    return log
+
+
+def test_fast_runs_are_repeatable_from_any_start():
+    assert evaluate(1700000000.0) == evaluate(1760000007.0) == evaluate(1799999999.0)
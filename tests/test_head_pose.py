@@ -0,0 +1,27 @@
+import math
+
+import cv2
+import numpy as np
+
+from detection.head_pose import HeadPoseEstimator
+
+FRAME_SHAPE = (480, 640, 3)
+
+
+def landmarks(estimator, yaw):
+    """FaceMesh-style landmarks of the model face turned by yaw degrees"""
+    y = math.radians(yaw)
+    turn = np.array([[math.cos(y), 0, math.sin(y)], [0, 1, 0], [-math.sin(y), 0, math.cos(y)]])
+    rvec, _ = cv2.Rodrigues(turn @ np.diag([1.0, -1.0, -1.0]))  # model y axis up, image y down
+    points, _ = cv2.projectPoints(estimator.MODEL_POINTS, rvec, np.array([0, 0, 1000.0]),
+                                  estimator._camera_matrix(640, 480), estimator.DIST_COEFFS)
+    result = np.full((478, 2), np.nan, np.float32)
+    result[estimator.LANDMARKS] = points.reshape(-1, 2) / (640, 480)
+    return result
+
+
+def test_head_turn_is_not_held_without_a_face(config):
+    estimator = HeadPoseEstimator(config)
+    assert estimator.evaluate(landmarks(estimator, 0), FRAME_SHAPE) == "Forward"
+    assert estimator.evaluate(landmarks(estimator, -45), FRAME_SHAPE) == "Looking Right"
+    assert estimator.evaluate(None, FRAME_SHAPE) == "Forward"
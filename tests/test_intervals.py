@@ -0,0 +1,26 @@
+from utils.intervals import IntervalTracker
+
+CONFIG = {'intervals': {'open_frames': 3, 'close_seconds': 1.0}}
+
+
+def run(tracker, active_frames, frames=300, fps=30, confidence=True):
+    events = []
+    for i in range(frames):
+        signals = {'OBJECT_DETECTED': confidence if i in active_frames else False}
+        events.extend(tracker.update(signals, 1.7e9 + i / fps))
+    return events + tracker.close_all()
+
+
+def test_rate_limited_signal_opens_one_interval():
+    # YOLO at max_fps 5 on a 30 fps stream: the phone is seen every 6th frame
+    events = run(IntervalTracker(CONFIG), set(range(0, 300, 6)), confidence=0.87)
+    opened = [e for e in events if e['end'] is None]
+    closed = [e for e in events if e['end'] is not None]
+    assert len(opened) == 1 and len(closed) == 1
+    assert opened[0]['start'] == 1.7e9
+    assert closed[0]['frame_count'] == 50
+    assert closed[0]['peak_confidence'] == 0.87
+
+
+def test_flicker_does_not_open_an_interval():
+    assert run(IntervalTracker(CONFIG), {10, 11, 100}) == []
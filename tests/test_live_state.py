@@ -0,0 +1,62 @@
+import uuid
+import pytest
+
+from utils.live_state import LiveStatePublisher, LiveStateReader, create_shared_memory, segment_name
+from utils.preview import PreviewPublisher
+from utils.violation_store import ViolationStore
+
+
+@pytest.fixture
+def prefix():
+    return f"test_{uuid.uuid4().hex[:6]}"
+
+
+def test_sessions_get_separate_segments(prefix):
+    first = LiveStatePublisher(segment_name(prefix, 'STUDENT_001_aaaa'))
+    second = LiveStatePublisher(segment_name(prefix, 'STUDENT_002_bbbb'))
+    try:
+        first.publish({'session_id': 'STUDENT_001_aaaa', 'updated_at': 1.0})
+        second.publish({'session_id': 'STUDENT_002_bbbb', 'updated_at': 2.0})
+        reader = LiveStateReader(segment_name(prefix, 'STUDENT_001_aaaa'))
+        assert reader.read()['session_id'] == 'STUDENT_001_aaaa'
+        reader.close()
+    finally:
+        first.close()
+        second.close()
+
+
+def test_existing_segment_is_not_replaced(prefix):
+    name = segment_name(prefix, 'STUDENT_001_aaaa')
+    publisher = LiveStatePublisher(name)
+    try:
+        publisher.publish({'session_id': 'STUDENT_001_aaaa', 'updated_at': 1.0})
+        with pytest.raises(FileExistsError):
+            create_shared_memory(name, 1024)
+        reader = LiveStateReader(name)
+        assert reader.read()['session_id'] == 'STUDENT_001_aaaa'
+        reader.close()
+    finally:
+        publisher.close()
+
+
+def test_sessions_get_separate_preview_segments(prefix):
+    first = PreviewPublisher(segment_name(f"{prefix}_pv", 'STUDENT_001_aaaa'), size=4096)
+    try:
+        assert len(first.name) <= 31  # macOS limit on shared-memory names
+        with pytest.raises(FileExistsError):
+            PreviewPublisher(first.name, size=4096)
+        second = PreviewPublisher(segment_name(f"{prefix}_pv", 'STUDENT_002_bbbb'), size=4096)
+        second.close()
+    finally:
+        first.close()
+
+
+def test_store_lists_running_sessions_with_segments(config):
+    store = ViolationStore(config)
+    running = store.start_session({'id': 'STUDENT_001'})
+    ended = store.start_session({'id': 'STUDENT_002'})
+    store.set_live_segment(running, 'seg_a')
+    store.set_live_segment(ended, 'seg_b')
+    store.end_session(ended)
+    assert [s['id'] for s in store.live_sessions()] == [running]
+    store.close()
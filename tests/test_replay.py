@@ -0,0 +1,23 @@
+import numpy as np
+
+from detection.pipeline import DetectionPipeline
+from detection.audio_detection import AudioMonitor
+from detection.replay import replay_session
+from utils.replay_log import ReplayLogWriter
+
+
+def test_replay_runs_without_model_packages(config, tmp_path):
+    # No torch, mediapipe, ultralytics or whisper needed to evaluate saved outputs
+    pipeline = DetectionPipeline(config, AudioMonitor(config, load_model=False), load_models=False)
+    path = str(tmp_path / 'session.replay')
+    writer = ReplayLogWriter(path, pipeline.landmark_indices, {'session_id': 'STUDENT_001'}, block_frames=10)
+    for i in range(25):
+        faces = (np.zeros((0, 4), np.float32), np.zeros(0, np.float32))  # nobody in frame
+        writer.write(1.7e9 + i / 10, (480, 640, 3), {
+            'faces': faces, 'landmarks': None, 'objects': None, 'audio': None
+        })
+    writer.close()
+
+    result = replay_session(config, path, stop_at_termination=False)
+    assert result['session_id'] == 'STUDENT_001'
+    assert result['frames'] == 25
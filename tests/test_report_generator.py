@@ -0,0 +1,39 @@
+from reporting.report_generator import ReportGenerator
+from utils.violation_store import ViolationStore
+
+STUDENT = {'id': 'STUDENT_001', 'name': 'John Doe', 'exam': 'Final', 'course': 'CS 101'}
+
+
+def test_html_report_renders_violations_without_duration(config, legacy_violations):
+    assert all('duration' not in v for v in legacy_violations)
+    path = ReportGenerator(config).generate_report(STUDENT, legacy_violations, 'html')
+    assert path is not None
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+    assert legacy_violations[0]['type'] in html
+
+
+def test_html_report_shows_interval_duration(config):
+    violations = [
+        {'type': 'GAZE_AWAY', 'timestamp': '2025-09-20T20:27:14', 'ts': 1758400034.0,
+         'duration': 4.25, 'frame_count': 120, 'metadata': {}},
+        {'type': 'SCREEN_CHANGED', 'timestamp': '2025-09-20T20:27:20', 'ts': 1758400040.0,
+         'duration': None, 'metadata': {}}
+    ]
+    path = ReportGenerator(config).generate_report(STUDENT, violations, 'html')
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+    assert 'for 4.2s (120 frames)' in html or 'for 4.3s (120 frames)' in html
+
+
+def test_session_report_lists_only_the_first_violations(config):
+    config['reporting']['max_detailed_violations'] = 5
+    store = ViolationStore(config)
+    session_id = store.start_session(STUDENT)
+    for i in range(12):
+        store.add_violation(session_id, 'GAZE_AWAY', 1.7e9 + i, metadata={'gaze_direction': 'left'})
+    path = ReportGenerator(config, store).generate_session_report(session_id, output_format='html')
+    store.close()
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+    assert '7 more violations not listed individually' in html
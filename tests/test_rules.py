@@ -0,0 +1,43 @@
+import pytest
+
+from utils.rules import RulesEngine
+
+
+def test_termination_reason_names_the_rule_that_fired():
+    config = {'rules': [
+        {'name': 'face_disappeared', 'signals': ['FACE_DISAPPEARED']},
+        {'name': 'phone', 'signals': ['OBJECT_DETECTED'], 'message': "Phone in view", 'terminate': True}
+    ], 'termination': {'after_rules': ['face_disappeared']}}
+    engine = RulesEngine(config)
+    _, fired = engine.update({'OBJECT_DETECTED': True}, 1.7e9)
+    assert engine.should_terminate(fired)
+    assert engine.termination_reason(fired) == "Phone in view"
+
+
+def test_termination_reason_counts_distinct_rules():
+    config = {'rules': [{'name': name, 'signals': [name.upper()]} for name in ('a', 'b', 'c')],
+              'termination': {'min_distinct': 2}}
+    engine = RulesEngine(config)
+    engine.update({'A': True}, 1.7e9)
+    _, fired = engine.update({'B': True}, 1.7e9 + 1)
+    assert engine.should_terminate(fired)
+    assert engine.termination_reason(fired) == "2 of 3 Alerts Triggered"
+
+
+def test_only_conditions_of_candidate_groups_are_checked(monkeypatch):
+    config = {'rules': [
+        {'name': 'gaze', 'signals': ['GAZE_AWAY'], 'active_for': 3, 'within': 10},
+        {'name': 'head', 'signals': ['HEAD_TURNED'], 'active_for': 2, 'within': 5},
+        {'name': 'gaze_talking', 'signals': ['GAZE_AWAY', 'MOUTH_MOVING'], 'within': 5}
+    ]}
+    engine = RulesEngine(config)
+    checked = []
+    holds = engine._holds
+    monkeypatch.setattr(engine, '_holds', lambda condition, *args: checked.append(condition) or holds(condition, *args))
+    engine.update({'HEAD_TURNED': True}, 1.7e9)
+    assert checked == [('HEAD_TURNED', 5, 2, 0)]
+
+
+def test_window_conditions_without_window_are_rejected():
+    with pytest.raises(ValueError, match="within"):
+        RulesEngine({'rules': [{'name': 'gaze', 'signals': ['GAZE_AWAY'], 'active_for': 3}]})
@@ -0,0 +1,30 @@
+import numpy as np
+
+from utils.screen_capture import ScreenRecorder
+
+
+def screen(level=40):
+    return np.full((1080, 1920, 4), level, np.uint8)
+
+
+def test_small_popup_is_encoded(config):
+    recorder = ScreenRecorder(config)
+    assert recorder._capture_frame(screen(), 0.0) == 'encoded'
+    assert recorder._capture_frame(screen(), 0.1) == 'duplicated'
+
+    cursor = screen()
+    cursor[500:516, 900:902] = 255
+    assert recorder._capture_frame(cursor, 0.2) == 'duplicated'
+
+    popup = screen()
+    popup[400:500, 800:900] = 255
+    assert recorder._capture_frame(popup, 0.3) == 'encoded'
+
+
+def test_gradual_change_is_encoded_once_it_adds_up(config):
+    recorder = ScreenRecorder(config)
+    outcomes = [recorder._capture_frame(screen(40 + step), step / 10) for step in range(12)]
+    # Each capture differs from the previous one by a single level, but they
+    # add up against the last encoded frame
+    assert outcomes.count('encoded') == 2
+    assert outcomes[0] == 'encoded' and outcomes[7] == 'encoded'
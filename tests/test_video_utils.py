@@ -0,0 +1,78 @@
+import time
+
+import numpy as np
+
+from utils import video_utils
+from utils.video_utils import VideoRecorder
+
+
+class FailingWriter:
+    def __init__(self, *args):
+        raise IOError("disk full")
+
+
+def test_dead_encoder_does_not_block_recording(config, tmp_path, monkeypatch):
+    monkeypatch.setattr(video_utils, 'SegmentedVideoWriter', FailingWriter)
+    config['video'].update(recording_path=str(tmp_path), encoder_queue_size=2,
+                           encoder_queue_policy='block', encoder_put_timeout=0.05)
+    recorder = VideoRecorder(config)
+    recorder.start_recording()
+    frame = np.zeros((48, 64, 3), np.uint8)
+    for i in range(10):
+        recorder.record_frame(frame, 1.7e9 + i)
+
+    stats = recorder.stop_recording()
+    assert stats['encoder_error'] == "disk full"
+    assert stats['frame_count'] == 0
+    assert stats['dropped_frames'] > 0  # counted instead of waiting on the dead encoder
+
+
+class SlowWriter:
+    manifest_path = "session.json"
+
+    def __init__(self, *args):
+        self.segments = []
+        self.released = False
+
+    def write(self, frame, timestamp):
+        time.sleep(0.2)
+        self.segments.append({'file': f"part{len(self.segments)}.mp4"})
+
+    def release(self):
+        self.released = True
+
+
+def test_repeated_timestamps_do_not_divide_by_zero(config, tmp_path, monkeypatch):
+    monkeypatch.setattr(video_utils, 'SegmentedVideoWriter', SlowWriter)
+    config['video'].update(recording_path=str(tmp_path), encoder_queue_policy='block')
+    recorder = VideoRecorder(config)
+    recorder.start_recording()
+    frame = np.zeros((48, 64, 3), np.uint8)
+    recorder.record_frame(frame, 1.7e9)
+    recorder.record_frame(frame, 1.7e9)
+
+    stats = recorder.stop_recording()
+    assert stats['frame_count'] == 2
+    assert stats['manifest'] == "session.json"
+    assert stats['segments'] == ["part0.mp4", "part1.mp4"]
+
+
+def test_stop_timeout_leaves_writer_to_encoder(config, tmp_path, monkeypatch):
+    monkeypatch.setattr(video_utils, 'SegmentedVideoWriter', SlowWriter)
+    config['video'].update(recording_path=str(tmp_path), encoder_queue_policy='block',
+                           encoder_stop_timeout=0.1)
+    recorder = VideoRecorder(config)
+    recorder.start_recording()
+    thread = recorder.thread
+    frame = np.zeros((48, 64, 3), np.uint8)
+    for i in range(3):
+        recorder.record_frame(frame, 1.7e9 + i)
+
+    stats = recorder.stop_recording()
+    assert stats['manifest'] == "session.json"
+    writer = recorder.writer
+    assert writer is not None and not writer.released
+
+    thread.join()
+    assert writer.released and recorder.writer is None
+    assert recorder.frame_count == 3
@@ -0,0 +1,26 @@
+import os
+import json
+
+from utils.violation_logger import ViolationLogger
+
+
+def test_journal_appends_and_json_is_written_on_close(config):
+    os.makedirs(config['global']['output_path'])
+    logger = ViolationLogger(config)
+    logger.log_violation('SCREEN_CHANGED', 1.7e9)
+    event = {'id': 1, 'type': 'GAZE_AWAY', 'start': 1.7e9 + 1, 'end': None,
+             'peak_confidence': 1.0, 'frame_count': 3}
+    logger.log_interval(event)
+    logger.log_interval(dict(event, end=1.7e9 + 4, frame_count=90))
+
+    json_path = os.path.join(config['global']['output_path'], 'violations.json')
+    assert not os.path.exists(json_path)  # not rewritten per event
+    with open(os.path.join(config['global']['output_path'], 'violations.jsonl')) as f:
+        lines = [json.loads(line) for line in f]
+    assert [(line['type'], line.get('duration')) for line in lines] == [
+        ('SCREEN_CHANGED', None), ('GAZE_AWAY', None), ('GAZE_AWAY', 3.0)
+    ]
+
+    logger.close()
+    with open(json_path) as f:
+        assert json.load(f) == logger.get_violations()
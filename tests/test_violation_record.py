@@ -0,0 +1,32 @@
+import json
+
+from utils.violation_record import ViolationRecord, to_array, from_array
+
+
+def test_legacy_violations_round_trip(legacy_violations):
+    for entry in legacy_violations:
+        record = ViolationRecord.from_dict(entry)
+        assert record.type == entry['type']
+        assert record.metadata() == entry['metadata']  # gaze kept without an eye ratio
+
+        again = ViolationRecord.from_dict(json.loads(json.dumps(record.to_dict())))
+        assert again.to_dict() == record.to_dict()
+
+
+def test_metadata_fields_are_independent():
+    gaze_only = ViolationRecord('GAZE_AWAY', 0, gaze_direction='left')
+    ratio_only = ViolationRecord('GAZE_AWAY', 0, eye_ratio=0.25)
+    assert gaze_only.metadata() == {'gaze_direction': 'left'}
+    assert ratio_only.metadata() == {'eye_ratio': 0.25}
+    assert ViolationRecord('GAZE_AWAY', 0).metadata() == {}
+
+
+def test_array_round_trip_keeps_fractional_severity():
+    records = [
+        ViolationRecord('HEAD_TURNED', 1.7e9, severity=2.5, gaze_direction='right', eye_ratio=0.3),
+        ViolationRecord('FACE_DISAPPEARED', 1.7e9 + 1, severity=3)
+    ]
+    restored = from_array(to_array(records))
+    assert [r.severity for r in restored] == [2.5, 3]
+    assert [r.metadata().get('gaze_direction') for r in restored] == ['right', None]
+    assert [r.type for r in restored] == ['HEAD_TURNED', 'FACE_DISAPPEARED']